@@ -0,0 +1,181 @@
+"""Run every kubermon command against a synthetic cluster and report its cost.
+
+Each entry of show_commands() is run as a non-interactive subcommand in a
+fresh interpreter against fake_cluster's stub API server. It runs once with
+the API backend and once with the kubectl backend, which spawns
+fake_kubectl.py. For every run it reports the wall time, the kubectl
+subprocesses spawned, the API requests and bytes the server saw, and the
+peak RSS of the kubermon process (read from /proc at exit, so Linux only).
+Every command needs an entry in scenarios(), so a new command cannot
+silently go unmeasured.
+
+``--save`` writes the results as JSON; ``--baseline`` compares a run with
+saved results, for regression tracking.
+
+Usage: python benchmarks/bench_commands.py [--pods 5000] [--backends api,kubectl]
+                                           [--commands get-nodes,...] [--save FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KUBERMON = os.path.join(ROOT, "kubermon.py")
+sys.path.insert(0, ROOT)
+
+import kubermon  # noqa: E402
+from fake_cluster import StubApiServer, add_size_arguments, cluster_from_args  # noqa: E402
+from fake_kubectl import kubeconfig  # noqa: E402
+
+
+def scenarios(cluster):
+    """Arguments of each command, aimed at objects of ``cluster``."""
+    pods = cluster.objects["pods"]
+    pod = pods[0]["metadata"]
+    crashed = next((p["metadata"] for p in pods if p["status"]["containerStatuses"][0]["restartCount"]), pod)
+    namespace, node = pod["namespace"], cluster.objects["nodes"][0]["metadata"]["name"]
+    deployment = cluster.objects["deployments"][0]["metadata"]["name"]
+    return {
+        "get-nodes": [],
+        "get-contexts": [],
+        "select-context": ["bench"],
+        "list-namespaces": [],
+        "not-running-pods": ["-A"],
+        "delete-pods": ["-A"],
+        "list-deployments": ["-A"],
+        "check-deployment-status": ["-n", namespace, "-l", "app"],
+        "cordon-nodes": ["-l", "pool=a"],
+        "list-pods": ["-n", namespace, "--node", node],
+        "list-pods-on-nodes": [],
+        "image-version": ["-A"],
+        "image-inventory": ["-A"],
+        "restart-deployment": ["-n", namespace, deployment, "--wait"],
+        "restart-deployments": ["-n", namespace, "--wave-size", "10"],
+        "check-crash-log": ["-n", crashed["namespace"], crashed["name"]],
+        "crash-triage": ["-A"],
+        "events": ["-A"],
+        "all-events": [],
+        "list-pod-with-labels": ["-n", namespace],
+        "list-containers": ["-n", namespace],
+        "container-logs": ["-n", namespace, pod["name"], "-c", "app"],
+        "deploy-logs": ["-n", namespace, deployment],
+        "services-logs": ["-n", namespace, deployment],
+        "dashboard": ["-A"],
+    }
+
+
+def install_fake_kubectl(directory):
+    path = os.path.join(directory, "kubectl")
+    with open(path, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.join(ROOT, "benchmarks", "fake_kubectl.py")}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+# Runs kubermon and records its own peak RSS at exit. The child's ru_maxrss cannot be used: on Linux it
+# starts from the high-water mark of the forking process, i.e. this harness with its cluster in memory.
+BOOTSTRAP = """import atexit, os, runpy, sys
+def report():
+    with open("/proc/self/status") as status, open(os.environ["BENCH_RSS_FILE"], "w") as out:
+        out.write(next(line.split()[1] for line in status if line.startswith("VmHWM:")))
+atexit.register(report)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def run_command(argv, env, timeout, rss_file):
+    """Run kubermon once; returns (exit code, wall seconds, peak RSS in KiB, last stderr line)."""
+    with tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "-c", BOOTSTRAP, KUBERMON] + argv, env=env, cwd=ROOT,
+                                   stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=err)
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+        process.wait()
+        wall = time.perf_counter() - start
+        timer.cancel()
+        err.seek(0)
+        lines = err.read().decode("utf-8", "replace").strip().splitlines()
+    try:
+        with open(rss_file) as f:
+            rss = int(f.read())
+        os.unlink(rss_file)
+    except (OSError, ValueError):
+        rss = 0
+    return process.returncode, wall, rss, lines[-1] if lines else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_size_arguments(parser)
+    parser.add_argument("--backends", default="api,kubectl", help="comma-separated: api, kubectl")
+    parser.add_argument("--commands", help="comma-separated subset of the commands")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds before a command is killed")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare wall times with results saved by --save")
+    args = parser.parse_args()
+
+    cluster = cluster_from_args(args)
+    commands = scenarios(cluster)
+    missing = set(kubermon.show_commands()) - set(commands)
+    if missing:
+        sys.exit(f"No benchmark scenario for: {', '.join(sorted(missing))}")
+    selected = args.commands.split(",") if args.commands else kubermon.show_commands()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    server = StubApiServer(cluster).start()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        install_fake_kubectl(directory)
+        config_path = os.path.join(directory, "kubeconfig")
+        with open(config_path, "w") as f:
+            json.dump(kubeconfig(server.url), f)
+        kubectl_log = os.path.join(directory, "kubectl.log")
+        print(f"cluster: {args.namespaces} namespaces, {args.nodes} nodes, {args.pods} pods, "
+              f"{args.events} events, {args.log_lines} log lines per container")
+        for backend in args.backends.split(","):
+            env = dict(os.environ, PATH=directory + os.pathsep + os.environ.get("PATH", ""), KUBECONFIG=config_path,
+                       KUBERMON_BACKEND=backend, KUBERMON_SNAPSHOT="", FAKE_KUBECTL_SERVER=server.url,
+                       FAKE_KUBECTL_LOG=kubectl_log, BENCH_RSS_FILE=os.path.join(directory, "rss"))
+            env.pop("KUBERMON_API_SERVER", None)
+            if backend == "api":
+                env["KUBERMON_API_SERVER"] = server.url
+            print(f"\nbackend: {backend}")
+            print(f"{'command':<26}{'exit':>5}{'wall ms':>10}{'kubectl':>9}{'requests':>10}{'KiB in':>10}"
+                  f"{'KiB out':>9}{'RSS MiB':>9}{'vs base':>9}")
+            for command in selected:
+                server.reset()
+                open(kubectl_log, "w").close()
+                code, wall, rss, error = run_command([command] + commands[command], env, args.timeout,
+                                                     env["BENCH_RSS_FILE"])
+                with open(kubectl_log) as f:
+                    spawned = sum(1 for _ in f)
+                row = {"exit": code, "wall_ms": round(wall * 1000, 1), "kubectl": spawned,
+                       "requests": server.requests, "bytes_in": server.bytes_sent,
+                       "bytes_out": server.bytes_received, "rss_kib": rss}
+                results.setdefault(backend, {})[command] = row
+                before = baseline.get(backend, {}).get(command)
+                change = f"{(row['wall_ms'] / before['wall_ms'] - 1) * 100:+.0f}%" if before else ""
+                print(f"{command:<26}{code:>5}{row['wall_ms']:>10.1f}{spawned:>9}{server.requests:>10}"
+                      f"{server.bytes_sent / 1024:>10.0f}{server.bytes_received / 1024:>9.1f}{rss / 1024:>9.1f}"
+                      f"{change:>9}")
+                if code:
+                    print(f"    {error}")
+    server.stop()
+    if args.save:
+        sizes = {key: getattr(args, key) for key in ("namespaces", "nodes", "pods", "events", "log_lines")}
+        with open(args.save, "w") as f:
+            json.dump({"cluster": sizes, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Compare scraping kubectl text per view with one structured fetch shared by every view.
+
+The old path ran one kubectl per view (labels, containers, images, pods on
+a node): each run decoded the whole pod LIST, printed custom-columns text,
+and kubermon split that text back into fields. It is simulated in-process
+here, so process start-up is not included; one spawn of /bin/true is timed
+separately as a lower bound for it. The new path decodes the LIST once, with
+the json module or orjson into PodRecords, with the garbage collector paused
+as decode_json and the pod store do, and renders all four views from them.
+
+Usage: python benchmarks/bench_decode.py [--pods 50000]
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kubermon  # noqa: E402
+from bench_pod_store import synthetic_pods  # noqa: E402
+
+NODE = "node-7"
+
+# The custom-columns of each view, as kubectl would have printed them.
+VIEWS = {
+    "labels": lambda pod: [pod["metadata"]["name"], pod["status"]["phase"],
+                           ",".join(f"{k}={v}" for k, v in pod["metadata"]["labels"].items())],
+    "containers": lambda pod: [pod["metadata"]["name"], ",".join(c["name"] for c in pod["spec"]["containers"])],
+    "images": lambda pod: [pod["metadata"]["name"], ",".join(c["image"] for c in pod["spec"]["containers"])],
+    "node": lambda pod: [pod["metadata"]["name"], pod["status"]["phase"], pod["spec"]["nodeName"]],
+}
+
+
+def kubectl_text(body, view):
+    """What one kubectl run did: decode the whole LIST and print the view as text."""
+    pods = json.loads(body)["items"]
+    if view == "node":
+        pods = [pod for pod in pods if pod["spec"]["nodeName"] == NODE]
+    return "\n".join("\t".join(VIEWS[view](pod)) for pod in pods)
+
+
+def old_path(body):
+    rows = {}
+    for view in VIEWS:
+        text = kubectl_text(body, view)
+        rows[view] = [line.split("\t") for line in text.splitlines()]
+    # One row per container, as list_pod_images shows them.
+    rows["images"] = [[name, image] for name, images in rows["images"] for image in images.split(",")]
+    return rows
+
+
+def new_path(body):
+    items = kubermon.decode_json(body)["items"]
+    with kubermon.gc_paused():
+        records = [kubermon.PodRecord.from_pod(pod) for pod in items]
+    del items
+    return {
+        "labels": [kubermon.pod_label_row(pod) for pod in records],
+        "containers": [kubermon.pod_container_row(pod) for pod in records],
+        "images": [{"pod": pod.name, "container": name, "image": image}
+                   for pod in records for name, image in pod.containers],
+        "node": [kubermon.pod_row(pod) for pod in records if pod.node == NODE],
+    }
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pods", type=int, default=50000)
+    args = parser.parse_args()
+
+    body = json.dumps({"metadata": {"resourceVersion": "1"}, "items": list(synthetic_pods(args.pods))}).encode()
+    print(f"pods: {args.pods} (LIST body {len(body) / 2**20:.1f} MiB), views: {', '.join(VIEWS)}")
+    old, old_rows = timed(lambda: old_path(body))
+    print(f"old: {len(VIEWS)} kubectl runs, text split per view  {old * 1000:8.1f} ms")
+    decoders = [("json", json.loads)]
+    try:
+        import orjson
+        decoders.append(("orjson", orjson.loads))
+    except ImportError:
+        print("orjson is not installed; skipping it")
+    for name, loads in decoders:
+        kubermon._json_loads = loads
+        decode, _ = timed(lambda: kubermon.decode_json(body))
+        new, new_rows = timed(lambda: new_path(body))
+        assert {view: len(rows) for view, rows in new_rows.items()} == \
+            {view: len(rows) for view, rows in old_rows.items()}
+        print(f"new: one decode ({name:<6} {decode * 1000:6.1f} ms) + records + views  {new * 1000:8.1f} ms")
+    spawn, _ = timed(lambda: subprocess.run(["true"]), repeat=20)
+    print(f"process spawn (/bin/true, lower bound per kubectl run)  {spawn * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure per-keystroke latency of the fuzzy picker's matcher on many choices.
+
+Types each query one character at a time, as the picker does, and times
+the work a keystroke waits for: the search plus the first screenful of
+matches. Results are checked against a plain subsequence match.
+
+Usage: python benchmarks/bench_fuzzy.py [--choices 100000] [--rows 40]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kubermon  # noqa: E402
+
+WORDS = ["api", "web", "worker", "payments", "checkout", "search", "auth", "cache", "db", "queue"]
+QUERIES = ["pay", "apwo", "chk-auth", "worker-db-3f", "zzz", "checkout-auth-1f"]
+
+
+def synthetic_pod_names(count, seed=1):
+    rng = random.Random(seed)
+    return sorted(f"{rng.choice(WORDS)}-{rng.choice(WORDS)}-{rng.randrange(16**6):06x}-{rng.randrange(16**5):05x}"
+                  for _ in range(count))
+
+
+def is_subsequence(query, text):
+    chars = iter(text)
+    return all(c in chars for c in query)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--choices", type=int, default=100000)
+    parser.add_argument("--rows", type=int, default=40, help="matches needed for the first screen")
+    args = parser.parse_args()
+
+    choices = synthetic_pod_names(args.choices)
+    start = time.perf_counter()
+    index = kubermon.FuzzyIndex(choices)
+    print(f"choices: {len(choices)}, index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+    worst = 0.0
+    for query in QUERIES:
+        timings = []
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            matches = index.search(query[:end])
+            matches.fill(args.rows)
+            timings.append(time.perf_counter() - start)
+            # Finish the scan outside the timed section, as the picker does between keystrokes.
+            while not matches.done:
+                matches.step()
+        expected = [i for i, choice in enumerate(choices) if is_subsequence(query, choice)]
+        assert matches.items == expected, query
+        worst = max(worst, max(timings))
+        print(f"{query:<20} {len(matches.items):>7} matches   max {max(timings) * 1000:6.2f} ms/keystroke")
+    print(f"worst keystroke: {worst * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
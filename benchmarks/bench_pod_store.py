@@ -0,0 +1,88 @@
+"""Measure PodStore memory footprint and query latency on a synthetic cluster.
+
+Usage: python benchmarks/bench_pod_store.py [--pods 50000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kubermon  # noqa: E402
+
+PHASES = ["Running"] * 18 + ["Pending", "Failed"]
+
+
+def synthetic_pods(count, namespaces=400, nodes=500, images=200):
+    for i in range(count):
+        app = f"app-{i % 2000}"
+        yield {
+            "metadata": {
+                "name": f"{app}-{i:08x}",
+                "namespace": f"ns-{i % namespaces}",
+                "uid": f"uid-{i}",
+                "resourceVersion": str(i),
+                "creationTimestamp": "2024-01-01T00:00:00Z",
+                "labels": {"app": app, "tier": ("web", "api", "worker")[i % 3], "pod-template-hash": f"{i % 2000:x}"},
+                "ownerReferences": [{"kind": "ReplicaSet", "name": f"{app}-{i % 2000:x}"}],
+            },
+            "spec": {
+                "nodeName": f"node-{i % nodes}",
+                "containers": [{"name": "main", "image": f"registry.example.com/img-{i % images}:1.{i % 7}"},
+                               {"name": "sidecar", "image": "registry.example.com/proxy:2.0"}],
+            },
+            "status": {
+                "phase": PHASES[(i // 7) % len(PHASES)],
+                "containerStatuses": [{"name": "main", "ready": True, "restartCount": i % 3},
+                                      {"name": "sidecar", "ready": True, "restartCount": 0}],
+            },
+        }
+
+
+def timed(label, fn, repeat=200):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<40} {elapsed * 1000:9.3f} ms  ({len(result)} pods)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pods", type=int, default=50000)
+    args = parser.parse_args()
+
+    store = kubermon.PodStore()
+    start = time.perf_counter()
+    for pod in synthetic_pods(args.pods):
+        store.upsert(pod)
+    load = time.perf_counter() - start
+
+    # Measure the footprint separately: tracemalloc slows allocation down.
+    del store
+    gc.collect()
+    tracemalloc.start()
+    store = kubermon.PodStore()
+    for pod in synthetic_pods(args.pods):
+        store.upsert(pod)
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"pods: {len(store)}")
+    print(f"memory: {used / 2**20:.1f} MiB ({used / len(store):.0f} bytes/pod)")
+    print(f"incremental load: {load:.2f} s ({load / len(store) * 1e6:.1f} us/upsert)")
+    timed("namespace", lambda: store.query(namespace="ns-7"))
+    timed("node + namespace", lambda: store.query(namespace="ns-7", node="node-7"))
+    timed("namespace, phase != Running", lambda: store.query(namespace="ns-7", exclude_phase="Running"))
+    timed("cluster, phase != Running", lambda: store.query(exclude_phase="Running"), repeat=20)
+    timed("label app=app-7", lambda: store.query(labels={"app": "app-7"}))
+    timed("all pods (sorted)", lambda: store.query(), repeat=5)
+
+
+if __name__ == "__main__":
+    main()
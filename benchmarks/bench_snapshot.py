@@ -0,0 +1,54 @@
+"""Compare a cold pod LIST with a warm start from the on-disk snapshot.
+
+The cold path decodes a LIST response body and builds the PodStore from
+it, as the informer does on startup (network time not included). The warm
+path loads the same pods from a Snapshot file and restores the records.
+
+Usage: python benchmarks/bench_snapshot.py [--pods 50000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kubermon  # noqa: E402
+from bench_pod_store import synthetic_pods  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pods", type=int, default=50000)
+    args = parser.parse_args()
+
+    body = json.dumps({"metadata": {"resourceVersion": "1"}, "items": list(synthetic_pods(args.pods))}).encode()
+    start = time.perf_counter()
+    store = kubermon.PodStore()
+    store.replace(json.loads(body)["items"])
+    cold = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "snapshot.sqlite")
+        start = time.perf_counter()
+        records = tuple(record.dump() for record in store.records())
+        kubermon.Snapshot(path).save([("bench", "pods", None, "1", records)])
+        save = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        data, _, _ = kubermon.Snapshot(path).load("bench", "pods")
+        warm_store = kubermon.PodStore()
+        warm_store.replace_records([kubermon.PodRecord.restore(values) for values in data])
+        warm = time.perf_counter() - start
+
+    print(f"pods: {len(warm_store)} (LIST body {len(body) / 2**20:.1f} MiB, snapshot {size / 2**20:.1f} MiB)")
+    print(f"cold: decode LIST + build store  {cold * 1000:8.1f} ms")
+    print(f"warm: load snapshot + restore    {warm * 1000:8.1f} ms")
+    print(f"save snapshot                    {save * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Measure kubermon cold-start time for the interactive and non-interactive paths.
+
+Reports the slowest imports from ``python -X importtime`` and the wall-clock
+time of fresh interpreters for:
+
+  * import only (what every invocation pays),
+  * the interactive path up to the first menu (UI imports plus the banner),
+  * a scripted subcommand against a local stub API server (one round trip).
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--top 10]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KUBERMON = os.path.join(ROOT, "kubermon.py")
+UI_MODULES = ("inquirer", "pyfiglet", "termcolor")
+
+
+class _NamespaceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps({"metadata": {"resourceVersion": "1"}, "items": [
+            {"metadata": {"name": f"ns-{i}", "creationTimestamp": "2024-01-01T00:00:00Z"},
+             "status": {"phase": "Active"}} for i in range(50)]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def wall_clock(args, runs, env=None):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, check=True, env=env, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, min(times) * 1000
+
+
+def import_times(code, top):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.replace("import time:", "").split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _NamespaceHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    env = dict(os.environ, KUBERMON_API_SERVER=f"http://127.0.0.1:{server.server_address[1]}",
+               KUBECONFIG=os.devnull)
+
+    print("Slowest imports for `import kubermon` (cumulative / self, ms):")
+    for cumulative, own, name in import_times("import kubermon", args.top):
+        print(f"  {cumulative / 1000:8.1f} {own / 1000:8.1f}  {name}")
+
+    print(f"\nWall clock over {args.runs} runs (median / min, ms):")
+    scenarios = [
+        ("python -c pass (interpreter baseline)", ["-c", "pass"], None),
+        ("import kubermon", ["-c", "import kubermon"], None),
+        ("interactive: UI imports + banner", ["-c", "import kubermon; kubermon.inquirer.List; "
+                                             "kubermon.colored('', 'green'); kubermon.banner()"], None),
+        ("scripted: list-namespaces -o json", [KUBERMON, "list-namespaces", "-o", "json"], env),
+    ]
+    missing = [name for name in UI_MODULES if importlib.util.find_spec(name) is None]
+    for label, command, scenario_env in scenarios:
+        if label.startswith("interactive") and missing:
+            print(f"  {label:<40} skipped: {', '.join(missing)} not installed")
+            continue
+        median, best = wall_clock(command, args.runs, scenario_env)
+        print(f"  {label:<40} {median:8.1f} {best:8.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""A synthetic Kubernetes cluster behind a local stub API server, for benchmarks.
+
+The cluster is generated from a few sizes (namespaces, nodes, pods, events,
+log lines). Deployments hold five pods each, with one Service apiece; every
+50th pod is crash-looping and every 97th is Pending. The server answers the
+requests kubermon makes: LISTs with field and label selectors and
+limit/continue paging, GETs, logs, and watches, which are held open without
+events until their timeout. Mutations (PATCH, DELETE, evictions) succeed
+without changing anything, so runs are repeatable. Requests and bytes are
+counted for the harness, every request is logged in ``calls``, and
+``fail()`` makes chosen requests answer with an error status, for tests.
+
+Usage: python benchmarks/fake_cluster.py [--pods 5000] [--port 8001]
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CREATED = "2024-01-01T00:00:00Z"
+PODS_PER_DEPLOYMENT = 5
+
+
+class Cluster:
+    """The objects of a synthetic cluster, by API collection."""
+
+    def __init__(self, namespaces=20, nodes=50, pods=5000, events=2000, log_lines=1000):
+        self.log_lines = log_lines
+        self.namespaces = [f"ns-{i}" for i in range(namespaces)]
+        deployments = max(1, pods // PODS_PER_DEPLOYMENT)
+        self.objects = {
+            "namespaces": [self._namespace(name) for name in self.namespaces],
+            "nodes": [self._node(i) for i in range(nodes)],
+            "deployments": [self._deployment(d) for d in range(deployments)],
+            "services": [self._service(d) for d in range(deployments)],
+            "pods": [self._pod(i, nodes) for i in range(pods)],
+            "events": [self._event(i, pods) for i in range(events)],
+        }
+        self.by_name = {(kind, obj["metadata"].get("namespace"), obj["metadata"]["name"]): obj
+                        for kind, items in self.objects.items() for obj in items}
+        self.by_namespace = {}
+        for (kind, namespace, _), obj in self.by_name.items():
+            self.by_namespace.setdefault((kind, namespace), []).append(obj)
+
+    def items(self, kind, namespace=None):
+        if namespace is None:
+            return self.objects.get(kind, [])
+        return self.by_namespace.get((kind, namespace), [])
+
+    def namespace_of(self, deployment):
+        return self.namespaces[deployment % len(self.namespaces)]
+
+    @staticmethod
+    def _namespace(name):
+        return {"metadata": {"name": name, "creationTimestamp": CREATED, "resourceVersion": "1"},
+                "status": {"phase": "Active"}}
+
+    @staticmethod
+    def _node(i):
+        return {"metadata": {"name": f"node-{i}", "creationTimestamp": CREATED, "resourceVersion": "1",
+                             "labels": {"pool": "ab"[i % 2], "node-role.kubernetes.io/worker": ""}},
+                "spec": {},
+                "status": {"conditions": [{"type": "Ready", "status": "True"}],
+                           "nodeInfo": {"kubeletVersion": "v1.29.0"}}}
+
+    def _deployment(self, d):
+        labels = {"app": f"app-{d}"}
+        return {"metadata": {"name": f"app-{d}", "namespace": self.namespace_of(d), "generation": 1,
+                             "creationTimestamp": CREATED, "resourceVersion": "1", "labels": labels},
+                "spec": {"replicas": PODS_PER_DEPLOYMENT, "selector": {"matchLabels": labels},
+                         "template": {"metadata": {"labels": labels}, "spec": {"containers": [{"name": "app"}]}}},
+                "status": {"observedGeneration": 1, "replicas": PODS_PER_DEPLOYMENT,
+                           "updatedReplicas": PODS_PER_DEPLOYMENT, "readyReplicas": PODS_PER_DEPLOYMENT,
+                           "availableReplicas": PODS_PER_DEPLOYMENT,
+                           "conditions": [{"type": "Available", "status": "True"},
+                                          {"type": "Progressing", "status": "True",
+                                           "reason": "NewReplicaSetAvailable"}]}}
+
+    def _service(self, d):
+        return {"metadata": {"name": f"app-{d}", "namespace": self.namespace_of(d), "creationTimestamp": CREATED,
+                             "resourceVersion": "1"},
+                "spec": {"selector": {"app": f"app-{d}"}}}
+
+    def _pod(self, i, nodes):
+        d = i // PODS_PER_DEPLOYMENT
+        template_hash = f"{d:06x}"
+        running = {"running": {"startedAt": CREATED}}
+        phase, state, last, restarts = "Running", running, {}, 0
+        if i % 50 == 7:
+            state = {"waiting": {"reason": "CrashLoopBackOff", "message": "back-off restarting failed container"}}
+            last = {"terminated": {"reason": ("OOMKilled", "Error")[i % 2], "exitCode": (137, 1)[i % 2]}}
+            restarts = 12
+        elif i % 97 == 3:
+            phase, state = "Pending", {"waiting": {"reason": "ContainerCreating"}}
+        statuses = [{"name": "app", "ready": state is running, "restartCount": restarts, "state": state,
+                     "lastState": last, "imageID": f"registry.example.com/app-{d % 50}@sha256:{d % 50:064x}"},
+                    {"name": "proxy", "ready": True, "restartCount": 0, "state": running,
+                     "imageID": f"registry.example.com/proxy@sha256:{1:064x}"}]
+        return {"metadata": {"name": f"app-{d}-{template_hash}-{i:05x}", "namespace": self.namespace_of(d),
+                             "uid": f"pod-{i}", "resourceVersion": str(i + 1), "creationTimestamp": CREATED,
+                             "labels": {"app": f"app-{d}", "pod-template-hash": template_hash},
+                             "ownerReferences": [{"kind": "ReplicaSet", "name": f"app-{d}-{template_hash}",
+                                                  "controller": True}]},
+                "spec": {"nodeName": f"node-{i % nodes}" if phase == "Running" else "",
+                         "initContainers": [{"name": "init", "image": "registry.example.com/init:1.0"}],
+                         "containers": [{"name": "app", "image": f"registry.example.com/app-{d % 50}:1.{d % 3}"},
+                                        {"name": "proxy", "image": "registry.example.com/proxy:2.0"}]},
+                "status": {"phase": phase, "containerStatuses": statuses}}
+
+    def _event(self, i, pods):
+        pod = i % max(pods, 1)
+        d = pod // PODS_PER_DEPLOYMENT
+        warning = i % 4 == 0
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(1704067200 + i))
+        return {"metadata": {"name": f"event-{i}", "namespace": self.namespace_of(d), "uid": f"event-{i}",
+                             "resourceVersion": str(i + 1), "creationTimestamp": stamp},
+                "type": "Warning" if warning else "Normal", "reason": "BackOff" if warning else "Pulled",
+                "message": "Back-off restarting failed container" if warning else "Container image pulled",
+                "involvedObject": {"kind": "Pod", "name": f"app-{d}-{d:06x}-{pod:05x}",
+                                   "namespace": self.namespace_of(d)},
+                "count": 1 + i % 5, "firstTimestamp": stamp, "lastTimestamp": stamp}
+
+    def log(self, name, params):
+        lines = self.log_lines
+        if params.get("tailLines"):
+            lines = min(lines, int(params["tailLines"]))
+        stamps = params.get("timestamps") == "true"
+        out = []
+        for n in range(self.log_lines - lines, self.log_lines):
+            text = f"{name} handled request {n} in {n % 97} ms"
+            if n % 100 == 99:
+                text = f"ERROR {name} connection refused to db-{n % 7}:5432"
+            out.append(f"{CREATED[:-1]}.{n:09d}Z {text}" if stamps else text)
+        return "\n".join(out) + "\n" if out else ""
+
+
+def _field(obj, path):
+    for key in path.split("."):
+        obj = (obj or {}).get(key) if isinstance(obj, dict) else None
+    return "" if obj is None else str(obj)
+
+
+def _matches(obj, field_selector, label_selector):
+    for term in filter(None, field_selector.split(",")):
+        if "!=" in term:
+            key, value = term.split("!=", 1)
+            if _field(obj, key) == value:
+                return False
+        else:
+            key, value = term.replace("==", "=").split("=", 1)
+            if _field(obj, key) != value:
+                return False
+    labels = obj["metadata"].get("labels") or {}
+    for term in filter(None, label_selector.split(",")):
+        if "!=" in term:
+            key, value = term.split("!=", 1)
+            if labels.get(key) == value:
+                return False
+        elif "=" in term:
+            key, value = term.replace("==", "=").split("=", 1)
+            if labels.get(key) != value:
+                return False
+        elif term not in labels:
+            return False
+    return True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = (json.dumps(body) if content_type == "application/json" else body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(len(body))
+
+    def _not_found(self, path):
+        self._send(404, {"kind": "Status", "status": "Failure", "reason": "NotFound", "code": 404,
+                         "message": f"{path} not found"})
+
+    def _fault(self):
+        """Answer with the status injected by StubApiServer.fail(), if any; returns whether it did."""
+        path = urllib.parse.urlsplit(self.path).path
+        self.server.log(self.command, path)
+        status = self.server.fault(self.command, path)
+        if status is None:
+            return False
+        if self.command in ("POST", "PUT", "PATCH"):
+            self._read_body()
+        self._send(status, {"kind": "Status", "status": "Failure", "code": status,
+                            "message": f"injected {status} for {self.command} {path}"})
+        return True
+
+    def _route(self):
+        """Return (kind, namespace, name, subresource, params) of the request path."""
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        parts = [urllib.parse.unquote(part) for part in url.path.strip("/").split("/")]
+        parts = parts[2:] if parts[:1] == ["api"] else parts[3:]
+        namespace = None
+        if len(parts) > 2 and parts[0] == "namespaces":
+            namespace, parts = parts[1], parts[2:]
+        parts += [None] * (3 - len(parts))
+        return parts[0], namespace, parts[1], parts[2], params
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.server.count(0, len(body))
+        return body
+
+    def do_GET(self):
+        if self._fault():
+            return
+        kind, namespace, name, subresource, params = self._route()
+        cluster = self.server.cluster
+        if kind == "namespaces" and name and subresource is None and namespace is None:
+            obj = cluster.by_name.get((kind, None, name))
+            return self._send(200, obj) if obj else self._not_found(self.path)
+        if name is None:
+            if params.get("watch") in ("true", "1"):
+                return self._watch(float(params.get("timeoutSeconds") or 30))
+            return self._list(kind, namespace, params)
+        obj = cluster.by_name.get((kind, namespace, name))
+        if obj is None:
+            return self._not_found(self.path)
+        if subresource == "log":
+            return self._send(200, cluster.log(name, params), "text/plain")
+        self._send(200, obj)
+
+    def _list(self, kind, namespace, params):
+        items = [obj for obj in self.server.cluster.items(kind, namespace)
+                 if _matches(obj, params.get("fieldSelector", ""), params.get("labelSelector", ""))]
+        metadata = {"resourceVersion": "1"}
+        limit = int(params.get("limit") or 0)
+        if limit:
+            start = int(params.get("continue") or 0)
+            if start + limit < len(items):
+                metadata["continue"] = str(start + limit)
+            items = items[start:start + limit]
+        self._send(200, {"kind": "List", "metadata": metadata, "items": items})
+
+    def _watch(self, timeout):
+        """Hold the watch open without events until its timeout or the server stops."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.flush()
+        self.server.stopping.wait(timeout)
+        self.close_connection = True
+
+    def _mutate(self):
+        if self._fault():
+            return
+        body = self._read_body()
+        kind, namespace, name, subresource, _ = self._route()
+        obj = self.server.cluster.by_name.get((kind, namespace, name))
+        if obj is None:
+            return self._not_found(self.path)
+        if subresource == "eviction":
+            return self._send(201, json.loads(body or b"{}"))
+        self._send(200, obj)
+
+    do_PATCH = do_DELETE = do_POST = do_PUT = _mutate
+
+
+class StubApiServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer serving a Cluster, counting requests and bytes."""
+
+    daemon_threads = True
+
+    def __init__(self, cluster, port=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.cluster = cluster
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._faults = []
+        self.reset()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, sent, received=0):
+        with self._lock:
+            self.requests += 1 if sent else 0
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    def reset(self):
+        with self._lock:
+            self.requests = self.bytes_sent = self.bytes_received = 0
+            self.calls = []
+
+    def log(self, method, path):
+        with self._lock:
+            self.calls.append((method, path))
+
+    def fail(self, method, path, status, times=None):
+        """Answer ``method`` requests for paths starting with ``path`` with ``status``, ``times`` times (or always)."""
+        with self._lock:
+            self._faults.append([method, path, status, times])
+
+    def fault(self, method, path):
+        with self._lock:
+            for fault in self._faults:
+                if fault[0] == method and path.startswith(fault[1]) and fault[3] != 0:
+                    if fault[3] is not None:
+                        fault[3] -= 1
+                    return fault[2]
+        return None
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.shutdown()
+
+
+def add_size_arguments(parser):
+    parser.add_argument("--namespaces", type=int, default=20)
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--pods", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--log-lines", type=int, default=1000, help="lines in every container log")
+
+
+def cluster_from_args(args):
+    return Cluster(args.namespaces, args.nodes, args.pods, args.events, args.log_lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_size_arguments(parser)
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+    server = StubApiServer(cluster_from_args(args), args.port)
+    print(f"Serving {args.pods} pods on {server.url} (KUBERMON_API_SERVER={server.url}); Ctrl-C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
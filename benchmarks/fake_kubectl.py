@@ -0,0 +1,108 @@
+"""A kubectl stand-in that forwards kubermon's kubectl calls to the stub API server.
+
+It implements just what KubectlBackend and the menu run: ``get/create/
+replace/delete --raw PATH``, ``patch RESOURCE NAME``, and the ``config``
+subcommands, against the server in ``FAKE_KUBECTL_SERVER``. Every run
+appends a line to ``FAKE_KUBECTL_LOG`` so the harness can count the
+subprocesses a command spawned. Responses are streamed, so watches and
+followed logs behave like the real thing.
+
+bench_commands.py installs it on PATH as ``kubectl``.
+"""
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+CONTEXT = "bench"
+
+
+def kubeconfig(server):
+    return {"apiVersion": "v1", "kind": "Config", "current-context": CONTEXT,
+            "clusters": [{"name": CONTEXT, "cluster": {"server": server}}],
+            "users": [{"name": CONTEXT, "user": {"token": "bench"}}],
+            "contexts": [{"name": CONTEXT, "context": {"cluster": CONTEXT, "user": CONTEXT, "namespace": "ns-0"}}]}
+
+
+def option(args, name):
+    """Remove ``name VALUE`` from ``args`` and return VALUE (or None)."""
+    if name in args:
+        index = args.index(name)
+        value = args[index + 1]
+        del args[index:index + 2]
+        return value
+    return None
+
+
+def config(server, args):
+    if args[:1] == ["current-context"]:
+        print(CONTEXT)
+    elif args[:1] == ["get-contexts"]:
+        if "-o" in args:
+            print(CONTEXT)
+        else:
+            print("CURRENT   NAME    CLUSTER   AUTHINFO   NAMESPACE")
+            print(f"*         {CONTEXT}   {CONTEXT}     {CONTEXT}      ns-0")
+    elif args[:1] == ["use-context"]:
+        print(f'Switched to context "{args[1]}".')
+    elif args[:1] == ["view"]:
+        print(json.dumps(kubeconfig(server)))
+    else:
+        sys.exit(f"fake kubectl: unsupported config command {args}")
+
+
+def patch_path(resource, name, namespace):
+    """Map ``deployments.v1.apps``/``nodes`` back to an API path."""
+    plural, _, group_version = resource.partition(".")
+    if group_version:
+        version, _, group = group_version.partition(".")
+        prefix = f"/apis/{group}/{version}"
+    else:
+        prefix = "/api/v1"
+    return f"{prefix}/namespaces/{namespace}/{plural}/{name}" if namespace else f"{prefix}/{plural}/{name}"
+
+
+def request(server, method, path, body=None, content_type="application/json"):
+    req = urllib.request.Request(server + path, data=body, method=method, headers={"Content-Type": content_type})
+    try:
+        response = urllib.request.urlopen(req)
+    except urllib.error.HTTPError as e:
+        status = json.loads(e.read() or b"{}")
+        sys.stderr.write(f"Error from server ({status.get('reason', 'InternalError')}): {status.get('message', '')}\n")
+        sys.exit(1)
+    out = sys.stdout.buffer
+    while True:
+        chunk = response.read1(65536)
+        if not chunk:
+            break
+        out.write(chunk)
+        out.flush()
+
+
+def main():
+    server = os.environ["FAKE_KUBECTL_SERVER"]
+    args = sys.argv[1:]
+    if os.environ.get("FAKE_KUBECTL_LOG"):
+        with open(os.environ["FAKE_KUBECTL_LOG"], "a") as log:
+            log.write(" ".join(args) + "\n")
+    option(args, "--context")
+    if args[:1] == ["config"]:
+        return config(server, args[1:])
+    if "--raw" in args:
+        path = option(args, "--raw")
+        method = {"get": "GET", "create": "POST", "replace": "PUT", "delete": "DELETE"}[args[0]]
+        body = sys.stdin.buffer.read() if method in ("POST", "PUT") else None
+        return request(server, method, path, body)
+    if args[:1] == ["patch"]:
+        namespace = option(args, "-n")
+        patch_type = option(args, "--type") or "strategic"
+        body = option(args, "-p").encode()
+        content_type = {"merge": "application/merge-patch+json", "json": "application/json-patch+json"}.get(
+            patch_type, "application/strategic-merge-patch+json")
+        return request(server, "PATCH", patch_path(args[1], args[2], namespace), body, content_type)
+    sys.exit(f"fake kubectl: unsupported command {args}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,852 +1,4822 @@
-import subprocess
-import sys
-import pyfiglet
-import inquirer
-import os
-from termcolor import colored
-
-
-def run_kubectl_command(command):
-    """Function to execute kubectl commands."""
-    try:
-        result = subprocess.run(command, shell=True, check=True, text=True, capture_output=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing command: {e}")
-        sys.exit(1)
-
-
-def show_commands():
-    """Function to display the list of available commands."""
-    commands = [
-        "get-nodes",
-        "get-contexts",
-        "select-context",
-        "list-namespaces",
-        "not-running-pods",
-        "delete-pods",
-        "list-deployments",
-        "check-deployment-status",
-        "cordon-nodes",
-        "list-pods",
-        "list-pods-on-nodes",
-        "image-version",
-        "restart-deployment",
-        "check-crash-log",
-        "events",
-        "all-events",
-        "list-pod-with-labels",
-        "list-containers",
-        "container-logs",
-        "deploy-logs",
-        "services-logs"
-    ]
-    return commands
-
-
-def clear_screen():
-    """Clear the terminal screen."""
-    os.system("clear")  # On Linux/MacOS
-    # os.system("cls")  # On Windows
-
-def get_contexts():
-    contexts = run_kubectl_command("kubectl config get-contexts")
-    lines = contexts.splitlines()
-
-    for line in lines:
-        if '*' in line:
-            print(colored(line, 'green'))
-        else:
-            print(line)
-
-def select_context():
-    """Function to select and switch to a Kubernetes context."""
-    contexts = run_kubectl_command("kubectl config get-contexts -o name").splitlines()
-    if not contexts:
-        print("No contexts found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "context",
-            message="Select a Kubernetes context:",
-            choices=contexts,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No context selected.")
-        return
-
-    selected_context = answers.get('context')
-    if selected_context:
-        print(f"Switching to context: {selected_context}")
-        switch_command = f"kubectl config use-context {selected_context}"
-        result = run_kubectl_command(switch_command)
-        print(f"{result} DONE...")
-    else:
-        print("No context selected.")
-
-def list_not_running_pods():
-    """Function to list all pods not in the Running state in a specific namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a Kubernetes namespace:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected.")
-        return
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Listing pods not in the Running state in namespace: {selected_namespace}")
-        pods_command = f"kubectl get pods -n {selected_namespace} --field-selector=status.phase!=Running"
-        pods_output = run_kubectl_command(pods_command)
-        print(pods_output)
-    else:
-        print("No namespace selected.")
-
-def delete_pods():
-    """Function to delete pods not in the Running state in a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a Kubernetes namespace to delete pods not in Running state:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected.")
-        return
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Deleting pods not in the Running state in namespace: {selected_namespace}")
-        delete_command = f"kubectl delete pods --namespace {selected_namespace} --field-selector=status.phase!=Running --grace-period=0 --force"
-        delete_output = run_kubectl_command(delete_command)
-        if delete_output != "No resources found":
-            print("Deletion complete.")
-            print(delete_output)
-        print(delete_output)
-    else:
-        print("No namespace selected.")
-
-def list_deployments():
-    """Function to list deployments in a specific namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a Kubernetes namespace to list deployments:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected.")
-        return
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Listing deployments in namespace: {selected_namespace}")
-        deployments_command = f"kubectl get deployments -n {selected_namespace}"
-        deployments_output = run_kubectl_command(deployments_command)
-        if deployments_output == "":
-            print(f"{colored('No resources found', 'red')} in default namespace.")
-            print(deployments_output)
-        print(deployments_output)
-    else:
-        print("No namespace selected.")
-
-def check_deployment_status():
-    """Function to check the rollout status of a deployment in a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a Kubernetes namespace:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected.")
-        return
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Select a deployment in namespace: {selected_namespace}")
-        deployments = run_kubectl_command(
-            f"kubectl get deployments -n {selected_namespace} --no-headers -o custom-columns=:metadata.name").splitlines()
-
-        if not deployments:
-            print(f"No deployments found in namespace {selected_namespace}.")
-            return
-
-        deployment_question = [
-            inquirer.List(
-                "deployment",
-                message="Select a deployment:",
-                choices=deployments,
-                carousel=True
-            ),
-        ]
-
-        deployment_answers = inquirer.prompt(deployment_question)
-        if deployment_answers is None:
-            print("No deployment selected.")
-            return
-
-        selected_deployment = deployment_answers.get('deployment')
-        # Check the rollout status...
-        if selected_deployment:
-            print(f"Checking rollout status of deployment: {selected_deployment} in namespace: {selected_namespace}")
-            rollout_command = f"kubectl rollout status deployment/{selected_deployment} -n {selected_namespace}"
-            rollout_output = run_kubectl_command(rollout_command)
-            print(rollout_output)
-        else:
-            print("No deployment selected.")
-    else:
-        print("No namespace selected.")
-
-def cordon_node():
-    """Function to cordon a Kubernetes node."""
-    nodes = run_kubectl_command("kubectl get nodes --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not nodes:
-        print("No nodes found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "node",
-            message="Select a node to cordon:",
-            choices=nodes,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No node selected.")
-        return
-
-    selected_node = answers.get('node')
-    # Cordon the selected node
-    if selected_node:
-        print(f"Cording node: {selected_node}")
-        cordon_command = f"kubectl cordon {selected_node}"
-        cordon_output = run_kubectl_command(cordon_command)
-        print(cordon_output)
-    else:
-        print("No node selected.")
-
-def list_pods_on_node():
-    """Function to list pods on a selected node in a specific namespace."""
-    nodes = run_kubectl_command("kubectl get nodes --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not nodes:
-        print("No nodes found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "node",
-            message="Select a node to list pods:",
-            choices=nodes,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No node selected.")
-        return
-
-    selected_node = answers.get('node')
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    namespace_question = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    namespace_answers = inquirer.prompt(namespace_question)
-    if namespace_answers is None:
-        print("No namespace selected.")
-        return
-
-    selected_namespace = namespace_answers.get('namespace')
-    if selected_node and selected_namespace:
-        print(f"Listing pods on node: {selected_node} in namespace: {selected_namespace}")
-        pods_command = f"kubectl get pods --field-selector spec.nodeName={selected_node} -n {selected_namespace}"
-        pods_output = run_kubectl_command(pods_command)
-        print(pods_output)
-    else:
-        print("No node or namespace selected.")
-
-def list_pods_on_all_nodes():
-    """Function to list all pods across all nodes."""
-    command = "kubectl get pod -o=custom-columns=NAME:.metadata.name,STATUS:.status.phase,NODE:.spec.nodeName --all-namespaces"
-    output = run_kubectl_command(command)
-    print("Listing all pods across all nodes:")
-    print(output)
-
-def list_pod_images():
-    """Function to list pod images in a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to list pod images:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected.")
-        return
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Listing all pod images in namespace: {selected_namespace}")
-        command = f"kubectl get pods -n {selected_namespace} -o jsonpath='{{range .items[*]}}{{.metadata.name}}{{\"\\t\"}}{{range .spec.containers[*]}}{{.image}}{{\"\\n\"}}{{end}}{{end}}'"
-        pods_output = run_kubectl_command(command)
-
-        if pods_output:
-            print("Pod Name\t\t\t\t\t\t\tImage")
-            # Formatting the output to resemble a table (TODO)
-            for line in pods_output.splitlines():
-                columns = line.split("\t")
-                print(f"{columns[0]:<40} {columns[1]}")
-        else:
-            print(f"No pods found in namespace: {selected_namespace}")
-    else:
-        print("No namespace selected.")
-
-def restart_deployment():
-    """Function to restart a deployment in a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to restart a deployment:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected.")
-        return
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Select a deployment to restart in namespace: {selected_namespace}")
-        command = f"kubectl get deployments -n {selected_namespace} --no-headers -o custom-columns=:metadata.name"
-        deployments = run_kubectl_command(command).splitlines()
-
-        if not deployments:
-            print(f"No deployments found in namespace: {selected_namespace}")
-            return
-
-        deployment_question = [
-            inquirer.List(
-                "deployment",
-                message=f"Select a deployment to restart in namespace: {selected_namespace}",
-                choices=deployments,
-                carousel=True
-            ),
-        ]
-
-        deployment_answers = inquirer.prompt(deployment_question)
-        if deployment_answers is None:
-            print("No deployment selected.")
-            return
-
-        selected_deployment = deployment_answers.get('deployment')
-        if selected_deployment:
-            print(f"Restarting deployment: {selected_deployment} in namespace: {selected_namespace}")
-            restart_command = f"kubectl rollout restart deployment/{selected_deployment} -n {selected_namespace}"
-            run_kubectl_command(restart_command)
-            print(f"Deployment {selected_deployment} in namespace {selected_namespace} has been restarted.")
-        else:
-            print("No deployment selected.")
-    else:
-        print("No namespace selected.")
-
-
-def check_crash_log():
-    """Function to check logs of a crashed pod."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to check logs of a crashed pod:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Select a crashed pod in namespace: {selected_namespace}")
-        command = f"kubectl get pods -n {selected_namespace} --field-selector=status.phase!=Running --no-headers -o custom-columns=:metadata.name"
-        crashed_pods = run_kubectl_command(command).splitlines()
-        if not crashed_pods:
-            print(f"No crashed pods found in namespace: {selected_namespace}")
-            return
-
-        pod_question = [
-            inquirer.List(
-                "pod",
-                message=f"Select a crashed pod in namespace: {selected_namespace}",
-                choices=crashed_pods,
-                carousel=True
-            ),
-        ]
-
-        pod_answers = inquirer.prompt(pod_question)
-        if pod_answers is None:
-            print("No pod selected. Exiting.")
-            sys.exit(1)
-
-        selected_pod = pod_answers.get('pod')
-        if selected_pod:
-            print(f"Fetching logs for pod: {selected_pod} in namespace: {selected_namespace}")
-            log_command = f"kubectl logs {selected_pod} -n {selected_namespace} -p"
-            pod_logs = run_kubectl_command(log_command)
-            print(pod_logs)
-        else:
-            print("No pod selected.")
-    else:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-def get_events():
-    """Function to fetch events for a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to get events:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Fetching events for namespace: {selected_namespace}")
-        command = f"kubectl get events -n {selected_namespace} --sort-by='.lastTimestamp' -o wide"
-        events_output = run_kubectl_command(command)
-
-        if events_output:
-            print(events_output)
-        else:
-            print(f"No events found in namespace: {selected_namespace}")
-    else:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-def get_all_events():
-    """Function to fetch all events across all namespaces."""
-    print("Fetching all events across all namespaces...")
-    command = "kubectl get events -A --sort-by='.lastTimestamp' -o wide"
-    events_output = run_kubectl_command(command)
-    if events_output:
-        print(events_output)
-    else:
-        print("No events found.")
-
-def list_pods_with_labels():
-    """Function to list pods with labels in a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to list pods with labels:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Listing pods with labels in namespace: {selected_namespace}")
-        command = f"kubectl get pods --show-labels -n {selected_namespace}"
-        pods_with_labels = run_kubectl_command(command)
-        if pods_with_labels:
-            print(pods_with_labels)
-        else:
-            print(f"No pods found in namespace: {selected_namespace}")
-    else:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-def list_containers():
-    """Function to list all containers (init and non-init) in pods within a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to list all containers in pods:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-    selected_namespace = answers.get('namespace')
-    if selected_namespace:
-        print(f"Listing all containers (init and non-init) in pods within namespace: {selected_namespace}")
-        command = f"kubectl get pod -o='custom-columns=NAME:.metadata.name,INIT-CONTAINERS:.spec.initContainers[].name,CONTAINERS:.spec.containers[].name' -n {selected_namespace}"
-        containers_output = run_kubectl_command(command)
-        if containers_output:
-            print(containers_output)
-        else:
-            print(f"No containers found in namespace: {selected_namespace}")
-    else:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-def container_logs():
-    """Function to fetch logs for a specific container in a pod within a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to get logs for a specific container in a pod:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-    selected_namespace = answers.get('namespace')
-    print(f"Select a pod in namespace {selected_namespace}:")
-    pods = run_kubectl_command(
-        f"kubectl get pods -n {selected_namespace} --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not pods:
-        print(f"No pods found in namespace {selected_namespace}.")
-        return
-
-    pod_question = [
-        inquirer.List(
-            "pod",
-            message=f"Select a pod in namespace {selected_namespace}:",
-            choices=pods,
-            carousel=True
-        ),
-    ]
-
-    pod_answers = inquirer.prompt(pod_question)
-    if pod_answers is None:
-        print("No pod selected. Exiting.")
-        sys.exit(1)
-
-    selected_pod = pod_answers.get('pod')
-    print(f"Select a container in pod {selected_pod}:")
-    containers = run_kubectl_command(
-        f"kubectl get pod {selected_pod} -n {selected_namespace} -o jsonpath="+'{.spec.containers[*].name}').split()
-    if not containers:
-        print(f"No containers found in pod {selected_pod}.")
-        return
-
-    container_question = [
-        inquirer.List(
-            "container",
-            message=f"Select a container in pod {selected_pod}:",
-            choices=containers,
-            carousel=True
-        ),
-    ]
-
-    container_answers = inquirer.prompt(container_question)
-    if container_answers is None:
-        print("No container selected. Exiting.")
-        sys.exit(1)
-
-    selected_container = container_answers.get('container')
-    print(
-        f"Fetching logs for container {selected_container} in pod {selected_pod} in namespace {selected_namespace}...")
-    logs = run_kubectl_command(f"kubectl logs {selected_pod} -n {selected_namespace} -c {selected_container}")
-    if logs:
-        print(logs)
-    else:
-        print(f"No logs found for container {selected_container} in pod {selected_pod}.")
-
-def deploy_logs():
-    """Function to fetch logs for a specific deployment within a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to get logs for a deployment:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-    selected_namespace = answers.get('namespace')
-    print(f"Select a deployment in namespace {selected_namespace}:")
-    deployments = run_kubectl_command(
-        f"kubectl get deployments -n {selected_namespace} --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not deployments:
-        print(f"No deployments found in namespace {selected_namespace}.")
-        return
-
-    deployment_question = [
-        inquirer.List(
-            "deployment",
-            message=f"Select a deployment in namespace {selected_namespace}:",
-            choices=deployments,
-            carousel=True
-        ),
-    ]
-
-    deployment_answers = inquirer.prompt(deployment_question)
-    if deployment_answers is None:
-        print("No deployment selected. Exiting.")
-        sys.exit(1)
-
-    selected_deployment = deployment_answers.get('deployment')
-    print(f"Fetching logs for deployment {selected_deployment} in namespace {selected_namespace}...")
-    logs = run_kubectl_command(f"kubectl logs deployment/{selected_deployment} -n {selected_namespace}")
-
-    if logs:
-        print(logs)
-    else:
-        print(f"No logs found for deployment {selected_deployment} in namespace {selected_namespace}.")
-
-def services_logs():
-    """Function to fetch logs for a specific service within a selected namespace."""
-    namespaces = run_kubectl_command("kubectl get ns --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not namespaces:
-        print("No namespaces found.")
-        return
-
-    questions = [
-        inquirer.List(
-            "namespace",
-            message="Select a namespace to get logs for a service:",
-            choices=namespaces,
-            carousel=True
-        ),
-    ]
-
-    answers = inquirer.prompt(questions)
-    if answers is None:
-        print("No namespace selected. Exiting.")
-        sys.exit(1)
-
-    selected_namespace = answers.get('namespace')
-    print(f"Select a service in namespace {selected_namespace}:")
-    services = run_kubectl_command(
-        f"kubectl get services -n {selected_namespace} --no-headers -o custom-columns=:metadata.name").splitlines()
-    if not services:
-        print(f"No services found in namespace {selected_namespace}.")
-        return
-
-    service_question = [
-        inquirer.List(
-            "service",
-            message=f"Select a service in namespace {selected_namespace}:",
-            choices=services,
-            carousel=True
-        ),
-    ]
-
-    service_answers = inquirer.prompt(service_question)
-    if service_answers is None:
-        print("No service selected. Exiting.")
-        sys.exit(1)
-
-    selected_service = service_answers.get('service')
-    print(f"Fetching logs for service {selected_service} in namespace {selected_namespace}...")
-    logs = run_kubectl_command(f"kubectl logs service/{selected_service} -n {selected_namespace}")
-    if logs:
-        print(logs)
-    else:
-        print(f"No logs found for service {selected_service} in namespace {selected_namespace}.")
-
-def main():
-    while True:
-        # Clear screen and show command list
-        clear_screen()
-        # Print the Welcome KUBERMON message
-        ascii_art = pyfiglet.figlet_format("KUBERMON")
-        print(ascii_art)
-        print("Welcome to Kubemon! (v1.0.0)")
-        commands = show_commands()
-
-        # Use inquirer module to select a command with arrow keys
-        command_list = [
-            inquirer.List(
-                "command",
-                message="Please select a command:",
-                choices=commands,
-                carousel=True
-            ),
-        ]
-        get_command_list = inquirer.prompt(command_list)
-        if get_command_list is None:
-            print("No selection made. Exiting.")
-            break
-
-        # Access the selected command
-        command = get_command_list.get('command')
-        if command == "get-nodes":
-            print(run_kubectl_command("kubectl get nodes"))
-        elif command == "get-contexts":
-            get_contexts()
-        elif command == "select-context":
-            select_context()
-        elif command == "list-namespaces":
-            print(run_kubectl_command("kubectl get namespaces"))
-        elif command == "not-running-pods":
-            list_not_running_pods()
-        elif command == "delete-pods":
-            delete_pods()
-        elif command == "list-deployments":
-            list_deployments()
-        elif command == "check-deployment-status":
-            check_deployment_status()
-        elif command == "cordon-nodes":
-            cordon_node()
-        elif command == "list-pods":
-            list_pods_on_node()
-        elif command == "list-pods-on-nodes":
-            list_pods_on_all_nodes()
-        elif command == "image-version":
-            list_pod_images()
-        elif command == "restart-deployment":
-            restart_deployment()
-        elif command == "check-crash-log":
-            check_crash_log()
-        elif command == "events":
-            get_events()
-        elif command == "all-events":
-            get_all_events()
-        elif command == "list-pod-with-labels":
-            list_pods_with_labels()
-        elif command == "list-containers":
-            list_containers()
-        elif command == "container-logs":
-            container_logs()
-        elif command == "deploy-logs":
-            deploy_logs()
-        elif command == "services-logs":
-            services_logs()
-        else:
-            print(f"Unknown command: {command}")
-        # wants to continue or exit
-        continue_prompt = input("\nDo you want to run another command? (y/n): ").strip().lower()
-        if continue_prompt != 'y':
-            print("Exiting Kubemon.")
-            break
-
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+import atexit
+import base64
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import copy
+import datetime
+import fnmatch
+import functools
+import gc
+import hashlib
+import heapq
+import http.client
+import importlib
+import itertools
+import json
+import marshal
+import os
+import random
+import re
+import socket
+import ssl
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+
+# Seconds a cached namespace/node/deployment list stays fresh.
+CACHE_TTL = float(os.environ.get("KUBERMON_CACHE_TTL", "30"))
+# Cluster access: "auto" (API client with kubectl fallback), "api" or "kubectl".
+KUBE_BACKEND = os.environ.get("KUBERMON_BACKEND", "auto")
+# JSON decoder for API responses: "auto" (orjson when installed, else json), "orjson" or "json".
+KUBE_JSON = os.environ.get("KUBERMON_JSON", "auto")
+# Talk to this API server URL directly instead of the kubeconfig cluster (e.g. a local fake).
+KUBE_API_SERVER = os.environ.get("KUBERMON_API_SERVER")
+REQUEST_TIMEOUT = float(os.environ.get("KUBERMON_REQUEST_TIMEOUT", "30"))
+# Idle keep-alive connections kept per API server.
+POOL_SIZE = int(os.environ.get("KUBERMON_POOL_SIZE", "8"))
+# Upper bound on concurrent API requests when a query fans out over namespaces.
+MAX_INFLIGHT = int(os.environ.get("KUBERMON_MAX_INFLIGHT", "8"))
+# Default request rate (per second) of bulk operations such as mass pod deletion.
+BULK_QPS = float(os.environ.get("KUBERMON_BULK_QPS", "20"))
+# Events remembered by the event tail to de-duplicate repeats.
+EVENT_WINDOW = int(os.environ.get("KUBERMON_EVENT_WINDOW", "5000"))
+# Objects per LIST page (limit/continue) for listings streamed to the terminal.
+PAGE_SIZE = int(os.environ.get("KUBERMON_PAGE_SIZE", "500"))
+# Lines buffered between the log reader and the terminal.
+LOG_BUFFER_LINES = int(os.environ.get("KUBERMON_LOG_BUFFER_LINES", "10000"))
+# Serve pod queries from a watch-fed local store instead of a LIST per query.
+KUBE_WATCH = os.environ.get("KUBERMON_WATCH", "1") != "0"
+# Write call latencies, counts and cache hit rates here at exit: Prometheus text for *.prom, else JSON.
+METRICS_PATH = os.environ.get("KUBERMON_METRICS")
+# Profile the session into this file: pyinstrument HTML for *.html, else cProfile stats.
+PROFILE_PATH = os.environ.get("KUBERMON_PROFILE")
+# File holding the last-known lists of the interactive session for instant warm starts ("" disables it).
+SNAPSHOT_PATH = os.environ.get("KUBERMON_SNAPSHOT", os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "kubermon", "snapshot.sqlite"))
+
+
+class _LazyModule:
+    """Module proxy that imports the real module on first attribute access.
+
+    The interactive UI libraries are slow to import; scripted calls never
+    touch them, so they only pay for them when the menu is used.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+inquirer = _LazyModule("inquirer")
+
+
+def colored(text, color):
+    """Color text with termcolor, imported on first use."""
+    from termcolor import colored as termcolor_colored
+    return termcolor_colored(text, color)
+
+
+@functools.lru_cache(maxsize=None)
+def banner():
+    """Return the KUBERMON ascii art, rendered once per session."""
+    import pyfiglet
+    return pyfiglet.figlet_format("KUBERMON")
+
+
+def run_kubectl_command(command):
+    """Function to execute kubectl commands."""
+    operation = " ".join(command.split()[:3])
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(command, shell=True, check=True, text=True, capture_output=True)
+        metrics.observe_request("kubectl", operation, time.perf_counter() - start, len(result.stdout))
+        return result.stdout
+    except subprocess.CalledProcessError as e:
+        metrics.observe_request("kubectl", operation, time.perf_counter() - start, error=True)
+        print(f"Error executing command: {e}")
+        sys.exit(1)
+
+
+_json_loads = None
+_gc_pauses = 0
+_gc_was_enabled = True
+_gc_lock = threading.Lock()
+
+# Bodies above this size are decoded with the cyclic garbage collector paused.
+GC_PAUSE_BYTES = 1 << 20
+
+
+@contextlib.contextmanager
+def gc_paused():
+    """Pause the cyclic garbage collector, e.g. while a large LIST is decoded.
+
+    Decoding allocates millions of dicts and lists, none of them garbage, and
+    each allocation burst triggers a collection that rescans all of them: on a
+    50,000-pod LIST that is more than half of the decode time. Overlapping
+    pauses from several threads re-enable the collector when the last ends.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if not _gc_pauses:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if not _gc_pauses and _gc_was_enabled:
+                gc.enable()
+
+
+def decode_json(data):
+    """Decode a JSON response body (str or bytes) with the decoder KUBERMON_JSON selects.
+
+    orjson decodes large LIST responses faster than the json module and
+    returns the same dicts and lists; it is optional.
+    """
+    global _json_loads
+    if _json_loads is None:
+        if KUBE_JSON == "json":
+            _json_loads = json.loads
+        else:
+            try:
+                _json_loads = importlib.import_module("orjson").loads
+            except ImportError:
+                if KUBE_JSON == "orjson":
+                    print("KUBERMON_JSON=orjson requires the orjson package (pip install orjson).")
+                    sys.exit(1)
+                _json_loads = json.loads
+    if len(data) < GC_PAUSE_BYTES:
+        return _json_loads(data)
+    with gc_paused():
+        return _json_loads(data)
+
+
+class KubeApiError(Exception):
+    """Raised when a request to the Kubernetes API fails."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status} {message}" if status else message)
+        self.status = status
+        self.message = message
+
+
+class KubeConfigError(Exception):
+    """Raised when the kubeconfig cannot be used by the API backend."""
+
+
+# API path prefix, plural name and namespacing of the resources kubermon uses.
+RESOURCES = {
+    "namespaces": ("/api/v1", "namespaces", False),
+    "nodes": ("/api/v1", "nodes", False),
+    "pods": ("/api/v1", "pods", True),
+    "services": ("/api/v1", "services", True),
+    "events": ("/api/v1", "events", True),
+    "deployments": ("/apis/apps/v1", "deployments", True),
+    "replicasets": ("/apis/apps/v1", "replicasets", True),
+}
+RESOURCE_ALIASES = {"ns": "namespaces", "node": "nodes", "pod": "pods", "svc": "services",
+                    "deploy": "deployments", "deployment": "deployments"}
+
+# Reasons printed by kubectl ("Error from server (NotFound): ...") and their HTTP status.
+_REASON_STATUS = {
+    "BadRequest": 400, "Unauthorized": 401, "Forbidden": 403, "NotFound": 404,
+    "MethodNotAllowed": 405, "AlreadyExists": 409, "Conflict": 409, "Gone": 410,
+    "Expired": 410, "Invalid": 422, "TooManyRequests": 429, "InternalError": 500,
+    "ServiceUnavailable": 503, "Timeout": 504,
+}
+
+
+def resource_path(kind, namespace=None, name=None, subresource=None):
+    """Build the API path of a resource collection, object or subresource."""
+    prefix, plural, namespaced = RESOURCES[RESOURCE_ALIASES.get(kind, kind)]
+    path = prefix
+    if namespaced and namespace:
+        path += f"/namespaces/{urllib.parse.quote(namespace)}"
+    path += f"/{plural}"
+    if name:
+        path += f"/{urllib.parse.quote(name)}"
+    if subresource:
+        path += f"/{subresource}"
+    return path
+
+
+def _query(params):
+    params = {k: v for k, v in (params or {}).items() if v is not None and v != ""}
+    return "?" + urllib.parse.urlencode(params) if params else ""
+
+
+class _LineStream:
+    """Iterator over the lines of a streamed response (watch or log follow)."""
+
+    def __init__(self, readline, close):
+        self._readline = readline
+        self._close = close
+        self.bytes = 0
+        # Called with the bytes read when the stream is closed (set by instrumented()).
+        self.on_close = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            line = self._readline()
+        except (http.client.HTTPException, OSError, ValueError, AttributeError) as e:
+            if self._close is None:
+                # Closed from another thread while a read was in progress.
+                raise StopIteration
+            self.close()
+            raise KubeApiError(0, f"Stream interrupted: {e}")
+        if not line:
+            self.close()
+            raise StopIteration
+        self.bytes += len(line)
+        return line.decode("utf-8", "replace") if isinstance(line, bytes) else line
+
+    def close(self):
+        if self._close:
+            self._close()
+            self._close = None
+            if self.on_close is not None:
+                self.on_close(self.bytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def request_operation(method, path, params=None):
+    """Label a request by verb and resource, e.g. "GET pods", "GET pods/log", "WATCH deployments"."""
+    parts = urllib.parse.urlsplit(path).path.strip("/").split("/")
+    parts = parts[2:] if parts[:1] == ["api"] else parts[3:]
+    if len(parts) > 2 and parts[0] == "namespaces":
+        parts = parts[2:]
+    resource = "/".join(parts[:1] + parts[2:3])
+    if method == "GET" and (params or {}).get("watch") in ("true", "1", True):
+        method = "WATCH"
+    return f"{method} {resource}"
+
+
+class Metrics:
+    """Latency histograms and counters of the cluster calls of one session.
+
+    Every backend request and run_kubectl_command call is recorded per
+    (context, backend, operation) with its latency, errors and response
+    bytes, and counted against the menu action or subcommand that made it.
+    Cache lookups are counted per cache and result. Nothing is recorded
+    unless ``enabled`` (KUBERMON_METRICS is set); export() writes JSON or,
+    for a .prom path, the Prometheus text format for a textfile collector.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.time()
+        self.action = None
+        self._action_started = None
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.actions = {}
+        self.action_requests = collections.Counter()
+        self.cache = collections.Counter()
+
+    def _observe(self, table, key, seconds):
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = {"count": 0, "errors": 0, "bytes": 0, "seconds": 0.0, "max": 0.0,
+                                  "buckets": [0] * (len(self.BUCKETS) + 1)}
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        entry["max"] = max(entry["max"], seconds)
+        entry["buckets"][bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        return entry
+
+    def observe_request(self, backend, operation, seconds, size=0, error=False):
+        if not self.enabled:
+            return
+        # Never current_context(): resolving it may run kubectl, which is recorded here in turn.
+        context = known_context() or ""
+        with self._lock:
+            entry = self._observe(self.requests, (context, backend, operation), seconds)
+            entry["bytes"] += size
+            entry["errors"] += error
+            self.action_requests[self.action or "", operation] += 1
+
+    def add_bytes(self, backend, operation, size):
+        """Count bytes read from a stream after its request was observed."""
+        if not self.enabled:
+            return
+        context = known_context() or ""
+        with self._lock:
+            entry = self.requests.get((context, backend, operation))
+            if entry is not None:
+                entry["bytes"] += size
+
+    def cache_lookup(self, cache, result):
+        """Count a lookup of ``cache`` as ``result``: hit, miss or snapshot."""
+        if self.enabled:
+            with self._lock:
+                self.cache[cache, result] += 1
+
+    def start_action(self, action):
+        """Attribute the calls that follow to the menu action or subcommand ``action``."""
+        self.end_action()
+        self.action, self._action_started = action, time.perf_counter()
+
+    def end_action(self):
+        if self.action is None:
+            return
+        if self.enabled:
+            with self._lock:
+                self._observe(self.actions, self.action, time.perf_counter() - self._action_started)
+        self.action = None
+
+    def as_dict(self):
+        with self._lock:
+            requests = [dict(context=context, backend=backend, operation=operation, **entry)
+                        for (context, backend, operation), entry in sorted(self.requests.items())]
+            actions = [{"action": action, "count": entry["count"], "seconds": entry["seconds"], "max": entry["max"],
+                        "buckets": entry["buckets"],
+                        "requests": dict(sorted((operation, count) for (name, operation), count
+                                                in self.action_requests.items() if name == action))}
+                       for action, entry in sorted(self.actions.items())]
+            cache = {}
+            for (name, result), count in sorted(self.cache.items()):
+                cache.setdefault(name, {})[result] = count
+        for counts in cache.values():
+            counts["hit_rate"] = round(counts.get("hit", 0) / sum(counts.values()), 3)
+        return {"started": datetime.datetime.fromtimestamp(self.started, datetime.timezone.utc).isoformat(),
+                "buckets": list(self.BUCKETS), "requests": requests, "actions": actions, "cache": cache}
+
+    @staticmethod
+    def _labels(**labels):
+        escape = lambda value: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+    def _histogram(self, lines, name, entry, **labels):
+        cumulative = 0
+        for bound, count in zip(list(self.BUCKETS) + ["+Inf"], entry["buckets"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{self._labels(**labels, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{self._labels(**labels)} {entry['seconds']:.6f}")
+        lines.append(f"{name}_count{self._labels(**labels)} {entry['count']}")
+
+    def prometheus(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        data = self.as_dict()
+        lines = ["# HELP kubermon_request_duration_seconds Latency of API requests and kubectl runs.",
+                 "# TYPE kubermon_request_duration_seconds histogram"]
+        for entry in data["requests"]:
+            self._histogram(lines, "kubermon_request_duration_seconds", entry, context=entry["context"],
+                            backend=entry["backend"], operation=entry["operation"])
+        for name, field, help_text in (("kubermon_request_errors_total", "errors", "Failed requests."),
+                                       ("kubermon_response_bytes_total", "bytes", "Bytes of responses read.")):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f"{name}{self._labels(context=e['context'], backend=e['backend'], operation=e['operation'])}"
+                      f" {e[field]}" for e in data["requests"]]
+        lines += ["# HELP kubermon_action_duration_seconds Time spent in each menu action or subcommand.",
+                  "# TYPE kubermon_action_duration_seconds histogram"]
+        for entry in data["actions"]:
+            self._histogram(lines, "kubermon_action_duration_seconds", entry, action=entry["action"])
+        lines += ["# HELP kubermon_action_requests_total Cluster calls made by each menu action or subcommand.",
+                  "# TYPE kubermon_action_requests_total counter"]
+        lines += [f"kubermon_action_requests_total{self._labels(action=entry['action'], operation=operation)} {count}"
+                  for entry in data["actions"] for operation, count in entry["requests"].items()]
+        lines += ["# HELP kubermon_cache_lookups_total Cache lookups by result.",
+                  "# TYPE kubermon_cache_lookups_total counter"]
+        lines += [f"kubermon_cache_lookups_total{self._labels(cache=name, result=result)} {count}"
+                  for name, counts in data["cache"].items() for result, count in counts.items()
+                  if result != "hit_rate"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write the metrics to ``path``: Prometheus text for *.prom, JSON otherwise.
+
+        The file is replaced atomically, as textfile collectors expect.
+        """
+        self.end_action()
+        text = self.prometheus() if path.endswith(".prom") else json.dumps(self.as_dict(), indent=2) + "\n"
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            f.write(text)
+        os.replace(temporary, path)
+
+
+metrics = Metrics()
+# Size of the response body of the request in progress on this thread, set by the backends.
+_response = threading.local()
+
+
+def instrumented(request):
+    """Record the latency, outcome and response size of each backend request in ``metrics``."""
+    @functools.wraps(request)
+    def wrapper(self, method, path, params=None, **kwargs):
+        if not metrics.enabled:
+            return request(self, method, path, params=params, **kwargs)
+        operation = request_operation(method, path, params)
+        _response.size = 0
+        start = time.perf_counter()
+        try:
+            result = request(self, method, path, params=params, **kwargs)
+        except Exception:
+            metrics.observe_request(self.name, operation, time.perf_counter() - start, error=True)
+            raise
+        # For a stream this is the time to the response headers; its bytes are added when it is closed.
+        metrics.observe_request(self.name, operation, time.perf_counter() - start, _response.size)
+        if isinstance(result, _LineStream):
+            result.on_close = functools.partial(metrics.add_bytes, self.name, operation)
+        return result
+    return wrapper
+
+
+def start_profiler(path):
+    """Profile the rest of the session into ``path`` when it ends.
+
+    A path ending in .html gets a pyinstrument report (pyinstrument is
+    optional); anything else gets cProfile stats for pstats or snakeviz.
+    Both sample the main thread only.
+    """
+    if path.endswith(".html"):
+        try:
+            profiler = importlib.import_module("pyinstrument").Profiler()
+        except ImportError:
+            print("KUBERMON_PROFILE=*.html requires the pyinstrument package (pip install pyinstrument).")
+            sys.exit(1)
+        profiler.start()
+
+        def stop():
+            profiler.stop()
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def stop():
+            profiler.disable()
+            profiler.dump_stats(path)
+    atexit.register(stop)
+
+
+class KubectlBackend:
+    """Backend that runs one kubectl subprocess per request (the fallback path)."""
+
+    name = "kubectl"
+
+    def __init__(self, context=None):
+        self.context = context
+
+    def _command(self, *args):
+        command = ["kubectl"]
+        if self.context:
+            command += ["--context", self.context]
+        return command + list(args)
+
+    def _args(self, method, path, body, content_type):
+        if method == "GET":
+            return self._command("get", "--raw", path)
+        if method == "POST":
+            return self._command("create", "--raw", path, "-f", "-")
+        if method == "PUT":
+            return self._command("replace", "--raw", path, "-f", "-")
+        if method == "DELETE":
+            return self._command("delete", "--raw", path)
+        if method == "PATCH":
+            # kubectl has no --raw PATCH, so translate the path back into a resource.
+            parts = urllib.parse.urlsplit(path).path.strip("/").split("/")
+            group_version = parts[1:2] if parts[0] == "api" else parts[1:3]
+            rest = parts[len(group_version) + 1:]
+            namespace = None
+            if rest[0] == "namespaces" and len(rest) > 2:
+                namespace, rest = rest[1], rest[2:]
+            resource = ".".join([rest[0]] + list(reversed(group_version))) if parts[0] == "apis" else rest[0]
+            patch_type = {"application/merge-patch+json": "merge",
+                          "application/json-patch+json": "json"}.get(content_type, "strategic")
+            args = ["patch", resource, urllib.parse.unquote(rest[1]), "--type", patch_type, "-p", body]
+            if namespace:
+                args += ["-n", urllib.parse.unquote(namespace)]
+            return self._command(*args)
+        raise KubeApiError(0, f"Unsupported method: {method}")
+
+    @staticmethod
+    def _error(stderr):
+        match = re.search(r"Error from server \((\w+)\)", stderr)
+        status = _REASON_STATUS.get(match.group(1), 500) if match else 0
+        return KubeApiError(status, stderr.strip())
+
+    @instrumented
+    def request(self, method, path, params=None, body=None, raw=False, stream=False,
+                content_type="application/json", timeout=None):
+        if body is not None and not isinstance(body, str):
+            body = json.dumps(body)
+        args = self._args(method, path + _query(params), body, content_type)
+        if stream:
+            process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            first = process.stdout.readline()
+            if not first and process.wait() != 0:
+                raise self._error(process.stderr.read())
+            lines = itertools.chain([first], iter(process.stdout.readline, ""))
+
+            def close():
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+                process.stdout.close()
+                process.stderr.close()
+            return _LineStream(lambda: next(lines, ""), close)
+        stdin = body if method in ("POST", "PUT") else None
+        try:
+            result = subprocess.run(args, input=stdin, text=True, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise KubeApiError(504, f"kubectl timed out after {timeout}s")
+        _response.size = len(result.stdout)
+        if result.returncode != 0:
+            raise self._error(result.stderr)
+        if raw:
+            return result.stdout
+        return decode_json(result.stdout) if result.stdout.strip() else {}
+
+    def close(self):
+        pass
+
+
+class ApiBackend:
+    """Backend that talks HTTPS to the API server over pooled keep-alive connections.
+
+    Connections are kept in a small LIFO pool so back-to-back requests reuse
+    the same TLS session instead of paying a handshake (and a kubectl fork)
+    for every call. ``server`` may also be a plain ``http://`` URL, which is
+    how the backend is exercised against a local fake API server.
+    """
+
+    name = "api"
+
+    def __init__(self, server, ssl_context=None, token=None, token_source=None, server_name=None,
+                 timeout=REQUEST_TIMEOUT, pool_size=POOL_SIZE):
+        url = urllib.parse.urlsplit(server)
+        if url.scheme not in ("http", "https"):
+            raise KubeConfigError(f"Unsupported API server URL: {server}")
+        self.server = server
+        self._scheme = url.scheme
+        self._host = url.hostname
+        self._port = url.port or (443 if url.scheme == "https" else 80)
+        self._base_path = url.path.rstrip("/")
+        self._ssl_context = ssl_context
+        self._server_name = server_name
+        self._token = token
+        self._token_source = token_source
+        self.timeout = timeout
+        self._pool_size = pool_size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_kubeconfig(cls, context=None):
+        """Build a backend from the cluster and user of a kubeconfig context.
+
+        Raises KubeConfigError for what the client cannot do itself, such as
+        proxies and some auth methods, so auto mode falls back to kubectl.
+        """
+        config = load_kubeconfig()
+        context = context or config.get("current-context")
+        contexts = {c["name"]: c.get("context", {}) for c in config.get("contexts") or []}
+        if context not in contexts:
+            raise KubeConfigError(f"Context not found in kubeconfig: {context}")
+        clusters = {c["name"]: c.get("cluster", {}) for c in config.get("clusters") or []}
+        users = {u["name"]: u.get("user") or {} for u in config.get("users") or []}
+        cluster = clusters.get(contexts[context].get("cluster"))
+        if not cluster or not cluster.get("server"):
+            raise KubeConfigError(f"No cluster server configured for context: {context}")
+        user = users.get(contexts[context].get("user"), {})
+        proxy = cluster.get("proxy-url") or _environment_proxy(cluster["server"])
+        if proxy:
+            raise KubeConfigError(f"The API server of context {context} is reached through proxy {proxy}, "
+                                  "which the API client does not support")
+
+        ssl_context = None
+        if cluster["server"].startswith("https"):
+            ssl_context = ssl.create_default_context()
+            if cluster.get("insecure-skip-tls-verify"):
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+            elif cluster.get("certificate-authority-data"):
+                ssl_context.load_verify_locations(
+                    cadata=base64.b64decode(cluster["certificate-authority-data"]).decode())
+            elif cluster.get("certificate-authority"):
+                ssl_context.load_verify_locations(cafile=cluster["certificate-authority"])
+            if user.get("client-certificate-data") or user.get("client-certificate"):
+                _load_client_cert(ssl_context, user)
+
+        token, token_source = None, None
+        if user.get("token"):
+            token = user["token"]
+        elif user.get("tokenFile"):
+            token_source = _FileToken(user["tokenFile"])
+        elif user.get("exec"):
+            token_source = _ExecToken(user["exec"])
+            # Run the plugin now, so that in auto mode a plugin the API client cannot use
+            # (one that returns a client certificate, say) falls back to kubectl.
+            try:
+                token_source.get()
+            except KubeApiError as e:
+                raise KubeConfigError(str(e))
+        elif (user.get("auth-provider") or {}).get("config", {}).get("access-token"):
+            token = user["auth-provider"]["config"]["access-token"]
+        elif user.get("auth-provider"):
+            raise KubeConfigError(f"Unsupported auth-provider for context: {context}")
+        elif user.get("username"):
+            credentials = f"{user['username']}:{user.get('password', '')}".encode()
+            token = "Basic " + base64.b64encode(credentials).decode()
+        return cls(cluster["server"], ssl_context=ssl_context, token=token, token_source=token_source,
+                   server_name=cluster.get("tls-server-name"))
+
+    def _connect(self, timeout):
+        if self._scheme == "https" and self._server_name:
+            return _ServerNameConnection(self._host, self._port, self._server_name, context=self._ssl_context,
+                                         timeout=timeout)
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(self._host, self._port, context=self._ssl_context, timeout=timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(self.timeout), False
+
+    def _release(self, connection):
+        with self._lock:
+            if len(self._idle) < self._pool_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _headers(self, content_type, refresh=False):
+        headers = {"Accept": "application/json", "User-Agent": "kubermon"}
+        token = self._token
+        if self._token_source is not None:
+            token = self._token_source.get(refresh)
+        if token:
+            headers["Authorization"] = token if token.startswith("Basic ") else f"Bearer {token}"
+        if content_type:
+            headers["Content-Type"] = content_type
+        return headers
+
+    @instrumented
+    def request(self, method, path, params=None, body=None, raw=False, stream=False,
+                content_type="application/json", timeout=None):
+        """Send a request and return the decoded JSON (or text with ``raw``).
+
+        With ``stream`` the response is returned as an iterator of lines on a
+        dedicated connection, which the caller must close.
+        """
+        url = self._base_path + path + _query(params)
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        refresh = False
+        for attempt in range(3):
+            if stream:
+                connection, reused = self._connect(timeout), False
+            else:
+                connection, reused = self._acquire()
+                if timeout is not None:
+                    connection.timeout = timeout
+            try:
+                connection.request(method, url, body=body,
+                                   headers=self._headers(content_type if body is not None else None, refresh))
+                response = connection.getresponse()
+                if stream and response.status < 400:
+                    return _LineStream(response.readline, functools.partial(_close_connection, connection))
+                data = response.read()
+                _response.size = len(data)
+            except (http.client.HTTPException, ConnectionError, socket.timeout, OSError) as e:
+                connection.close()
+                # A pooled connection may have been closed by the server while idle.
+                if reused and attempt < 2:
+                    continue
+                raise KubeApiError(0, f"Request to {self.server} failed: {e}")
+            if stream or response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            if response.status == 401 and self._token_source is not None and not refresh:
+                refresh = True
+                continue
+            if response.status >= 400:
+                raise _status_error(response.status, data)
+            if raw:
+                return data.decode("utf-8", "replace")
+            return decode_json(data) if data else {}
+        raise KubeApiError(0, f"Request to {self.server} failed")
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class _ServerNameConnection(http.client.HTTPSConnection):
+    """HTTPS connection that sends and verifies ``server_name`` (kubeconfig ``tls-server-name``) instead of the host."""
+
+    def __init__(self, host, port, server_name, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self.server_name = server_name
+
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=self.server_name)
+
+
+def _close_connection(connection):
+    """Close a connection, unblocking any thread still reading from it."""
+    if connection.sock is not None:
+        try:
+            connection.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    connection.close()
+
+
+def _status_error(status, data):
+    try:
+        message = json.loads(data).get("message") or ""
+    except ValueError:
+        message = data.decode("utf-8", "replace").strip()
+    return KubeApiError(status, message or http.client.responses.get(status, ""))
+
+
+def _load_client_cert(ssl_context, user):
+    """Load the client certificate of a kubeconfig user into ``ssl_context``."""
+    if user.get("client-certificate"):
+        ssl_context.load_cert_chain(user["client-certificate"], user.get("client-key"))
+        return
+    # ssl only loads certificates from files, so spill the inline data to a private temp dir.
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        cert_file = os.path.join(directory, "client.crt")
+        key_file = os.path.join(directory, "client.key")
+        for filename, key in ((cert_file, "client-certificate-data"), (key_file, "client-key-data")):
+            with open(os.open(filename, os.O_WRONLY | os.O_CREAT, 0o600), "wb") as f:
+                f.write(base64.b64decode(user.get(key, "")))
+        ssl_context.load_cert_chain(cert_file, key_file)
+
+
+def _environment_proxy(server):
+    """Return the proxy that HTTPS_PROXY/HTTP_PROXY set for ``server``, unless NO_PROXY exempts it."""
+    import urllib.request
+    url = urllib.parse.urlsplit(server)
+    proxy = urllib.request.getproxies_environment().get(url.scheme)
+    if proxy and not urllib.request.proxy_bypass_environment(url.netloc):
+        return proxy
+    return None
+
+
+class _FileToken:
+    """Bearer token read from a file, re-read when the server rejects it."""
+
+    def __init__(self, path):
+        self.path = path
+        self._token = None
+
+    def get(self, refresh=False):
+        if self._token is None or refresh:
+            with open(self.path) as f:
+                self._token = f.read().strip()
+        return self._token
+
+
+class _ExecToken:
+    """Bearer token obtained from a client-go exec credential plugin."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._token = None
+        self._expires = None
+        self._lock = threading.Lock()
+
+    def get(self, refresh=False):
+        with self._lock:
+            if self._token is None or refresh or (self._expires and time.time() >= self._expires):
+                self._run()
+            return self._token
+
+    def _run(self):
+        env = dict(os.environ)
+        env.update({e["name"]: e["value"] for e in self.spec.get("env") or []})
+        try:
+            result = subprocess.run([self.spec["command"]] + list(self.spec.get("args") or []),
+                                    env=env, check=True, text=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise KubeApiError(401, f"Exec credential plugin failed: {e}")
+        status = json.loads(result.stdout).get("status") or {}
+        if not status.get("token") and status.get("clientCertificateData"):
+            raise KubeApiError(401, "Exec credential plugin returned a client certificate, which needs kubectl")
+        if not status.get("token"):
+            raise KubeApiError(401, "Exec credential plugin returned no token")
+        self._token = status["token"]
+        self._expires = None
+        if status.get("expirationTimestamp"):
+            expires = datetime.datetime.fromisoformat(status["expirationTimestamp"].replace("Z", "+00:00"))
+            self._expires = expires.timestamp() - 30
+
+
+def load_kubeconfig():
+    """Return the merged kubeconfig as a dict (cached for the session).
+
+    Files are read directly when PyYAML is available; otherwise the merged
+    view is taken from ``kubectl config view --raw -o json``.
+    """
+    global _kubeconfig
+    if _kubeconfig is not None:
+        return _kubeconfig
+    try:
+        import yaml
+    except ImportError:
+        yaml = None
+    paths = [p for p in os.environ.get("KUBECONFIG", "").split(os.pathsep) if p]
+    paths = paths or [os.path.expanduser("~/.kube/config")]
+    if yaml is None:
+        try:
+            result = subprocess.run(["kubectl", "config", "view", "--raw", "-o", "json"],
+                                    check=True, text=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise KubeConfigError(f"Unable to read kubeconfig: {e}")
+        _kubeconfig = json.loads(result.stdout)
+        return _kubeconfig
+
+    merged = {"clusters": [], "users": [], "contexts": []}
+    seen = set()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            config = yaml.safe_load(f) or {}
+        base = os.path.dirname(os.path.abspath(path))
+        if config.get("current-context") and not merged.get("current-context"):
+            merged["current-context"] = config["current-context"]
+        for section, inner in (("clusters", "cluster"), ("users", "user"), ("contexts", "context")):
+            for entry in config.get(section) or []:
+                # The first file to define a name wins, as with kubectl.
+                if (section, entry.get("name")) in seen:
+                    continue
+                seen.add((section, entry.get("name")))
+                for key in ("certificate-authority", "client-certificate", "client-key", "tokenFile"):
+                    value = (entry.get(inner) or {}).get(key)
+                    if value and not os.path.isabs(value):
+                        entry[inner][key] = os.path.join(base, value)
+                merged[section].append(entry)
+    if not merged["contexts"]:
+        raise KubeConfigError(f"No contexts found in kubeconfig: {os.pathsep.join(paths)}")
+    _kubeconfig = merged
+    return _kubeconfig
+
+
+_kubeconfig = None
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(context=None):
+    """Return the (shared) backend for ``context``, the current one by default.
+
+    ``KUBERMON_BACKEND`` selects ``api``, ``kubectl`` or ``auto`` (the API
+    client, falling back to kubectl when the kubeconfig cannot be used).
+    """
+    context = context or current_context()
+    with _backends_lock:
+        backend = _backends.get(context)
+        if backend is None:
+            backend = _backends[context] = _make_backend(context)
+        return backend
+
+
+def _make_backend(context):
+    if KUBE_BACKEND == "kubectl":
+        return KubectlBackend(context)
+    if KUBE_API_SERVER:
+        return ApiBackend(KUBE_API_SERVER)
+    try:
+        return ApiBackend.from_kubeconfig(context)
+    except (KubeConfigError, OSError, ValueError, ssl.SSLError) as e:
+        if KUBE_BACKEND == "api":
+            print(f"Unable to use the API backend: {e}")
+            sys.exit(1)
+        return KubectlBackend(context)
+
+
+def kube_request(method, path, context=None, **kwargs):
+    """Send a request through the active backend, exiting on failure like run_kubectl_command.
+
+    Inside context_scope() the KubeApiError is raised instead, so one failing
+    cluster does not end a multi-context query.
+    """
+    try:
+        return get_backend(context).request(method, path, **kwargs)
+    except KubeApiError as e:
+        if getattr(_scope, "context", None) is not None:
+            raise
+        print(f"Error executing command: {e}")
+        sys.exit(1)
+
+
+def list_names(kind, namespace=None, context=None, **params):
+    """Return the names of the ``kind`` objects matching ``params`` (e.g. fieldSelector)."""
+    result = kube_request("GET", resource_path(kind, namespace), context=context, params=params)
+    return [item["metadata"]["name"] for item in result.get("items", [])]
+
+
+def list_pages(kind, namespace=None, context=None, limit=PAGE_SIZE, **params):
+    """Yield the items of a LIST one page of at most ``limit`` objects at a time, following the continue token."""
+    params = dict(params, limit=limit)
+    while True:
+        result = kube_request("GET", resource_path(kind, namespace), context=context, params=params)
+        yield result.get("items", [])
+        token = (result.get("metadata") or {}).get("continue")
+        if not token:
+            return
+        params["continue"] = token
+
+
+def current_context():
+    """Return the name of the current kubectl context (cached until switched).
+
+    A context_scope() on the calling thread takes precedence.
+    """
+    global _current_context
+    scoped = getattr(_scope, "context", None)
+    if scoped is not None:
+        return scoped
+    if _current_context is None:
+        try:
+            _current_context = load_kubeconfig().get("current-context")
+        except KubeConfigError:
+            pass
+        if not _current_context and KUBE_API_SERVER:
+            _current_context = KUBE_API_SERVER
+        if not _current_context:
+            _current_context = run_kubectl_command("kubectl config current-context").strip()
+    return _current_context
+
+
+def known_context():
+    """Return the scoped or already resolved current context (or None) without resolving it."""
+    return getattr(_scope, "context", None) or _current_context
+
+
+_current_context = None
+# Per-thread context override used by multi-context queries.
+_scope = threading.local()
+
+
+@contextlib.contextmanager
+def context_scope(context):
+    """Direct every cluster call made by this thread to ``context`` for the duration."""
+    previous = getattr(_scope, "context", None)
+    _scope.context = context
+    try:
+        yield
+    finally:
+        _scope.context = previous
+
+
+def list_contexts():
+    """Return the names of all kubeconfig contexts."""
+    try:
+        return [c["name"] for c in load_kubeconfig().get("contexts") or []]
+    except KubeConfigError:
+        return run_kubectl_command("kubectl config get-contexts -o name").splitlines()
+
+
+def match_contexts(patterns):
+    """Expand comma-separated context names and globs against the kubeconfig."""
+    contexts = list_contexts()
+    selected = []
+    for pattern in (p.strip() for p in patterns.split(",")):
+        matches = fnmatch.filter(contexts, pattern) if any(c in pattern for c in "*?[") else [pattern]
+        selected.extend(name for name in matches if name not in selected)
+    return selected
+
+
+def run_per_context(fn, contexts, timeout=REQUEST_TIMEOUT):
+    """Call ``fn()`` once per context, all concurrently, each within its own context_scope().
+
+    Returns ``{context: (result, error)}``. A context that has not answered
+    within ``timeout`` seconds is reported as timed out and abandoned, so the
+    total latency is that of the slowest cluster, capped at ``timeout``.
+    """
+    results = {}
+    done = threading.Condition()
+
+    def run(context):
+        try:
+            with context_scope(context):
+                outcome = (fn(), None)
+        except (KubeApiError, KubeConfigError, OSError, ValueError) as e:
+            outcome = (None, str(e))
+        except SystemExit:
+            outcome = (None, "failed")
+        except Exception as e:
+            # Anything else is a bug for this context only; report it rather than a timeout.
+            outcome = (None, f"{type(e).__name__}: {e}")
+        with done:
+            results[context] = outcome
+            done.notify_all()
+
+    for context in contexts:
+        threading.Thread(target=run, args=(context,), daemon=True).start()
+    deadline = time.monotonic() + timeout
+    with done:
+        while len(results) < len(contexts) and done.wait(max(deadline - time.monotonic(), 0)):
+            pass
+        return {context: results.get(context, (None, f"timed out after {timeout:g}s")) for context in contexts}
+
+
+class Snapshot:
+    """Last-known resource lists per context, kept in a small SQLite file.
+
+    Each row holds one list (namespace names, node names, the pod store, ...)
+    together with its resourceVersion, so a new session can show it at once
+    and then catch up from that version. Data is stored marshalled and
+    zlib-compressed: unlike JSON it loads tuples and shared interned strings
+    as they were, several times faster. Snapshot errors are never fatal:
+    the data is simply fetched again.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._db is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS snapshot (context TEXT, kind TEXT, namespace TEXT, "
+                             "resource_version TEXT, saved TEXT, data BLOB, PRIMARY KEY (context, kind, namespace))")
+        return self._db
+
+    def load(self, context, kind, namespace=None):
+        """Return (data, resource_version, saved) or None."""
+        import sqlite3
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT data, resource_version, saved FROM snapshot WHERE context=? AND kind=? AND namespace=?",
+                    (context, kind, namespace or "")).fetchone()
+            if row is None:
+                return None
+            return marshal.loads(zlib.decompress(row[0])), row[1], row[2]
+        except (OSError, EOFError, TypeError, ValueError, zlib.error, sqlite3.Error):
+            return None
+
+    def save(self, entries):
+        """Store (context, kind, namespace, resource_version, data) entries in one transaction."""
+        import sqlite3
+        saved = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        rows = [(context, kind, namespace or "", resource_version, saved,
+                 zlib.compress(marshal.dumps(data), 1))
+                for context, kind, namespace, resource_version, data in entries]
+        try:
+            with self._lock, self._connect() as db:
+                db.executemany("INSERT OR REPLACE INTO snapshot VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except (OSError, sqlite3.Error):
+            pass
+
+
+# The snapshot of the interactive session; None (the default, and for subcommands) disables it.
+_snapshot = None
+
+
+def _stale_note(what, saved):
+    print(colored(f"Showing {what} from a snapshot taken {format_age(saved)} ago; refreshing in the background.",
+                  "yellow"))
+
+
+class ResourceCache:
+    """Cache of resource name lists keyed by (context, kind, namespace).
+
+    Entries expire after ``ttl`` seconds. A background thread re-fetches
+    entries that are about to expire while the main menu is idle, so the
+    next prompt is served from memory instead of waiting on the API server.
+    Entries not read for ``IDLE_TTLS`` TTLs are dropped instead of refreshed,
+    so background traffic does not grow with every list ever viewed.
+    """
+
+    IDLE_TTLS = 10
+
+    def __init__(self, ttl=CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._stale = set()
+        self._read = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _fetch(context, kind, namespace):
+        result = get_backend(context).request("GET", resource_path(kind, namespace))
+        return [item["metadata"]["name"] for item in result.get("items", [])]
+
+    def get(self, kind, namespace=None):
+        """Return the names of ``kind`` objects, fetching them if stale."""
+        key = (current_context(), kind, namespace)
+        with self._lock:
+            entry = self._entries.get(key)
+            stale = key in self._stale
+            self._read[key] = time.monotonic()
+        if entry and (stale or time.monotonic() - entry[0] < self.ttl):
+            metrics.cache_lookup("resources", "hit")
+            return entry[1]
+        if entry is None and _snapshot is not None and self.ttl > 0:
+            saved = _snapshot.load(*key)
+            if saved is not None:
+                # Serve the snapshot now and revalidate it with a LIST in the background.
+                with self._lock:
+                    self._entries[key] = (time.monotonic() - self.ttl, list(saved[0]))
+                    self._stale.add(key)
+                threading.Thread(target=self._revalidate, args=(key,), daemon=True).start()
+                _stale_note(kind, saved[2])
+                metrics.cache_lookup("resources", "snapshot")
+                return list(saved[0])
+        metrics.cache_lookup("resources", "miss")
+        try:
+            names = self._fetch(*key)
+        except KubeApiError as e:
+            if getattr(_scope, "context", None) is not None:
+                raise
+            print(f"Error executing command: {e}")
+            sys.exit(1)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), names)
+        return names
+
+    def _revalidate(self, key):
+        try:
+            names = self._fetch(*key)
+        except KubeApiError:
+            names = None
+        with self._lock:
+            self._stale.discard(key)
+            if names is not None:
+                self._entries[key] = (time.monotonic(), names)
+
+    def snapshot_entries(self):
+        """Return the fresh entries as (context, kind, namespace, resource_version, names) for the snapshot."""
+        with self._lock:
+            return [key + (None, tuple(names)) for key, (_, names) in self._entries.items()
+                    if key not in self._stale]
+
+    def invalidate(self, context=None):
+        """Drop every entry, or only those belonging to ``context``."""
+        with self._lock:
+            if context is None:
+                self._entries.clear()
+                self._stale.clear()
+                self._read.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == context]:
+                    del self._entries[key]
+                    self._stale.discard(key)
+                    self._read.pop(key, None)
+
+    def set_idle(self, idle):
+        """Allow (or pause) background refreshes, e.g. while a menu is shown."""
+        if idle:
+            self._idle.set()
+        else:
+            self._idle.clear()
+
+    def start_refresh(self, interval=None):
+        """Start the background thread that keeps cached entries warm."""
+        if self._thread is not None or self.ttl <= 0:
+            return
+        interval = interval or max(self.ttl / 3, 1)
+        self._thread = threading.Thread(target=self._refresh_loop, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop_refresh(self):
+        self._stop.set()
+
+    def _refresh_loop(self, interval):
+        while not self._stop.wait(interval):
+            self._idle.wait()
+            now = time.monotonic()
+            with self._lock:
+                for key in [k for k in self._entries if now - self._read.get(k, 0) >= self.IDLE_TTLS * self.ttl]:
+                    del self._entries[key]
+                    self._stale.discard(key)
+                    self._read.pop(key, None)
+                due = [key for key, (fetched, _) in self._entries.items()
+                       if now - fetched >= self.ttl - interval]
+            for key in due:
+                if self._stop.is_set() or not self._idle.is_set():
+                    break
+                try:
+                    names = self._fetch(*key)
+                except KubeApiError:
+                    continue
+                with self._lock:
+                    if key in self._entries:
+                        self._entries[key] = (time.monotonic(), names)
+
+
+resource_cache = ResourceCache()
+
+
+def get_namespaces():
+    """Return the namespace names of the current context."""
+    return resource_cache.get("namespaces")
+
+
+def get_nodes():
+    """Return the node names of the current context."""
+    return resource_cache.get("nodes")
+
+
+def get_deployments(namespace):
+    """Return the deployment names in ``namespace``."""
+    return resource_cache.get("deployments", namespace)
+
+
+def match_namespaces(patterns, context=None):
+    """Expand comma-separated namespace names, globs (``team-*``) and ``re:REGEX`` patterns.
+
+    Plain names are taken as given; only patterns need the namespace list.
+    """
+    selected = set()
+    for pattern in (p.strip() for p in patterns.split(",")):
+        if not pattern:
+            continue
+        if pattern.startswith("re:"):
+            regex = re.compile(pattern[3:])
+            selected.update(ns for ns in _namespace_list(context) if regex.search(ns))
+        elif any(char in pattern for char in "*?["):
+            selected.update(fnmatch.filter(_namespace_list(context), pattern))
+        else:
+            selected.add(pattern)
+    return sorted(selected)
+
+
+def _namespace_list(context):
+    if context is None:
+        return get_namespaces()
+    return list_names("namespaces", context=context)
+
+
+class FuzzyMatches:
+    """Lazily produced matches of one FuzzyIndex query, in choice order."""
+
+    def __init__(self, indexes):
+        self.items = []
+        self.done = False
+        self._indexes = indexes
+        self._corpus = None
+
+    def fill(self, count):
+        """Produce matches until there are ``count`` of them or the scan is finished."""
+        while not self.done and len(self.items) < count:
+            try:
+                self.items.append(next(self._indexes))
+            except StopIteration:
+                self.done = True
+
+    def step(self, budget=0.005):
+        """Continue the scan for about ``budget`` seconds, e.g. between keystrokes."""
+        deadline = time.perf_counter() + budget
+        while not self.done and time.perf_counter() < deadline:
+            self.fill(len(self.items) + 256)
+
+
+class FuzzyIndex:
+    """Case-insensitive subsequence matcher over a fixed list of choices.
+
+    The lowercased choices are joined into one newline-separated text up
+    front, so a query is a single regular-expression scan in C. Every query
+    character after the first becomes ``[^\\nc]*c``, which cannot backtrack.
+    Matches are produced lazily: the picker takes a screenful at once and
+    counts the rest between keystrokes. A query that extends a finished one
+    with few matches only rescans those matches.
+    """
+
+    def __init__(self, choices):
+        self.choices = list(choices)
+        self._lowered = [choice.lower() for choice in self.choices]
+        self._all = self._corpus(range(len(self.choices)))
+        self._last = None
+
+    def _corpus(self, indexes):
+        indexes = list(indexes)
+        lines = [self._lowered[i] for i in indexes]
+        starts = list(itertools.accumulate((len(line) + 1 for line in lines), initial=0))
+        return indexes, "\n".join(lines), starts
+
+    def _scan(self, query, corpus):
+        indexes, text, starts = corpus
+        pattern = re.escape(query[0]) + "".join(f"[^\\n{re.escape(c)}]*{re.escape(c)}" for c in query[1:])
+        bisect_right = bisect.bisect_right
+        # The trailing [^\n]* consumes the rest of the line, so each choice matches at most once.
+        for match in re.finditer(pattern + "[^\n]*", text):
+            yield indexes[bisect_right(starts, match.start()) - 1]
+
+    def search(self, query):
+        query = query.lower()
+        if not query:
+            matches = FuzzyMatches(iter(range(len(self.choices))))
+        else:
+            corpus = self._all
+            if self._last is not None:
+                last_query, last = self._last
+                # Narrowing pays off only when the earlier matches are a small part of the choices.
+                if (query.startswith(last_query) and last.done and last_query
+                        and len(last.items) <= len(self.choices) // 4):
+                    if last._corpus is None:
+                        last._corpus = self._corpus(last.items)
+                    corpus = last._corpus
+            matches = FuzzyMatches(self._scan(query, corpus))
+        self._last = (query, matches)
+        return matches
+
+
+class _FuzzyPicker:
+    """Full-screen curses picker behind fuzzy_select."""
+
+    def __init__(self, message, choices, on_highlight=None):
+        self.message = message
+        self.index = FuzzyIndex(choices)
+        self.on_highlight = on_highlight
+        self.query = ""
+        self.matches = self.index.search("")
+        self.cursor = 0
+        self.top = 0
+        self._highlighted = None
+
+    def _draw(self, screen):
+        import curses
+        height, width = screen.getmaxyx()
+        rows = max(height - 2, 1)
+        self.matches.fill(self.top + rows)
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + rows:
+            self.top = self.cursor - rows + 1
+        self.matches.fill(self.top + rows)
+        screen.erase()
+        total = len(self.index.choices)
+        found = f"{len(self.matches.items)}{'' if self.matches.done else '+'}"
+        screen.addstr(1, 0, f"  {found}/{total}  (type to filter, enter to select, esc to cancel)"[:width - 1],
+                      curses.A_DIM)
+        for row, index in enumerate(self.matches.items[self.top:self.top + rows]):
+            attr = curses.A_REVERSE if self.top + row == self.cursor else curses.A_NORMAL
+            screen.addstr(row + 2, 0, f"  {self.index.choices[index]}"[:width - 1], attr)
+        prompt = f"{self.message} {self.query}"[:width - 1]
+        screen.addstr(0, 0, prompt, curses.A_BOLD)
+        screen.move(0, len(prompt))
+        screen.refresh()
+        return rows
+
+    def _current(self):
+        if self.cursor < len(self.matches.items):
+            return self.index.choices[self.matches.items[self.cursor]]
+        return None
+
+    def _read(self, screen):
+        import curses
+        while True:
+            # While the scan is unfinished, poll for keys and keep counting in between. A zero
+            # timeout would split escape sequences such as the arrow keys into a lone Esc.
+            screen.timeout(-1 if self.matches.done else 10)
+            try:
+                return screen.get_wch()
+            except curses.error:
+                self.matches.step()
+                self._draw(screen)
+
+    def run(self, screen):
+        import curses
+        if hasattr(curses, "set_escdelay"):
+            curses.set_escdelay(25)
+        while True:
+            rows = self._draw(screen)
+            current = self._current()
+            if self.on_highlight is not None and current is not None and current != self._highlighted:
+                self.on_highlight(current)
+            self._highlighted = current
+            key = self._read(screen)
+            if key in ("\n", "\r", curses.KEY_ENTER):
+                if current is not None:
+                    return current
+            elif key == "\x1b":
+                return None
+            elif key in (curses.KEY_UP, "\x10"):
+                self.cursor = max(self.cursor - 1, 0)
+            elif key in (curses.KEY_DOWN, "\x0e"):
+                self.matches.fill(self.cursor + 2)
+                self.cursor = min(self.cursor + 1, max(len(self.matches.items) - 1, 0))
+            elif key == curses.KEY_PPAGE:
+                self.cursor = max(self.cursor - rows, 0)
+            elif key == curses.KEY_NPAGE:
+                self.matches.fill(self.cursor + rows + 1)
+                self.cursor = min(self.cursor + rows, max(len(self.matches.items) - 1, 0))
+            elif key in (curses.KEY_BACKSPACE, "\x7f", "\b", "\x15"):
+                self.query = "" if key == "\x15" else self.query[:-1]
+                self.matches = self.index.search(self.query)
+                self.cursor = self.top = 0
+            elif isinstance(key, str) and key.isprintable():
+                self.query += key
+                self.matches = self.index.search(self.query)
+                self.cursor = self.top = 0
+
+
+def fuzzy_select(message, choices, on_highlight=None):
+    """Let the user pick one of ``choices`` by typing any part of it; returns None when cancelled.
+
+    ``on_highlight`` is called with each choice the cursor lands on. Without
+    a terminal (or curses) this falls back to an inquirer list.
+    """
+    choices = list(choices)
+    try:
+        import curses
+    except ImportError:
+        curses = None
+    if curses is None or not (sys.stdin.isatty() and sys.stdout.isatty()):
+        answer = inquirer.prompt([inquirer.List("choice", message=message, choices=choices, carousel=True)])
+        return answer["choice"] if answer else None
+    try:
+        return curses.wrapper(_FuzzyPicker(message, choices, on_highlight).run)
+    except KeyboardInterrupt:
+        return None
+
+
+class Prefetcher:
+    """Fetches ``fetch(key)`` in the background for the choice under a picker's cursor.
+
+    Pass it as fuzzy_select's ``on_highlight``: once the cursor has rested on
+    a choice for ``delay`` seconds its data is fetched on a worker thread,
+    so the next prompt usually finds it ready. A newer highlight cancels one
+    whose fetch has not started yet, and results are kept in an LRU cache of
+    ``size`` entries. Background errors are dropped; ``get`` then fetches
+    again in the foreground and reports them as usual.
+    """
+
+    def __init__(self, fetch, size=8, delay=0.15):
+        self.fetch = fetch
+        self.size = size
+        self.delay = delay
+        self.hits = 0
+        self._cache = collections.OrderedDict()
+        self._inflight = {}
+        self._pending = None
+        self._closed = False
+        self._context = current_context()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def __call__(self, key):
+        with self._cond:
+            self._pending = (key, time.monotonic() + self.delay)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _store(self, key, value):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.size:
+            self._cache.popitem(last=False)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key, due = self._pending
+                if time.monotonic() < due:
+                    self._cond.wait(due - time.monotonic())
+                    continue
+                self._pending = None
+                if key in self._cache or key in self._inflight:
+                    continue
+                done = self._inflight[key] = threading.Event()
+            value, ok = None, False
+            try:
+                # Inside a context scope API errors raise instead of printing and exiting.
+                with context_scope(self._context):
+                    value, ok = self.fetch(key), True
+            except KubeApiError:
+                pass
+            with self._cond:
+                del self._inflight[key]
+                if ok:
+                    self._store(key, value)
+            done.set()
+
+    def get(self, key):
+        """Return ``fetch(key)``, from the cache or a prefetch in flight when possible."""
+        with self._cond:
+            done = self._inflight.get(key)
+        if done is not None:
+            done.wait()
+        with self._cond:
+            if key in self._cache:
+                self.hits += 1
+                metrics.cache_lookup("prefetch", "hit")
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        metrics.cache_lookup("prefetch", "miss")
+        value = self.fetch(key)
+        with self._cond:
+            self._store(key, value)
+        return value
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def select_namespaces(message):
+    """Prompt for one or more namespaces, by pattern or from a checkbox list."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return None
+    answers = inquirer.prompt([inquirer.Text(
+        "pattern", message=f"{message} (glob or re:REGEX, blank to pick from a list)")])
+    if answers is None:
+        return None
+    if answers.get("pattern", "").strip():
+        return match_namespaces(answers["pattern"])
+    answers = inquirer.prompt([inquirer.Checkbox("namespaces", message=message, choices=namespaces)])
+    if answers is None:
+        return None
+    return answers.get("namespaces")
+
+
+def fan_out(fn, items, max_workers=None):
+    """Call ``fn`` on every item concurrently and return the results in item order.
+
+    At most ``max_workers`` (``KUBERMON_MAX_INFLIGHT``) calls are in flight at
+    once, which keeps bursts within the API server's priority-and-fairness limits.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    workers = min(max_workers or MAX_INFLIGHT, len(items))
+    context = getattr(_scope, "context", None)
+
+    def call(item):
+        if context is None:
+            return fn(item)
+        with context_scope(context):
+            return fn(item)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(call, items))
+
+
+def fan_out_rows(fn, namespaces, key=None):
+    """Merge the row lists ``fn`` returns for each namespace, sorted by ``key``.
+
+    ``namespaces`` None (``-A``) is a single call of ``fn(None)``: one cluster-wide LIST.
+    """
+    rows = [row for result in fan_out(fn, [None] if namespaces is None else namespaces) for row in result]
+    return sorted(rows, key=key or (lambda row: (row.get("namespace") or "", row.get("name") or row.get("pod", ""))))
+
+
+def namespace_columns(namespaces, columns):
+    """Prefix ``columns`` with the namespace column when more than one namespace is shown."""
+    return (["namespace"] + columns) if namespaces is None or len(namespaces) > 1 else columns
+
+
+class PodRecord:
+    """Compact view of the pod fields kubermon displays.
+
+    Repeated strings (namespace, node, phase, images, labels) are interned so
+    tens of thousands of records share a single copy of each value.
+    """
+
+    __slots__ = ("key", "namespace", "name", "node", "phase", "status", "ready", "total", "restarts",
+                 "created", "labels", "containers", "init_containers", "owner", "resource_version")
+
+    @classmethod
+    def from_pod(cls, pod):
+        intern = sys.intern
+        metadata = pod.get("metadata") or {}
+        spec = pod.get("spec") or {}
+        status = pod.get("status") or {}
+        statuses = status.get("containerStatuses") or []
+        record = cls()
+        record.namespace = intern(metadata.get("namespace") or "")
+        record.name = metadata["name"]
+        record.node = intern(spec.get("nodeName") or "")
+        record.phase = intern(status.get("phase") or "")
+        record.status = intern(pod_status(pod))
+        record.ready = sum(1 for c in statuses if c.get("ready"))
+        record.total = len(spec.get("containers") or statuses)
+        record.restarts = sum(c.get("restartCount", 0) for c in statuses)
+        record.created = metadata.get("creationTimestamp")
+        record.labels = tuple(sorted(intern(f"{k}={v}") for k, v in (metadata.get("labels") or {}).items()))
+        record.containers = tuple((intern(c["name"]), intern(c.get("image") or ""))
+                                  for c in spec.get("containers") or [])
+        record.init_containers = tuple((intern(c["name"]), intern(c.get("image") or ""))
+                                       for c in spec.get("initContainers") or [])
+        owners = metadata.get("ownerReferences") or []
+        record.owner = (intern(owners[0]["kind"]), owners[0]["name"]) if owners else None
+        record.resource_version = metadata.get("resourceVersion")
+        # One shared tuple per record keeps the index sets from holding copies.
+        record.key = (record.namespace, record.name)
+        return record
+
+    def label_dict(self):
+        return dict(label.split("=", 1) for label in self.labels)
+
+    def dump(self):
+        """Return the record as a tuple, for the snapshot."""
+        return (self.namespace, self.name, self.node, self.phase, self.status, self.ready, self.total, self.restarts,
+                self.created, self.labels, self.containers, self.init_containers, self.owner, self.resource_version)
+
+    @classmethod
+    def restore(cls, values):
+        """Rebuild a record from dump(); the snapshot keeps interned strings interned."""
+        record = cls()
+        (record.namespace, record.name, record.node, record.phase, record.status, record.ready, record.total,
+         record.restarts, record.created, record.labels, record.containers, record.init_containers, record.owner,
+         record.resource_version) = values
+        record.key = (record.namespace, record.name)
+        return record
+
+
+class PodStore:
+    """Pod records keyed by (namespace, name) with hash indexes, fed by an Informer.
+
+    Secondary indexes on node, namespace, phase and each label ``key=value``
+    map to sets of keys and are updated incrementally on every watch event,
+    so filtered queries touch only the matching records.
+    """
+
+    def __init__(self):
+        self._pods = {}
+        self._indexes = {"node": {}, "namespace": {}, "phase": {}, "label": {}}
+        self._phase_counts = collections.Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index_values(record):
+        yield "node", record.node
+        yield "namespace", record.namespace
+        yield "phase", record.phase
+        for label in record.labels:
+            yield "label", label
+
+    def _add(self, record):
+        self._pods[record.key] = record
+        self._phase_counts[record.namespace, record.phase] += 1
+        for index, value in self._index_values(record):
+            self._indexes[index].setdefault(value, set()).add(record.key)
+
+    def _remove(self, key):
+        record = self._pods.pop(key, None)
+        if record is None:
+            return
+        self._phase_counts[record.namespace, record.phase] -= 1
+        if not self._phase_counts[record.namespace, record.phase]:
+            del self._phase_counts[record.namespace, record.phase]
+        for index, value in self._index_values(record):
+            keys = self._indexes[index].get(value)
+            keys.discard(key)
+            if not keys:
+                del self._indexes[index][value]
+
+    def replace(self, items):
+        with gc_paused():
+            self.replace_records([PodRecord.from_pod(pod) for pod in items])
+
+    def replace_records(self, records):
+        with self._lock:
+            self._pods = {}
+            self._indexes = {"node": {}, "namespace": {}, "phase": {}, "label": {}}
+            self._phase_counts = collections.Counter()
+            for record in records:
+                self._add(record)
+
+    def upsert(self, pod):
+        record = PodRecord.from_pod(pod)
+        with self._lock:
+            self._remove(record.key)
+            self._add(record)
+
+    def delete(self, pod):
+        metadata = pod["metadata"]
+        with self._lock:
+            self._remove((metadata.get("namespace") or "", metadata["name"]))
+
+    def __len__(self):
+        return len(self._pods)
+
+    def records(self):
+        with self._lock:
+            return list(self._pods.values())
+
+    def phase_counts(self):
+        """Return {(namespace, phase): pods}, maintained incrementally."""
+        with self._lock:
+            return dict(self._phase_counts)
+
+    def query(self, namespace=None, phase=None, exclude_phase=None, node=None, labels=None):
+        """Return the records matching every given filter, sorted by namespace and name."""
+        with self._lock:
+            candidates = []
+            if namespace:
+                candidates.append(self._indexes["namespace"].get(namespace, set()))
+            if phase:
+                candidates.append(self._indexes["phase"].get(phase, set()))
+            if node:
+                candidates.append(self._indexes["node"].get(node, set()))
+            for key, value in (labels or {}).items():
+                candidates.append(self._indexes["label"].get(f"{key}={value}", set()))
+            if exclude_phase and not candidates:
+                # Usually only a few pods are outside the excluded phase; union those instead.
+                candidates.append(set().union(*(keys for value, keys in self._indexes["phase"].items()
+                                                 if value != exclude_phase)))
+            if candidates:
+                candidates.sort(key=len)
+                keys = candidates[0].intersection(*candidates[1:])
+            else:
+                keys = set(self._pods)
+            if exclude_phase:
+                keys = keys - self._indexes["phase"].get(exclude_phase, set())
+            return [self._pods[key] for key in sorted(keys)]
+
+
+class ObjectStore:
+    """Rows built by ``row`` for each object, keyed by (namespace, name), fed by an Informer.
+
+    ``version`` changes only when a row actually changes, so status-only
+    updates such as node heartbeats do not count as changes.
+    """
+
+    def __init__(self, row):
+        self.row = row
+        self.version = 0
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(obj):
+        return obj["metadata"].get("namespace") or "", obj["metadata"]["name"]
+
+    def replace(self, items):
+        rows = {self._key(obj): self.row(obj) for obj in items}
+        with self._lock:
+            self._rows = rows
+            self.version += 1
+
+    def upsert(self, obj):
+        key, row = self._key(obj), self.row(obj)
+        with self._lock:
+            if self._rows.get(key) != row:
+                self._rows[key] = row
+                self.version += 1
+
+    def delete(self, obj):
+        with self._lock:
+            if self._rows.pop(self._key(obj), None) is not None:
+                self.version += 1
+
+    def rows(self):
+        with self._lock:
+            return [self._rows[key] for key in sorted(self._rows)]
+
+
+class Informer:
+    """Keeps a store in sync with the cluster using one LIST followed by a WATCH.
+
+    The watch resumes from the last seen resourceVersion (advanced by
+    bookmarks while nothing changes) and falls back to a full re-LIST when
+    the server answers 410 Gone because that version has been compacted.
+    The LIST is paged (``PAGE_SIZE`` objects per request) and handed to the
+    store's replace() as an iterator, so a store that keeps compact records
+    never holds the whole raw LIST. Errors in ``FATAL_STATUS`` (e.g. 403 when RBAC only allows some
+    namespaces) are not retried: the informer stops, keeps the error and
+    reports itself unsynced, so callers fall back to plain LISTs.
+    """
+
+    FATAL_STATUS = {401, 403, 404}
+
+    def __init__(self, kind, store, namespace=None, context=None, watch_timeout=300, params=None):
+        self.kind = kind
+        self.store = store
+        self.namespace = namespace
+        self.params = params or {}
+        self.context = context
+        self.watch_timeout = watch_timeout
+        self.resource_version = None
+        self.synced = threading.Event()
+        self.fresh = threading.Event()
+        self.error = None
+        self._settled = threading.Event()
+        self._stop = threading.Event()
+        self._stream = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+
+    def wait_synced(self, timeout=None):
+        """Wait for the first LIST; returns False at once if the informer has failed for good."""
+        self._settled.wait(timeout)
+        return self.synced.is_set()
+
+    def resume(self, resource_version):
+        """Treat the store as synced at ``resource_version`` (e.g. loaded from a snapshot) and only WATCH from it.
+
+        The watch replays what changed since; if the version is too old the
+        server answers 410 Gone and the informer re-LISTs as usual.
+        """
+        self.resource_version = resource_version
+        self.synced.set()
+        self._settled.set()
+        return self
+
+    def _pages(self, metadata):
+        params = dict(self.params, limit=PAGE_SIZE)
+        while True:
+            result = get_backend(self.context).request("GET", resource_path(self.kind, self.namespace),
+                                                       params=params)
+            metadata.update(result.get("metadata") or {})
+            yield from result.get("items", [])
+            if not metadata.get("continue"):
+                return
+            params["continue"] = metadata.pop("continue")
+
+    def _list(self):
+        metadata = {}
+        self.store.replace(self._pages(metadata))
+        self.resource_version = metadata.get("resourceVersion")
+        self.synced.set()
+        self._settled.set()
+        self.fresh.set()
+
+    def _watch(self):
+        params = dict(self.params, watch="true", allowWatchBookmarks="true",
+                      resourceVersion=self.resource_version, timeoutSeconds=self.watch_timeout)
+        self._stream = get_backend(self.context).request(
+            "GET", resource_path(self.kind, self.namespace), params=params, stream=True,
+            timeout=self.watch_timeout + 30)
+        self.fresh.set()
+        with self._stream as stream:
+            for line in stream:
+                if self._stop.is_set():
+                    return
+                if not line.strip():
+                    continue
+                event = decode_json(line)
+                obj = event.get("object") or {}
+                if event.get("type") == "ERROR":
+                    raise KubeApiError(obj.get("code", 500), obj.get("message", "watch error"))
+                if event.get("type") in ("ADDED", "MODIFIED"):
+                    self.store.upsert(obj)
+                elif event.get("type") == "DELETED":
+                    self.store.delete(obj)
+                self.resource_version = obj.get("metadata", {}).get("resourceVersion", self.resource_version)
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                if self.resource_version is None:
+                    self._list()
+                self._watch()
+                backoff = 1
+            except KubeApiError as e:
+                if e.status == 410:
+                    self.resource_version = None
+                    continue
+                if e.status in self.FATAL_STATUS:
+                    self.error = e
+                    self.synced.clear()
+                    self._settled.set()
+                    return
+                if self._stop.wait(backoff):
+                    return
+                backoff = min(backoff * 2, 30)
+            except ValueError:
+                # A truncated event; resume from the last good resourceVersion, backing
+                # off in case the server keeps cutting the stream short.
+                if self._stop.wait(backoff):
+                    return
+                backoff = min(backoff * 2, 30)
+
+
+_pod_informers = {}
+_pod_informers_lock = threading.Lock()
+
+
+def pod_store(context=None):
+    """Return the synced pod store of ``context``, starting its informer on first use.
+
+    Returns None when watching is disabled (``KUBERMON_WATCH=0``) or the
+    informer failed for good, e.g. because pods cannot be listed cluster-wide.
+    """
+    if not KUBE_WATCH:
+        return None
+    context = context or current_context()
+    # Prefetch threads and the foreground may ask at once; only one of them starts the informer.
+    with _pod_informers_lock:
+        informer = _pod_informers.get(context)
+        if informer is None:
+            informer = _pod_informers[context] = Informer("pods", PodStore(), context=context)
+            saved = _snapshot.load(context, "pods") if _snapshot is not None else None
+            if saved is not None and saved[1]:
+                informer.store.replace_records([PodRecord.restore(values) for values in saved[0]])
+                informer.resume(saved[1])
+                _stale_note("pods", saved[2])
+            informer.start()
+    if informer.error is not None or not informer.wait_synced(REQUEST_TIMEOUT):
+        return None
+    return informer.store
+
+
+def save_snapshot():
+    """Write the cached name lists and the synced pod stores to the snapshot file."""
+    if _snapshot is None:
+        return
+    entries = resource_cache.snapshot_entries()
+    with _pod_informers_lock:
+        informers = list(_pod_informers.items())
+    for context, informer in informers:
+        if informer.fresh.is_set() and informer.resource_version:
+            entries.append((context, "pods", None, informer.resource_version,
+                            tuple(record.dump() for record in informer.store.records())))
+    _snapshot.save(entries)
+
+
+def stop_informers(keep=None):
+    """Stop the informers of every context except ``keep``."""
+    with _pod_informers_lock:
+        stopped = [_pod_informers.pop(c) for c in list(_pod_informers) if c != keep]
+    for informer in stopped:
+        informer.stop()
+
+
+def query_pods(namespace=None, **filters):
+    """Return PodRecords matching ``filters`` from the live store, or with a LIST when watching is off."""
+    store = pod_store()
+    if store is not None:
+        metrics.cache_lookup("pod_store", "hit")
+        return store.query(namespace=namespace, **filters)
+    metrics.cache_lookup("pod_store", "miss")
+    result = kube_request("GET", resource_path("pods", namespace), params=_pod_selectors(filters))
+    with gc_paused():
+        return [PodRecord.from_pod(pod) for pod in result.get("items", [])]
+
+
+def iter_pods(namespace=None, limit=PAGE_SIZE, **filters):
+    """Yield pages of PodRecords matching ``filters``: slices of the live store, or chunked LISTs.
+
+    Without the store only one page of pods is held in memory at a time.
+    """
+    store = pod_store()
+    if store is not None:
+        pods = store.query(namespace=namespace, **filters)
+        for start in range(0, len(pods), limit):
+            yield pods[start:start + limit]
+        return
+    for items in list_pages("pods", namespace, limit=limit, **_pod_selectors(filters)):
+        yield [PodRecord.from_pod(pod) for pod in items]
+
+
+def _pod_selectors(filters):
+    """Translate query_pods filters into fieldSelector/labelSelector parameters."""
+    selectors = []
+    if filters.get("phase"):
+        selectors.append(f"status.phase={filters['phase']}")
+    if filters.get("exclude_phase"):
+        selectors.append(f"status.phase!={filters['exclude_phase']}")
+    if filters.get("node"):
+        selectors.append(f"spec.nodeName={filters['node']}")
+    labels = ",".join(f"{k}={v}" for k, v in (filters.get("labels") or {}).items())
+    return {"fieldSelector": ",".join(selectors), "labelSelector": labels}
+
+
+def pod_status(pod):
+    """Return the pod status shown by kubectl (e.g. CrashLoopBackOff, Evicted, Terminating)."""
+    status = pod.get("status") or {}
+    reason = status.get("reason") or status.get("phase") or "Unknown"
+    for container in status.get("containerStatuses") or []:
+        state = container.get("state") or {}
+        if state.get("waiting", {}).get("reason"):
+            reason = state["waiting"]["reason"]
+        elif state.get("terminated", {}).get("reason"):
+            reason = state["terminated"]["reason"]
+    if pod["metadata"].get("deletionTimestamp"):
+        reason = "Terminating"
+    return reason
+
+
+def format_age(timestamp):
+    """Format an RFC 3339 timestamp as a kubectl-style age (e.g. 5m, 3h, 12d)."""
+    if not timestamp:
+        return "<unknown>"
+    created = datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    seconds = int((datetime.datetime.now(datetime.timezone.utc) - created).total_seconds())
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit}"
+    return f"{max(seconds, 0)}s"
+
+
+def format_table(headers, rows):
+    """Return the lines of a left-aligned table in the style of kubectl get, headers first."""
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    return ["   ".join(str(value).ljust(width) for value, width in zip(row, widths)).rstrip()
+            for row in [headers] + rows]
+
+
+def print_table(headers, rows, stream=None):
+    """Print rows as a left-aligned table in the style of kubectl get."""
+    if not rows:
+        print("No resources found", file=stream)
+        return
+    for line in format_table(headers, rows):
+        print(line, file=stream)
+
+
+def print_pods(pods):
+    """Print pod records with the default kubectl get pods columns."""
+    rows = [[pod.name, f"{pod.ready}/{pod.total}", pod.status, pod.restarts, format_age(pod.created)]
+            for pod in pods]
+    print_table(["NAME", "READY", "STATUS", "RESTARTS", "AGE"], rows)
+
+
+def show_commands():
+    """Function to display the list of available commands."""
+    commands = [
+        "get-nodes",
+        "get-contexts",
+        "select-context",
+        "list-namespaces",
+        "not-running-pods",
+        "delete-pods",
+        "list-deployments",
+        "check-deployment-status",
+        "cordon-nodes",
+        "list-pods",
+        "list-pods-on-nodes",
+        "image-version",
+        "image-inventory",
+        "restart-deployment",
+        "restart-deployments",
+        "check-crash-log",
+        "crash-triage",
+        "events",
+        "all-events",
+        "list-pod-with-labels",
+        "list-containers",
+        "container-logs",
+        "deploy-logs",
+        "services-logs",
+        "dashboard"
+    ]
+    return commands
+
+
+def clear_screen():
+    """Clear the terminal screen."""
+    os.system("clear")  # On Linux/MacOS
+    # os.system("cls")  # On Windows
+
+def get_contexts():
+    try:
+        rows, columns = context_table()
+    except KubeConfigError as e:
+        print(f"Error executing command: {e}")
+        return
+    lines = format_table([column.upper() for column in columns], [[row[column] for column in columns] for row in rows])
+    print(lines[0])
+    for row, line in zip(rows, lines[1:]):
+        print(colored(line, 'green') if row["current"] else line)
+
+def select_context():
+    """Function to select and switch to a Kubernetes context."""
+    global _current_context
+    contexts = list_contexts()
+    if not contexts:
+        print("No contexts found.")
+        return
+
+    selected_context = fuzzy_select("Select a Kubernetes context:", contexts)
+    if selected_context is None:
+        print("No context selected.")
+        return
+    if selected_context:
+        print(f"Switching to context: {selected_context}")
+        switch_command = f"kubectl config use-context {selected_context}"
+        result = run_kubectl_command(switch_command)
+        _current_context = selected_context
+        resource_cache.invalidate()
+        stop_informers(keep=selected_context)
+        print(f"{result} DONE...")
+    else:
+        print("No context selected.")
+
+def list_not_running_pods():
+    """Function to list all pods not in the Running state in the selected namespaces."""
+    selected_namespaces = select_namespaces("Select Kubernetes namespaces")
+    if selected_namespaces:
+        print(f"Listing pods not in the Running state in namespaces: {', '.join(selected_namespaces)}")
+        rows = fan_out_rows(lambda ns: [pod_row(pod) for pod in query_pods(ns, exclude_phase="Running")],
+                            selected_namespaces)
+        write_rows(rows, namespace_columns(selected_namespaces, ["name", "ready", "status", "restarts", "age"]))
+    else:
+        print("No namespace selected.")
+
+def delete_pods():
+    """Function to delete pods not in the Running state in a selected namespace."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    selected_namespace = fuzzy_select("Select a Kubernetes namespace to delete pods not in Running state:", namespaces)
+    if selected_namespace is None:
+        print("No namespace selected.")
+        return
+    if selected_namespace:
+        pods = find_pods_to_delete(selected_namespace)
+        if not pods:
+            print("No resources found")
+            return
+        confirm = inquirer.prompt([inquirer.Confirm(
+            "confirm", message=f"Delete {pod_count_summary(pods)} in namespace {selected_namespace}?")])
+        if not confirm or not confirm.get("confirm"):
+            print("Nothing deleted.")
+            return
+        print(f"Deleting pods not in the Running state in namespace: {selected_namespace}")
+        runner = delete_pods_bulk(pods)
+        print("Deletion complete.")
+        print(runner.summary())
+        for pod, error in runner.failed:
+            print(f"{colored('failed', 'red')} pod/{pod.name}: {error}")
+    else:
+        print("No namespace selected.")
+
+def list_deployments():
+    """Function to list deployments in the selected namespaces."""
+    selected_namespaces = select_namespaces("Select Kubernetes namespaces to list deployments")
+    if selected_namespaces:
+        print(f"Listing deployments in namespaces: {', '.join(selected_namespaces)}")
+        rows = fan_out_rows(list_deployment_rows, selected_namespaces)
+        if not rows:
+            print(f"{colored('No resources found', 'red')} in the selected namespaces.")
+            return
+        write_rows(rows, namespace_columns(selected_namespaces, ["name", "ready", "up_to_date", "available", "age"]))
+    else:
+        print("No namespace selected.")
+
+def check_deployment_status():
+    """Function to check the rollout status of a deployment in a selected namespace."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    selected_namespace = fuzzy_select("Select a Kubernetes namespace:", namespaces)
+    if selected_namespace is None:
+        print("No namespace selected.")
+        return
+    if selected_namespace:
+        print(f"Select a deployment in namespace: {selected_namespace}")
+        deployments = get_deployments(selected_namespace)
+
+        if not deployments:
+            print(f"No deployments found in namespace {selected_namespace}.")
+            return
+
+        deployment_question = [
+            inquirer.Checkbox(
+                "deployments",
+                message="Select deployments to track (space to select):",
+                choices=deployments,
+            ),
+        ]
+
+        deployment_answers = inquirer.prompt(deployment_question)
+        if not deployment_answers or not deployment_answers.get('deployments'):
+            print("No deployment selected.")
+            return
+
+        selected_deployments = deployment_answers['deployments']
+        print(f"Tracking the rollout of {len(selected_deployments)} deployments in namespace: {selected_namespace}")
+        tracker = RolloutTracker([(selected_namespace, name) for name in selected_deployments])
+        rows = tracker.run()
+        write_rows(rows, ["name", "result", "seconds", "message"])
+        print(tracker.report(rows))
+    else:
+        print("No namespace selected.")
+
+def cordon_node():
+    """Function to cordon, uncordon or drain Kubernetes nodes."""
+    nodes = get_nodes()
+    if not nodes:
+        print("No nodes found.")
+        return
+
+    answers = inquirer.prompt([
+        inquirer.List("action", message="Select an action:", choices=["cordon", "uncordon", "drain"], carousel=True),
+        inquirer.Text("selector", message="Node label selector (blank to pick nodes from a list)"),
+    ])
+    if answers is None:
+        print("No node selected.")
+        return
+
+    if answers.get("selector", "").strip():
+        selected_nodes = nodes_matching(answers["selector"].strip())
+    else:
+        node_answers = inquirer.prompt([inquirer.Checkbox("nodes", message=f"Select nodes to {answers['action']}:",
+                                                          choices=nodes)])
+        selected_nodes = node_answers.get("nodes") if node_answers else None
+    if selected_nodes:
+        overrides = {}
+        if answers["action"] == "drain":
+            overrides = inquirer.prompt([
+                inquirer.Confirm("force", message="Also evict pods not managed by a controller? "
+                                 "They will not be recreated", default=False),
+                inquirer.Confirm("delete_emptydir_data", message="Also evict pods with emptyDir volumes? "
+                                 "Their data will be lost", default=False),
+            ])
+            if overrides is None:
+                print("No node selected.")
+                return
+        print(f"Running {answers['action']} on {len(selected_nodes)} nodes: {', '.join(selected_nodes)}")
+        operations = NodeOperations(answers["action"], **overrides)
+        rows = operations.run(selected_nodes)
+        write_rows(rows, ["node", "result", "evicted", "seconds", "error"])
+        print(operations.report(rows))
+    else:
+        print("No node selected.")
+
+def list_pods_on_node():
+    """Function to list pods on a selected node in a specific namespace."""
+    nodes = get_nodes()
+    if not nodes:
+        print("No nodes found.")
+        return
+
+    selected_node = fuzzy_select("Select a node to list pods:", nodes)
+    if selected_node is None:
+        print("No node selected.")
+        return
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    selected_namespace = fuzzy_select("Select a namespace:", namespaces)
+    if selected_namespace is None:
+        print("No namespace selected.")
+        return
+    if selected_node and selected_namespace:
+        print(f"Listing pods on node: {selected_node} in namespace: {selected_namespace}")
+        print_pods(query_pods(selected_namespace, node=selected_node))
+    else:
+        print("No node or namespace selected.")
+
+def list_pods_on_all_nodes():
+    """Function to list all pods across all nodes."""
+    print("Listing all pods across all nodes:")
+    stream_rows(([{"name": pod.name, "status": pod.phase, "node": pod.node or "<none>"} for pod in page]
+                 for page in iter_pods()), ["name", "status", "node"])
+
+def list_pod_images():
+    """Function to list pod images in the selected namespaces."""
+    selected_namespaces = select_namespaces("Select namespaces to list pod images")
+    if selected_namespaces:
+        print(f"Listing all pod images in namespaces: {', '.join(selected_namespaces)}")
+        rows = fan_out_rows(pod_image_rows, selected_namespaces)
+        if rows:
+            write_rows(rows, namespace_columns(selected_namespaces, ["pod", "container", "image"]))
+        else:
+            print(f"No pods found in namespaces: {', '.join(selected_namespaces)}")
+    else:
+        print("No namespace selected.")
+
+def image_inventory():
+    """Function to summarize the images running in the selected namespaces."""
+    selected_namespaces = select_namespaces("Select namespaces to take the image inventory of")
+    if not selected_namespaces:
+        print("No namespace selected.")
+        return
+    view = fuzzy_select("Group images by:", list(ImageInventory.VIEWS))
+    if view is None:
+        print("No view selected.")
+        return
+    inventory = ImageInventory.collect(selected_namespaces)
+    if not inventory.pod_count:
+        print(f"No pods found in namespaces: {', '.join(selected_namespaces)}")
+        return
+    image = None
+    if view == "version":
+        image = fuzzy_select("Show the versions of:", inventory.repositories())
+        if image is None:
+            print("No image selected.")
+            return
+    write_rows(inventory.rows(view, image), inventory.columns(view))
+
+def restart_deployment():
+    """Function to restart a deployment in a selected namespace."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    selected_namespace = fuzzy_select("Select a namespace to restart a deployment:", namespaces)
+    if selected_namespace is None:
+        print("No namespace selected.")
+        return
+    if selected_namespace:
+        print(f"Select a deployment to restart in namespace: {selected_namespace}")
+        deployments = get_deployments(selected_namespace)
+
+        if not deployments:
+            print(f"No deployments found in namespace: {selected_namespace}")
+            return
+
+        selected_deployment = fuzzy_select(f"Select a deployment to restart in namespace: {selected_namespace}",
+                                           deployments)
+        if selected_deployment is None:
+            print("No deployment selected.")
+            return
+        if selected_deployment:
+            print(f"Restarting deployment: {selected_deployment} in namespace: {selected_namespace}")
+            rollout_restart(selected_namespace, selected_deployment)
+            print(f"Deployment {selected_deployment} in namespace {selected_namespace} has been restarted.")
+        else:
+            print("No deployment selected.")
+    else:
+        print("No namespace selected.")
+
+
+def restart_deployments():
+    """Function to restart many deployments in waves."""
+    selected_namespaces = select_namespaces("Select namespaces to restart deployments in")
+    if not selected_namespaces:
+        print("No namespace selected.")
+        return
+    answers = inquirer.prompt([
+        inquirer.Text("selector", message="Label selector (empty for all)"),
+        inquirer.Text("match", message="Name regex (empty for all)"),
+        inquirer.Text("wave_size", message="Deployments per wave", default="10",
+                      validate=lambda _, value: not value.strip() or value.strip().isdigit() and int(value) >= 1),
+    ])
+    if answers is None:
+        print("No selection made.")
+        return
+    targets = deployments_matching(selected_namespaces, answers["selector"], answers["match"])
+    if not targets:
+        print("No deployments matched.")
+        return
+    wave_size = int(answers["wave_size"].strip() or 10)
+    waves = -(-len(targets) // wave_size)
+    confirm = inquirer.prompt([inquirer.Confirm(
+        "confirm", message=f"Restart {len(targets)} deployments in {waves} waves?", default=False)])
+    if not confirm or not confirm["confirm"]:
+        print("Restart cancelled.")
+        return
+    restart = WaveRestart(wave_size)
+    rows = restart.run(targets)
+    write_rows(rows, ["wave", "namespace", "name", "result", "seconds", "message"])
+    print(restart.report(rows))
+
+
+def crashed_pod_names(namespace):
+    """Names of the pods in ``namespace`` that are not Running or have a failing container."""
+    names = {pod.name for pod in query_pods(namespace, exclude_phase="Running")}
+    names.update(row["pod"] for page in list_pages("pods", namespace, fieldSelector="status.phase=Running")
+                 for pod in page for row in crash_rows(pod))
+    return sorted(names)
+
+def check_crash_log():
+    """Function to check logs of a crashed pod."""
+    namespaces = get_namespaces()
+
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    with Prefetcher(crashed_pod_names) as crashed:
+        selected_namespace = fuzzy_select("Select a namespace to check logs of a crashed pod:", namespaces,
+                                          on_highlight=crashed)
+        if selected_namespace is None:
+            print("No namespace selected. Exiting.")
+            sys.exit(1)
+        crashed_pods = crashed.get(selected_namespace)
+    if selected_namespace:
+        print(f"Select a crashed pod in namespace: {selected_namespace}")
+        if not crashed_pods:
+            print(f"No crashed pods found in namespace: {selected_namespace}")
+            return
+
+        selected_pod = fuzzy_select(f"Select a crashed pod in namespace: {selected_namespace}", crashed_pods)
+        if selected_pod is None:
+            print("No pod selected. Exiting.")
+            sys.exit(1)
+        if selected_pod:
+            print(f"Fetching logs for pod: {selected_pod} in namespace: {selected_namespace}")
+            print_pod_logs(selected_namespace, selected_pod, previous=True)
+        else:
+            print("No pod selected.")
+    else:
+        print("No namespace selected. Exiting.")
+        sys.exit(1)
+
+def crash_triage():
+    """Function to rank the failing containers of the selected namespaces by failure class."""
+    selected_namespaces = select_namespaces("Select namespaces to triage")
+    if not selected_namespaces:
+        print("No namespace selected.")
+        return
+    print(f"Triaging failing containers in namespaces: {', '.join(selected_namespaces)}")
+    rows = CrashTriage().run(selected_namespaces)
+    if not rows:
+        print(f"No failing containers found in namespaces: {', '.join(selected_namespaces)}")
+        return
+    classes = CrashTriage.classes(rows)
+    write_rows(classes, CrashTriage.CLASS_COLUMNS)
+    choices = {f"{group['reason']} {group['signature']} ({group['pods']} pods): {group['example']}": group
+               for group in classes}
+    choice = fuzzy_select("Show the log of a failure class (Esc to skip):", list(choices))
+    if choice:
+        example = choices[choice]["example"]
+        namespace, pod, container = example.split("/")
+        previous = any(row["log"] == "previous" for row in rows
+                       if f"{row['namespace']}/{row['pod']}/{row['container']}" == example)
+        print(f"Fetching logs for pod: {pod} in namespace: {namespace}")
+        print_pod_logs(namespace, pod, container, previous=previous)
+
+def get_events():
+    """Function to fetch events for the selected namespaces."""
+    selected_namespaces = select_namespaces("Select namespaces to get events")
+    if selected_namespaces:
+        answer = inquirer.prompt([inquirer.Confirm("watch", message="Follow new events (Ctrl-C to stop)?",
+                                                   default=False)])
+        if answer and answer["watch"]:
+            print(f"Following events for namespaces: {', '.join(selected_namespaces)} (Ctrl-C to stop)...")
+            tail_events(selected_namespaces)
+            return
+        print(f"Fetching events for namespaces: {', '.join(selected_namespaces)}")
+        rows = fan_out_rows(list_events, selected_namespaces, key=lambda row: row["last_seen"] or "")
+        if rows:
+            write_rows(rows, namespace_columns(selected_namespaces,
+                                               ["last_seen", "type", "reason", "object", "message"]))
+        else:
+            print(f"No events found in namespaces: {', '.join(selected_namespaces)}")
+    else:
+        print("No namespace selected. Exiting.")
+        sys.exit(1)
+
+def get_all_events():
+    """Function to fetch all events across all namespaces, or follow new ones."""
+    answers = inquirer.prompt([
+        inquirer.Confirm("watch", message="Follow new events (Ctrl-C to stop)?", default=False),
+        inquirer.List("type", message="Event type:", choices=["All", "Warning", "Normal"], carousel=True),
+    ])
+    if answers is None:
+        print("No selection made.")
+        return
+    field_selector = event_field_selector(None if answers["type"] == "All" else answers["type"])
+    if answers.get("watch"):
+        print("Following events across all namespaces (Ctrl-C to stop)...")
+        tail_events(None, field_selector)
+        return
+    print("Fetching all events across all namespaces...")
+    rows = list_events(None, field_selector)
+    if rows:
+        write_rows(rows, ["namespace", "last_seen", "type", "reason", "object", "message"])
+    else:
+        print("No events found.")
+
+def list_pods_with_labels():
+    """Function to list pods with labels in a selected namespace."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    selected_namespace = fuzzy_select("Select a namespace to list pods with labels:", namespaces)
+    if selected_namespace is None:
+        print("No namespace selected. Exiting.")
+        sys.exit(1)
+    if selected_namespace:
+        print(f"Listing pods with labels in namespace: {selected_namespace}")
+        stream_rows(([pod_label_row(pod) for pod in page] for page in iter_pods(selected_namespace)),
+                    ["name", "ready", "status", "restarts", "age", "labels"])
+    else:
+        print("No namespace selected. Exiting.")
+        sys.exit(1)
+
+def list_containers():
+    """Function to list all containers (init and non-init) in pods within a selected namespace."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    selected_namespace = fuzzy_select("Select a namespace to list all containers in pods:", namespaces)
+    if selected_namespace is None:
+        print("No namespace selected. Exiting.")
+        sys.exit(1)
+    if selected_namespace:
+        print(f"Listing all containers (init and non-init) in pods within namespace: {selected_namespace}")
+        stream_rows(([pod_container_row(pod) for pod in page] for page in iter_pods(selected_namespace)),
+                    ["name", "init_containers", "containers"])
+    else:
+        print("No namespace selected. Exiting.")
+        sys.exit(1)
+
+def container_logs():
+    """Function to fetch logs for a specific container in a pod within a selected namespace."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    # Fetch the pods of the highlighted namespace, then the containers of the highlighted pod, while prompting.
+    with Prefetcher(lambda namespace: list_names("pods", namespace)) as pods_in:
+        selected_namespace = fuzzy_select("Select a namespace to get logs for a specific container in a pod:",
+                                          namespaces, on_highlight=pods_in)
+        if selected_namespace is None:
+            print("No namespace selected. Exiting.")
+            sys.exit(1)
+        print(f"Select a pod in namespace {selected_namespace}:")
+        pods = pods_in.get(selected_namespace)
+    if not pods:
+        print(f"No pods found in namespace {selected_namespace}.")
+        return
+
+    with Prefetcher(lambda pod: pod_container_names(selected_namespace, pod)) as containers_of:
+        selected_pod = fuzzy_select(f"Select a pod in namespace {selected_namespace}:", pods,
+                                    on_highlight=containers_of)
+        if selected_pod is None:
+            print("No pod selected. Exiting.")
+            sys.exit(1)
+        print(f"Select a container in pod {selected_pod}:")
+        containers = containers_of.get(selected_pod)
+    if not containers:
+        print(f"No containers found in pod {selected_pod}.")
+        return
+
+    selected_container = fuzzy_select(f"Select a container in pod {selected_pod}:", containers)
+    if selected_container is None:
+        print("No container selected. Exiting.")
+        sys.exit(1)
+    options = prompt_log_options()
+    print(
+        f"Fetching logs for container {selected_container} in pod {selected_pod} in namespace {selected_namespace}...")
+    if not print_pod_logs(selected_namespace, selected_pod, selected_container, **options):
+        print(f"No logs found for container {selected_container} in pod {selected_pod}.")
+
+def deploy_logs():
+    """Function to fetch logs for a specific deployment within a selected namespace."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    with Prefetcher(lambda namespace: list_names("deployments", namespace)) as deployments_in:
+        selected_namespace = fuzzy_select("Select a namespace to get logs for a deployment:", namespaces,
+                                          on_highlight=deployments_in)
+        if selected_namespace is None:
+            print("No namespace selected. Exiting.")
+            sys.exit(1)
+        print(f"Select a deployment in namespace {selected_namespace}:")
+        deployments = deployments_in.get(selected_namespace)
+    if not deployments:
+        print(f"No deployments found in namespace {selected_namespace}.")
+        return
+
+    selected_deployment = fuzzy_select(f"Select a deployment in namespace {selected_namespace}:", deployments)
+    if selected_deployment is None:
+        print("No deployment selected. Exiting.")
+        sys.exit(1)
+    options = prompt_log_options()
+    print(f"Fetching logs for deployment {selected_deployment} in namespace {selected_namespace}...")
+    if not print_selector_logs(selected_namespace, "deployments", selected_deployment, **options):
+        print(f"No logs found for deployment {selected_deployment} in namespace {selected_namespace}.")
+
+def services_logs():
+    """Function to fetch logs for a specific service within a selected namespace."""
+    namespaces = get_namespaces()
+    if not namespaces:
+        print("No namespaces found.")
+        return
+
+    with Prefetcher(lambda namespace: list_names("services", namespace)) as services_in:
+        selected_namespace = fuzzy_select("Select a namespace to get logs for a service:", namespaces,
+                                          on_highlight=services_in)
+        if selected_namespace is None:
+            print("No namespace selected. Exiting.")
+            sys.exit(1)
+        print(f"Select a service in namespace {selected_namespace}:")
+        services = services_in.get(selected_namespace)
+    if not services:
+        print(f"No services found in namespace {selected_namespace}.")
+        return
+
+    selected_service = fuzzy_select(f"Select a service in namespace {selected_namespace}:", services)
+    if selected_service is None:
+        print("No service selected. Exiting.")
+        sys.exit(1)
+    options = prompt_log_options()
+    print(f"Fetching logs for service {selected_service} in namespace {selected_namespace}...")
+    if not print_selector_logs(selected_namespace, "services", selected_service, **options):
+        print(f"No logs found for service {selected_service} in namespace {selected_namespace}.")
+
+def dashboard():
+    """Function to show the live dashboard for the selected namespaces."""
+    selected_namespaces = select_namespaces("Select namespaces for the dashboard")
+    if not selected_namespaces:
+        print("No namespace selected.")
+        return
+    Dashboard(selected_namespaces).run()
+
+def parse_since(value):
+    """Return log query parameters for ``--since`` values like 30s, 5m, 2h or an RFC 3339 time."""
+    if not value:
+        return {}
+    match = re.fullmatch(r"(\d+)([smhd]?)", value.strip())
+    if match:
+        seconds = int(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+        return {"sinceSeconds": seconds}
+    return {"sinceTime": value}
+
+
+class LogRing:
+    """Bounded FIFO of log lines between a network reader and the terminal.
+
+    When full, the reader either waits (backpressure, the default) or, with
+    ``drop``, discards the oldest lines so a live tail never lags behind.
+    Either way memory stays bounded by ``capacity`` lines.
+    """
+
+    def __init__(self, capacity=LOG_BUFFER_LINES, drop=False, notify=None):
+        self.capacity = max(capacity, 1)
+        self.drop = drop
+        self.notify = notify
+        self.dropped = 0
+        self.closed = False
+        self._lines = collections.deque()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._lines)
+
+    def put(self, line):
+        """Append a line; returns False once the ring has been closed."""
+        with self._cond:
+            while len(self._lines) >= self.capacity and not self.drop and not self.closed:
+                self._cond.wait()
+            if self.closed:
+                return False
+            if len(self._lines) >= self.capacity:
+                self._lines.popleft()
+                self.dropped += 1
+            self._lines.append(line)
+            self._cond.notify_all()
+        if self.notify is not None:
+            self.notify.set()
+        return True
+
+    def get(self, timeout=None):
+        """Return the oldest line, or None when closed and drained (or on timeout)."""
+        with self._cond:
+            if not self._lines and not self.closed:
+                self._cond.wait_for(lambda: self._lines or self.closed, timeout)
+            if not self._lines:
+                return None
+            line = self._lines.popleft()
+            self._cond.notify_all()
+            return line
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        if self.notify is not None:
+            self.notify.set()
+
+    def __iter__(self):
+        while True:
+            line = self.get()
+            if line is None:
+                return
+            yield line
+
+
+def open_log_stream(namespace, pod, container=None, follow=False, since=None, tail=None,
+                    previous=False, timestamps=False, context=None):
+    """Open a streamed pod log; the caller must close the returned line iterator."""
+    params = {"container": container, "follow": "true" if follow else None,
+              "previous": "true" if previous else None, "tailLines": tail,
+              "timestamps": "true" if timestamps else None}
+    params.update(parse_since(since))
+    return get_backend(context).request("GET", resource_path("pods", namespace, pod, "log"), params=params,
+                                        stream=True, timeout=None if follow else REQUEST_TIMEOUT)
+
+
+def copy_log_stream(stream, out=None, capacity=LOG_BUFFER_LINES, drop=False):
+    """Write a log stream to ``out`` line by line as it arrives and return the line count.
+
+    A reader thread feeds a bounded LogRing, so nothing but the ring is held
+    in memory however large the log is. Ctrl-C stops a followed log.
+    """
+    out = out or sys.stdout
+    ring = LogRing(capacity, drop)
+
+    def read():
+        try:
+            for line in stream:
+                if not ring.put(line):
+                    break
+        except (KubeApiError, OSError, ValueError):
+            pass
+        finally:
+            ring.close()
+
+    threading.Thread(target=read, daemon=True).start()
+    count, reported = 0, 0
+    try:
+        for line in ring:
+            out.write(line if line.endswith("\n") else line + "\n")
+            count += 1
+            if not len(ring):
+                out.flush()
+            if ring.dropped > reported:
+                print(f"[kubermon: {ring.dropped - reported} log lines dropped]", file=sys.stderr)
+                reported = ring.dropped
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+        stream.close()
+        out.flush()
+    return count
+
+
+def print_pod_logs(namespace, pod, container=None, previous=False, buffer_lines=LOG_BUFFER_LINES, **options):
+    """Stream a pod log to stdout; returns the number of lines printed.
+
+    A followed log drops its oldest buffered lines rather than falling behind.
+    """
+    try:
+        stream = open_log_stream(namespace, pod, container, previous=previous, **options)
+    except KubeApiError as e:
+        print(f"Error executing command: {e}")
+        sys.exit(1)
+    return copy_log_stream(stream, capacity=buffer_lines, drop=bool(options.get("follow")))
+
+
+# Waiting reasons that mean a container cannot start or keeps dying.
+TRIAGE_WAITING_REASONS = {"CrashLoopBackOff", "ImagePullBackOff", "ErrImagePull", "InvalidImageName",
+                          "CreateContainerConfigError", "CreateContainerError", "RunContainerError"}
+
+# Timestamps, UUIDs, hex ids and numbers differ between pods failing the same way.
+_SIGNATURE_NOISE = re.compile(r"\d{4}-\d\d-\d\d[T ][\d:.,]+Z?|\b[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}\b"
+                              r"|\b0x[0-9a-f]+\b|\b[0-9a-f]*\d[0-9a-f]*\b", re.I)
+_SIGNATURE_HINT = re.compile(r"error|exception|fatal|panic|traceback|killed|fail|refused|denied|not found", re.I)
+
+
+def log_signature(lines, size=3):
+    """Return (hash, sample line) identifying the failure at the end of a log.
+
+    The last ``size`` lines that look like errors, or the last lines when none
+    do, are hashed with numbers, hex ids, UUIDs and timestamps blanked, so the
+    same failure in different pods gets the same hash.
+    """
+    lines = [line.strip() for line in lines if line.strip()]
+    picked = ([line for line in lines if _SIGNATURE_HINT.search(line)] or lines)[-size:]
+    if not picked:
+        return "", ""
+    normalized = "\n".join(_SIGNATURE_NOISE.sub("#", line) for line in picked)
+    return hashlib.blake2b(normalized.encode(), digest_size=4).hexdigest(), picked[-1]
+
+
+def crash_rows(pod, min_restarts=5):
+    """Return a triage row for each container of ``pod`` that is failing.
+
+    A container is failing when it waits for one of TRIAGE_WAITING_REASONS,
+    was OOM-killed, has terminated with a non-zero exit code or has restarted
+    at least ``min_restarts`` times. Pods report phase Running throughout a
+    crash loop, so the phase is not looked at.
+    """
+    metadata, status = pod["metadata"], pod.get("status") or {}
+    rows = []
+    for container in (status.get("initContainerStatuses") or []) + (status.get("containerStatuses") or []):
+        state = container.get("state") or {}
+        waiting = state.get("waiting") or {}
+        terminated = state.get("terminated") or {}
+        # The last death: the current state if the container is down, else the one before the restart.
+        death = terminated or (container.get("lastState") or {}).get("terminated") or {}
+        restarts = container.get("restartCount", 0)
+        if not (waiting.get("reason") in TRIAGE_WAITING_REASONS or restarts >= min_restarts
+                or death.get("reason") == "OOMKilled" or terminated.get("exitCode")):
+            continue
+        reason = death.get("reason") or waiting.get("reason") or "Restarting"
+        if reason == "Error" and death.get("exitCode") is not None:
+            reason = f"Error (exit {death['exitCode']})"
+        rows.append({"namespace": metadata.get("namespace"), "pod": metadata["name"], "container": container["name"],
+                     "state": waiting.get("reason") or terminated.get("reason") or "Running", "reason": reason,
+                     "restarts": restarts, "workload": workload_owner(metadata),
+                     # Which log shows the death: none, the current (dead) container's, or the previous one's.
+                     "log": "" if not death else "current" if terminated else "previous",
+                     "signature": "", "message": waiting.get("message") or death.get("message") or ""})
+    return rows
+
+
+class CrashTriage:
+    """Finds failing containers with one pod LIST and ranks them by failure class.
+
+    The tails of the logs the failing containers died with are fetched
+    concurrently, ``workers`` at a time, and each container is classified by
+    its termination reason and the log_signature of that tail (or of the
+    waiting message, for containers that never ran, e.g. ImagePullBackOff).
+    """
+
+    CLASS_COLUMNS = ["reason", "signature", "pods", "restarts", "workloads", "example", "message"]
+    DETAIL_COLUMNS = ["namespace", "pod", "container", "state", "reason", "restarts", "signature", "message"]
+
+    def __init__(self, min_restarts=5, tail=50, workers=None):
+        self.min_restarts = min_restarts
+        self.tail = tail
+        self.workers = workers or MAX_INFLIGHT
+
+    def find(self, namespaces=None):
+        """Return the failing containers of ``namespaces`` (every namespace when None)."""
+        def scan(namespace):
+            # Succeeded pods have nothing left to triage.
+            return [row for page in list_pages("pods", namespace, fieldSelector="status.phase!=Succeeded")
+                    for pod in page for row in crash_rows(pod, self.min_restarts)]
+        return [row for rows in fan_out(scan, namespaces or [None]) for row in rows]
+
+    def _classify(self, row):
+        lines = [row["message"]]
+        if row["log"]:
+            try:
+                stream = open_log_stream(row["namespace"], row["pod"], row["container"], tail=self.tail,
+                                         previous=row["log"] == "previous")
+                try:
+                    lines = collections.deque(stream, maxlen=self.tail) or lines
+                finally:
+                    stream.close()
+            except (KubeApiError, OSError) as e:
+                lines = [f"log unavailable: {e}"]
+        row["signature"], message = log_signature(lines)
+        row["message"] = message[:120]
+        return row
+
+    def run(self, namespaces=None):
+        """Find and classify the failing containers; returns the detail rows."""
+        return fan_out(self._classify, self.find(namespaces), max_workers=self.workers)
+
+    @staticmethod
+    def classes(rows):
+        """Group detail rows by (reason, signature), the largest failure classes first."""
+        groups = {}
+        for row in rows:
+            group = groups.setdefault((row["reason"], row["signature"]), {
+                "reason": row["reason"], "signature": row["signature"], "pods": set(), "restarts": 0,
+                "workloads": set(), "example": f"{row['namespace']}/{row['pod']}/{row['container']}",
+                "message": row["message"]})
+            group["pods"].add((row["namespace"], row["pod"]))
+            group["workloads"].add((row["namespace"], row["workload"]))
+            group["restarts"] += row["restarts"]
+        classes = [dict(group, pods=len(group["pods"]), workloads=len(group["workloads"])) for group in groups.values()]
+        return sorted(classes, key=lambda group: (-group["pods"], -group["restarts"], group["reason"]))
+
+
+def prompt_log_options():
+    """Ask whether to follow the log and how many trailing lines to show."""
+    answers = inquirer.prompt([
+        inquirer.Confirm("follow", message="Follow the log?", default=False),
+        inquirer.Text("tail", message="Number of most recent lines to show (blank for the whole log)"),
+    ])
+    if answers is None:
+        return {}
+    tail = (answers.get("tail") or "").strip()
+    return {"follow": answers.get("follow", False), "tail": int(tail) if tail.isdigit() else None}
+
+
+def selector_labels(namespace, kind, name):
+    """Return the label selector of a deployment or service as a query string."""
+    obj = kube_request("GET", resource_path(kind, namespace, name))
+    selector = (obj.get("spec") or {}).get("selector") or {}
+    selector = selector.get("matchLabels", selector) if kind == "deployments" else selector
+    return ",".join(f"{k}={v}" for k, v in sorted(selector.items()))
+
+
+def _log_timestamp_key(line):
+    """Split a timestamps=true log line into a sortable timestamp and the text.
+
+    RFC 3339 fractions have their trailing zeros trimmed, so they are padded
+    to nanoseconds to keep string order equal to time order.
+    """
+    stamp, _, text = line.partition(" ")
+    seconds, dot, fraction = stamp.rstrip("Z").partition(".")
+    return f"{seconds}.{fraction.ljust(9, '0')}" if dot else f"{seconds}.000000000", stamp, text
+
+
+class _PodLog:
+    __slots__ = ("pod", "container", "prefix", "ring", "stream")
+
+
+class LogAggregator:
+    """Streams the logs of every pod behind a label selector, merged in timestamp order.
+
+    Each pod log is read concurrently into its own LogRing (the total line
+    budget is split between them, and a full ring blocks its reader), and a
+    k-way heap merge writes the oldest pending line next with a per-pod
+    prefix. When following, a silent pod holds the merge back for at most
+    ``merge_delay`` seconds, and the selector is re-listed every ``rescan``
+    seconds so pods created by a rollout join the output.
+    """
+
+    def __init__(self, namespace, selector, container=None, follow=False, since=None, tail=None,
+                 timestamps=False, buffer_lines=LOG_BUFFER_LINES, max_pods=100, rescan=5.0,
+                 merge_delay=1.0, context=None):
+        self.namespace = namespace
+        self.selector = selector
+        self.container = container
+        self.follow = follow
+        self.since = since
+        self.tail = tail
+        self.timestamps = timestamps
+        self.buffer_lines = buffer_lines
+        self.max_pods = max_pods
+        self.rescan = rescan
+        self.merge_delay = merge_delay
+        self.context = context
+        self._sources = []
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+
+    def _pods(self):
+        result = get_backend(self.context).request("GET", resource_path("pods", self.namespace),
+                                                   params={"labelSelector": self.selector})
+        return sorted(result.get("items", []), key=lambda pod: pod["metadata"]["name"])
+
+    def _container(self, pod):
+        if self.container:
+            return self.container
+        annotations = pod["metadata"].get("annotations") or {}
+        default = annotations.get("kubectl.kubernetes.io/default-container")
+        return default or pod["spec"]["containers"][0]["name"]
+
+    def _scan(self, initial=False):
+        """Start streams for pods not seen yet; returns how many were added."""
+        added = 0
+        for pod in self._pods():
+            name = pod["metadata"]["name"]
+            if name in self._seen or len(self._seen) >= self.max_pods:
+                continue
+            source = _PodLog()
+            source.pod = name
+            source.container = self._container(pod)
+            source.prefix = f"[pod/{name}/{source.container}]"
+            try:
+                # New pods joining during a rollout are shown from their first line.
+                source.stream = open_log_stream(
+                    self.namespace, name, source.container, follow=self.follow, timestamps=True,
+                    since=self.since, tail=self.tail if initial else None, context=self.context)
+            except KubeApiError:
+                # Typically a container that has not started yet; retried on the next scan.
+                continue
+            self._seen.add(name)
+            source.ring = LogRing(max(self.buffer_lines // self.max_pods, 50), notify=self._ready)
+            threading.Thread(target=self._read, args=(source,), daemon=True).start()
+            with self._lock:
+                self._sources.append(source)
+            added += 1
+        return added
+
+    @staticmethod
+    def _read(source):
+        try:
+            for line in source.stream:
+                if not source.ring.put(_log_timestamp_key(line.rstrip("\n"))):
+                    break
+        except (KubeApiError, OSError, ValueError):
+            pass
+        finally:
+            source.ring.close()
+
+    def _rescan_loop(self):
+        while not self._stop.wait(self.rescan):
+            try:
+                self._scan()
+            except KubeApiError:
+                continue
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            sources = list(self._sources)
+        for source in sources:
+            source.ring.close()
+            source.stream.close()
+
+    def run(self, out=None):
+        """Write the merged logs to ``out`` and return the number of lines written."""
+        out = out or sys.stdout
+        try:
+            self._scan(initial=True)
+        except KubeApiError as e:
+            print(f"Error executing command: {e}")
+            sys.exit(1)
+        if not self._sources:
+            return 0
+        if self.follow:
+            threading.Thread(target=self._rescan_loop, daemon=True).start()
+        heap, heads, sequence, count = [], set(), itertools.count(), 0
+        # When each silent pod was first found without a pending line.
+        stalled = {}
+        try:
+            while not self._stop.is_set():
+                self._ready.clear()
+                with self._lock:
+                    sources = list(self._sources)
+                missing = []
+                now = time.monotonic()
+                for source in sources:
+                    if source.pod in heads:
+                        continue
+                    entry = source.ring.get(timeout=0)
+                    if entry is not None:
+                        heapq.heappush(heap, (entry[0], next(sequence), source, entry))
+                        heads.add(source.pod)
+                        stalled.pop(source.pod, None)
+                    elif source.ring.closed:
+                        with self._lock:
+                            self._sources.remove(source)
+                        stalled.pop(source.pod, None)
+                    else:
+                        missing.append(source)
+                        stalled.setdefault(source.pod, now)
+                if not heap:
+                    if not self.follow and not self._sources:
+                        break
+                    self._ready.wait(0.5)
+                    continue
+                if missing and self.follow:
+                    # Hold the merge back for each silent pod, up to merge_delay after it went silent.
+                    hold = max(self.merge_delay - (now - stalled[source.pod]) for source in missing)
+                    if hold > 0:
+                        self._ready.wait(hold)
+                        continue
+                elif missing:
+                    # Without follow every stream ends, so wait for its next line.
+                    self._ready.wait(0.5)
+                    continue
+                _, _, source, (_, stamp, text) = heapq.heappop(heap)
+                heads.discard(source.pod)
+                out.write(f"{source.prefix} {stamp + ' ' if self.timestamps else ''}{text}\n")
+                count += 1
+                if not heap:
+                    out.flush()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+            out.flush()
+        return count
+
+
+def print_selector_logs(namespace, kind, name, buffer_lines=LOG_BUFFER_LINES, **options):
+    """Stream the merged logs of every pod behind a deployment or service; returns the line count."""
+    selector = selector_labels(namespace, kind, name)
+    if not selector:
+        return 0
+    return LogAggregator(namespace, selector, buffer_lines=buffer_lines, **options).run()
+
+
+# HTTP statuses worth retrying: throttling and transient server errors (0 is a connection failure).
+RETRYABLE_STATUS = {0, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by concurrent workers."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(rate * 2, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def call_with_retry(fn, retries=5, limiter=None, base_delay=0.5, max_delay=10.0):
+    """Call ``fn`` (rate limited by ``limiter``), retrying 429/5xx with exponential backoff and jitter."""
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except KubeApiError as e:
+            if e.status not in RETRYABLE_STATUS or attempt == retries:
+                raise
+            time.sleep(min(base_delay * 2 ** attempt, max_delay) * random.uniform(0.5, 1.0))
+
+
+class BulkRunner:
+    """Applies one API action to many items on a bounded worker pool.
+
+    Calls are rate limited by a shared token bucket and retried on 429/5xx.
+    A progress line on stderr is refreshed while the workers run, and
+    ``run`` returns the per-item results for the final summary.
+    """
+
+    def __init__(self, action, label, workers=MAX_INFLIGHT, rate=BULK_QPS, retries=5,
+                 ignore_status=(), progress=True):
+        self.action = action
+        self.label = label
+        self.workers = max(workers, 1)
+        self.limiter = TokenBucket(rate) if rate else None
+        self.retries = retries
+        self.ignore_status = set(ignore_status)
+        self.progress = progress
+        self.succeeded = 0
+        self.failed = []
+        self.elapsed = 0.0
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _apply(self, item):
+        try:
+            call_with_retry(lambda: self.action(item), self.retries, self.limiter)
+            error = None
+        except KubeApiError as e:
+            error = None if e.status in self.ignore_status else str(e)
+        with self._lock:
+            if error is None:
+                self.succeeded += 1
+            else:
+                self.failed.append((item, error))
+        return error
+
+    def _report(self, total, done):
+        while not done.wait(0.25):
+            self._print_progress(total)
+        self._print_progress(total)
+        sys.stderr.write("\n")
+
+    def _print_progress(self, total):
+        finished = self.succeeded + len(self.failed)
+        rate = finished / max(time.monotonic() - self._start, 1e-6)
+        sys.stderr.write(f"\r{self.label}: {finished}/{total} done, {len(self.failed)} failed, {rate:.1f}/s ")
+        sys.stderr.flush()
+
+    def run(self, items):
+        """Apply the action to every item; returns a list of (item, error or None)."""
+        items = list(items)
+        self._start = time.monotonic()
+        done = threading.Event()
+        reporter = None
+        if self.progress and items:
+            reporter = threading.Thread(target=self._report, args=(len(items), done), daemon=True)
+            reporter.start()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.workers, len(items) or 1)) as pool:
+                errors = list(pool.map(self._apply, items))
+        finally:
+            done.set()
+            if reporter is not None:
+                reporter.join()
+        self.elapsed = time.monotonic() - self._start
+        return list(zip(items, errors))
+
+    def summary(self):
+        total = self.succeeded + len(self.failed)
+        rate = total / self.elapsed if self.elapsed else 0.0
+        return (f"{self.label}: {self.succeeded} succeeded, {len(self.failed)} failed "
+                f"in {self.elapsed:.1f}s ({rate:.1f}/s)")
+
+
+def find_pods_to_delete(namespace=None, status=None):
+    """Return the PodRecords not in the Running phase, from one LIST (all namespaces when ``namespace`` is None)."""
+    result = kube_request("GET", resource_path("pods", namespace), params={"fieldSelector": "status.phase!=Running"})
+    pods = [PodRecord.from_pod(pod) for pod in result.get("items", [])]
+    return [pod for pod in pods if status is None or pod.status == status]
+
+
+def delete_pods_bulk(pods, workers=MAX_INFLIGHT, rate=BULK_QPS, retries=5, progress=True):
+    """Force-delete PodRecords in parallel; returns the BulkRunner with the results."""
+    def delete(pod):
+        get_backend().request("DELETE", resource_path("pods", pod.namespace, pod.name),
+                              params={"gracePeriodSeconds": 0})
+    # A pod that is already gone counts as deleted.
+    runner = BulkRunner(delete, "delete pods", workers, rate, retries, ignore_status={404}, progress=progress)
+    runner.run(pods)
+    return runner
+
+
+def pod_count_summary(pods):
+    """Return "N pods (X Evicted, Y Failed, ...)" for a dry run."""
+    counts = collections.Counter(pod.status for pod in pods)
+    detail = ", ".join(f"{count} {status}" for status, count in counts.most_common())
+    return f"{len(pods)} pods" + (f" ({detail})" if detail else "")
+
+
+class StatusBoard:
+    """Live per-item status shown on stderr while a bulk operation runs.
+
+    On a terminal the board is redrawn in place: a count per state plus the
+    items still in progress. Otherwise each state change is printed once.
+    """
+
+    def __init__(self, items, title, stream=None, max_rows=20):
+        self.title = title
+        self.stream = stream or sys.stderr
+        self.max_rows = max_rows
+        self._states = {item: ("pending", time.monotonic()) for item in items}
+        self._tty = self.stream.isatty()
+        self._drawn = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set(self, item, state):
+        with self._lock:
+            self._states[item] = (state, self._states.get(item, (None, time.monotonic()))[1])
+        if not self._tty:
+            self.stream.write(f"{item}: {state}\n")
+            self.stream.flush()
+
+    def start(self, item):
+        with self._lock:
+            self._states[item] = (self._states[item][0], time.monotonic())
+
+    def _lines(self):
+        with self._lock:
+            states = dict(self._states)
+        counts = collections.Counter(state.split(" ", 1)[0] for state, _ in states.values())
+        lines = [f"{self.title}: " + ", ".join(f"{n} {state}" for state, n in sorted(counts.items()))]
+        active = [(item, state, started) for item, (state, started) in states.items()
+                  if state not in ("pending", "done") and not state.startswith("failed")]
+        for item, state, started in active[:self.max_rows]:
+            lines.append(f"  {item:<40} {state:<36} {time.monotonic() - started:6.1f}s")
+        if len(active) > self.max_rows:
+            lines.append(f"  ... {len(active) - self.max_rows} more in progress")
+        return lines
+
+    def _draw(self):
+        lines = self._lines()
+        if self._drawn:
+            self.stream.write(f"\x1b[{self._drawn}F")
+        for line in lines:
+            self.stream.write(line + "\x1b[K\n")
+        # Clear rows left over from a taller previous frame.
+        for _ in range(self._drawn - len(lines)):
+            self.stream.write("\x1b[K\n")
+        self._drawn = max(len(lines), self._drawn)
+        self.stream.flush()
+
+    def __enter__(self):
+        if self._tty:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(0.5):
+            self._draw()
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._draw()
+
+
+def _evictable(pod):
+    """kubectl drain skips DaemonSet pods and static (mirror) pods."""
+    metadata = pod["metadata"]
+    if "kubernetes.io/config.mirror" in (metadata.get("annotations") or {}):
+        return False
+    return not any(owner.get("kind") == "DaemonSet" for owner in metadata.get("ownerReferences") or [])
+
+
+def drain_refusal(pod, force=False, delete_emptydir_data=False):
+    """Return why kubectl drain would refuse to evict ``pod``, or None.
+
+    Like kubectl, pods without a controller need ``force`` and pods with
+    emptyDir volumes need ``delete_emptydir_data``; finished pods are always
+    allowed.
+    """
+    if (pod.get("status") or {}).get("phase") in ("Succeeded", "Failed"):
+        return None
+    if not force and not any(owner.get("controller") for owner in pod["metadata"].get("ownerReferences") or []):
+        return "no controller"
+    volumes = (pod.get("spec") or {}).get("volumes") or []
+    if not delete_emptydir_data and any("emptyDir" in volume for volume in volumes):
+        return "emptyDir data"
+    return None
+
+
+def latency_summary(seconds):
+    """Return "min/p50/p95/max" of a list of durations in seconds."""
+    if not seconds:
+        return "n/a"
+    ordered = sorted(seconds)
+
+    def pick(fraction):
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+    return f"min {ordered[0]:.1f}s, p50 {pick(0.5):.1f}s, p95 {pick(0.95):.1f}s, max {ordered[-1]:.1f}s"
+
+
+class NodeOperations:
+    """Cordons, uncordons or drains many nodes concurrently.
+
+    Up to ``workers`` nodes are processed at once. Draining cordons the
+    node, then evicts its pods through the Eviction API with up to
+    ``eviction_workers`` evictions in flight per node, so PodDisruptionBudgets
+    are enforced by the API server: a 429 means the budget does not allow the
+    eviction yet and it is retried until ``timeout``. All calls share one
+    token bucket. As with kubectl drain, a node with pods that have no
+    controller or use emptyDir is cordoned but not drained unless ``force``
+    or ``delete_emptydir_data`` allow it.
+    """
+
+    def __init__(self, action="cordon", workers=MAX_INFLIGHT, eviction_workers=8, timeout=600,
+                 rate=BULK_QPS, retry_interval=5.0, force=False, delete_emptydir_data=False):
+        self.action = action
+        self.force = force
+        self.delete_emptydir_data = delete_emptydir_data
+        self.workers = max(workers, 1)
+        self.eviction_workers = max(eviction_workers, 1)
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate) if rate else None
+        self.retry_interval = retry_interval
+        self.board = None
+        self.elapsed = 0.0
+
+    def _request(self, method, path, **kwargs):
+        return call_with_retry(lambda: get_backend().request(method, path, **kwargs), limiter=self.limiter)
+
+    def _evict(self, pod, deadline):
+        metadata = pod["metadata"]
+        body = {"apiVersion": "policy/v1", "kind": "Eviction",
+                "metadata": {"name": metadata["name"], "namespace": metadata["namespace"]}}
+        path = resource_path("pods", metadata["namespace"], metadata["name"], "eviction")
+        while True:
+            try:
+                self._request("POST", path, body=body)
+                return
+            except KubeApiError as e:
+                if e.status == 404:
+                    return
+                # 429 here is a PodDisruptionBudget refusing the eviction for now.
+                if e.status != 429 or time.monotonic() + self.retry_interval > deadline:
+                    raise
+            time.sleep(self.retry_interval)
+
+    def _drain(self, node, deadline):
+        result = self._request("GET", resource_path("pods"), params={"fieldSelector": f"spec.nodeName={node}"})
+        pods = [pod for pod in result.get("items", []) if _evictable(pod)]
+        refused = [(pod, drain_refusal(pod, self.force, self.delete_emptydir_data)) for pod in pods]
+        refused = [f"{pod['metadata']['namespace']}/{pod['metadata']['name']} ({reason})"
+                   for pod, reason in refused if reason]
+        if refused:
+            more = f" and {len(refused) - 3} more" if len(refused) > 3 else ""
+            raise KubeApiError(0, f"refusing to evict {len(refused)} pods (use --force/--delete-emptydir-data): "
+                                  f"{', '.join(refused[:3])}{more}")
+        evicted, errors = 0, []
+        self.board.set(node, f"evicting 0/{len(pods)}")
+        if pods:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.eviction_workers, len(pods))) as pool:
+                futures = [pool.submit(self._evict, pod, deadline) for pod in pods]
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        future.result()
+                        evicted += 1
+                    except KubeApiError as e:
+                        errors.append(str(e))
+                    self.board.set(node, f"evicting {evicted}/{len(pods)}")
+        if errors:
+            raise KubeApiError(0, f"{len(errors)} evictions failed, first: {errors[0]}")
+        uids = {pod["metadata"]["uid"] for pod in pods if pod["metadata"].get("uid")}
+        self.board.set(node, "waiting for pods to terminate")
+        while uids:
+            result = self._request("GET", resource_path("pods"), params={"fieldSelector": f"spec.nodeName={node}"})
+            uids &= {pod["metadata"].get("uid") for pod in result.get("items", [])}
+            if not uids:
+                break
+            if time.monotonic() >= deadline:
+                raise KubeApiError(504, f"{len(uids)} pods still terminating after {self.timeout:g}s")
+            time.sleep(2)
+        return evicted
+
+    def _process(self, node):
+        started = time.monotonic()
+        self.board.start(node)
+        row = {"node": node, "action": self.action, "result": "done", "evicted": 0, "seconds": 0.0, "error": ""}
+        try:
+            self.board.set(node, "uncordoning" if self.action == "uncordon" else "cordoning")
+            self._request("PATCH", resource_path("nodes", name=node),
+                          body={"spec": {"unschedulable": self.action != "uncordon"}},
+                          content_type="application/strategic-merge-patch+json")
+            if self.action == "drain":
+                row["evicted"] = self._drain(node, started + self.timeout)
+            self.board.set(node, "done")
+        except KubeApiError as e:
+            row.update(result="failed", error=str(e))
+            self.board.set(node, f"failed: {e}")
+        row["seconds"] = round(time.monotonic() - started, 2)
+        return row
+
+    def run(self, nodes):
+        """Apply the action to every node; returns one result row per node."""
+        start = time.monotonic()
+        with StatusBoard(nodes, f"{self.action} nodes") as self.board:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.workers, len(nodes) or 1)) as pool:
+                rows = list(pool.map(self._process, nodes))
+        self.elapsed = time.monotonic() - start
+        return rows
+
+    def report(self, rows):
+        """Return the throughput and latency summary of a finished run."""
+        done = [row for row in rows if row["result"] == "done"]
+        minutes = max(self.elapsed, 1e-6) / 60
+        lines = [f"{self.action}: {len(done)}/{len(rows)} nodes in {self.elapsed:.1f}s "
+                 f"({len(done) / minutes:.1f} nodes/min)",
+                 f"per-node latency: {latency_summary([row['seconds'] for row in done])}"]
+        if self.action == "drain":
+            evicted = sum(row["evicted"] for row in rows)
+            lines.append(f"evicted {evicted} pods ({evicted / max(self.elapsed, 1e-6):.1f}/s)")
+        return "\n".join(lines)
+
+
+def nodes_matching(selector):
+    """Return the names of the nodes matching a label selector."""
+    return list_names("nodes", labelSelector=selector)
+
+
+def restart_patch():
+    """Return the patch kubectl rollout restart sends: a fresh restartedAt stamp on the pod template."""
+    restarted_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    return {"spec": {"template": {"metadata": {"annotations": {
+        "kubectl.kubernetes.io/restartedAt": restarted_at}}}}}
+
+
+def rollout_restart(namespace, deployment, context=None):
+    """Restart a deployment the way kubectl rollout restart does, by stamping its pod template."""
+    kube_request("PATCH", resource_path("deployments", namespace, deployment), context=context,
+                 body=restart_patch(), content_type="application/strategic-merge-patch+json")
+
+
+def rollout_state(deployment):
+    """Return (done, message) for a deployment rollout, following kubectl rollout status."""
+    spec = deployment.get("spec") or {}
+    status = deployment.get("status") or {}
+    name = deployment["metadata"]["name"]
+    replicas = spec.get("replicas", 1)
+    updated = status.get("updatedReplicas", 0)
+    available = status.get("availableReplicas", 0)
+    if deployment["metadata"].get("generation", 0) > status.get("observedGeneration", 0):
+        return False, "Waiting for deployment spec update to be observed..."
+    for condition in status.get("conditions") or []:
+        if condition.get("type") == "Progressing" and condition.get("reason") == "ProgressDeadlineExceeded":
+            return True, f'deployment "{name}" exceeded its progress deadline'
+    if updated < replicas:
+        return False, (f'Waiting for deployment "{name}" rollout to finish: '
+                       f"{updated} out of {replicas} new replicas have been updated...")
+    if status.get("replicas", 0) > updated:
+        return False, (f'Waiting for deployment "{name}" rollout to finish: '
+                       f"{status['replicas'] - updated} old replicas are pending termination...")
+    if available < updated:
+        return False, (f'Waiting for deployment "{name}" rollout to finish: '
+                       f"{available} of {updated} updated replicas are available...")
+    return True, f'deployment "{name}" successfully rolled out'
+
+
+class RolloutTracker:
+    """Follows the rollouts of many deployments through a single deployments watch.
+
+    A deployment is rolling until rollout_state reports it done; the time
+    from the start of tracking to that point is its time to Available. A
+    rollout that makes no progress for ``stall_after`` seconds is shown as
+    stalled, and whatever is still rolling after ``timeout`` is given up on.
+    """
+
+    def __init__(self, targets, timeout=600, stall_after=120, context=None):
+        self.targets = list(dict.fromkeys(targets))
+        self.timeout = timeout
+        self.stall_after = stall_after
+        namespaces = {namespace for namespace, _ in self.targets}
+        # Deployments of one namespace are watched there; several namespaces share one cluster-wide watch.
+        self._informer = Informer("deployments", self, namespace=namespaces.pop() if len(namespaces) == 1 else None,
+                                  context=context)
+        self._rows = {target: {"namespace": target[0], "name": target[1], "result": "rolling", "seconds": None,
+                               "message": "waiting for the first status"} for target in self.targets}
+        self._progress = {}
+        self._stalled = set()
+        self._cond = threading.Condition()
+        self.board = None
+        self.started = None
+        self.elapsed = 0.0
+
+    @staticmethod
+    def label(target):
+        return f"{target[0]}/{target[1]}"
+
+    def _set(self, target, result, message, state):
+        row = self._rows[target]
+        row.update(result=result, message=message)
+        if result != "rolling":
+            row["seconds"] = round(time.monotonic() - self.started, 2)
+        self.board.set(self.label(target), state)
+        self._cond.notify_all()
+
+    def replace(self, items):
+        items = list(items)
+        with self._cond:
+            seen = {(item["metadata"].get("namespace"), item["metadata"]["name"]) for item in items}
+            for target, row in self._rows.items():
+                if row["result"] == "rolling" and target not in seen:
+                    self._set(target, "missing", "deployment not found", "failed: not found")
+        for item in items:
+            self.upsert(item)
+
+    def upsert(self, deployment):
+        target = (deployment["metadata"].get("namespace"), deployment["metadata"]["name"])
+        with self._cond:
+            row = self._rows.get(target)
+            if row is None or row["result"] != "rolling":
+                return
+            done, message = rollout_state(deployment)
+            status = deployment.get("status") or {}
+            progress = (deployment["metadata"].get("generation"), status.get("observedGeneration"),
+                        status.get("updatedReplicas", 0), status.get("readyReplicas", 0),
+                        status.get("availableReplicas", 0), status.get("replicas", 0))
+            if self._progress.get(target, (None,))[0] != progress:
+                self._progress[target] = (progress, time.monotonic())
+                self._stalled.discard(target)
+            if done and "progress deadline" in message:
+                self._set(target, "failed", message, "failed: progress deadline exceeded")
+            elif done:
+                self._set(target, "available", message, "done")
+            else:
+                replicas = (deployment.get("spec") or {}).get("replicas", 1)
+                row["message"] = message
+                self.board.set(self.label(target), f"rolling {progress[2]}/{replicas} updated, "
+                                                   f"{progress[4]} available")
+
+    def delete(self, deployment):
+        target = (deployment["metadata"].get("namespace"), deployment["metadata"]["name"])
+        with self._cond:
+            if self._rows.get(target, {}).get("result") == "rolling":
+                self._set(target, "failed", "deployment was deleted", "failed: deleted")
+
+    def _check_stalls(self):
+        now = time.monotonic()
+        for target, (_, changed) in self._progress.items():
+            row = self._rows[target]
+            if row["result"] == "rolling" and target not in self._stalled and now - changed >= self.stall_after:
+                self._stalled.add(target)
+                self.board.set(self.label(target), f"stalled: no progress for {self.stall_after:g}s")
+
+    def _rolling(self):
+        return [target for target, row in self._rows.items() if row["result"] == "rolling"]
+
+    def run(self):
+        """Track every rollout until all have finished or ``timeout``; returns one row per deployment."""
+        self.started = time.monotonic()
+        deadline = self.started + self.timeout
+        with StatusBoard([self.label(target) for target in self.targets], "rollouts") as self.board:
+            self._informer.start()
+            try:
+                with self._cond:
+                    while self._rolling() and time.monotonic() < deadline and self._informer.error is None:
+                        self._cond.wait(min(1.0, max(deadline - time.monotonic(), 0)))
+                        self._check_stalls()
+                    for target in self._rolling():
+                        if self._informer.error is not None:
+                            self._set(target, "error", str(self._informer.error), "failed: watch error")
+                            continue
+                        changed = self._progress.get(target, (None, self.started))[1]
+                        stalled = time.monotonic() - changed >= self.stall_after
+                        self._set(target, "stalled" if stalled else "timeout", self._rows[target]["message"],
+                                  "failed: stalled" if stalled else "failed: timed out")
+            finally:
+                self._informer.stop()
+        self.elapsed = time.monotonic() - self.started
+        return [self._rows[target] for target in self.targets]
+
+    def report(self, rows):
+        """Return the summary of a finished run."""
+        available = [row for row in rows if row["result"] == "available"]
+        counts = collections.Counter(row["result"] for row in rows if row["result"] != "available")
+        lines = [f"rollouts: {len(available)}/{len(rows)} available in {self.elapsed:.1f}s"
+                 + "".join(f", {n} {result}" for result, n in sorted(counts.items())),
+                 f"time to Available: {latency_summary([row['seconds'] for row in available])}"]
+        return "\n".join(lines)
+
+
+def deployment_targets(namespace, names=(), selector=None):
+    """Return (namespace, name) pairs for ``names`` (plain or namespace/name) and a label selector."""
+    targets = [tuple(name.split("/", 1)) if "/" in name else (namespace, name) for name in names]
+    if selector:
+        targets += [(namespace, name) for name in list_names("deployments", namespace, labelSelector=selector)]
+    return list(dict.fromkeys(targets))
+
+
+def deployments_matching(namespaces, selector=None, pattern=None):
+    """Return (namespace, name) for the deployments in ``namespaces`` matching a label selector and a name regex.
+
+    ``namespaces`` None searches every namespace with one cluster-wide LIST.
+    """
+    regex = re.compile(pattern) if pattern else None
+
+    def names(namespace):
+        items = kube_request("GET", resource_path("deployments", namespace),
+                             params={"labelSelector": selector or ""}).get("items", [])
+        return [(item["metadata"].get("namespace", namespace), item["metadata"]["name"]) for item in items]
+    targets = [target for batch in fan_out(names, [None] if namespaces is None else namespaces) for target in batch]
+    return sorted(target for target in targets if regex is None or regex.search(target[1]))
+
+
+class WaveRestart:
+    """Restarts many deployments in waves of ``wave_size``.
+
+    The restarts of a wave are sent by a BulkRunner (``workers`` at a time,
+    ``rate`` per second) and the wave's rollouts are then followed by a
+    RolloutTracker; the next wave starts only once every rollout of the
+    current one is available. Unless ``keep_going`` is set, a wave with a
+    failed, stalled or timed-out rollout stops the run and the remaining
+    deployments are skipped.
+    """
+
+    def __init__(self, wave_size=10, workers=MAX_INFLIGHT, rate=BULK_QPS, timeout=600, stall_after=120,
+                 keep_going=False):
+        self.wave_size = max(wave_size, 1)
+        self.workers = workers
+        self.rate = rate
+        self.timeout = timeout
+        self.stall_after = stall_after
+        self.keep_going = keep_going
+        self.elapsed = 0.0
+
+    @staticmethod
+    def _restart(target):
+        get_backend().request("PATCH", resource_path("deployments", *target), body=restart_patch(),
+                              content_type="application/strategic-merge-patch+json")
+
+    def run(self, targets):
+        """Restart every target wave by wave; returns one row per deployment."""
+        start = time.monotonic()
+        waves = [targets[i:i + self.wave_size] for i in range(0, len(targets), self.wave_size)]
+        rows = []
+        for number, wave in enumerate(waves, 1):
+            print(f"wave {number}/{len(waves)}: restarting {len(wave)} deployments", file=sys.stderr)
+            runner = BulkRunner(self._restart, f"wave {number} restarts", self.workers, self.rate,
+                                progress=sys.stderr.isatty())
+            results = runner.run(wave)
+            wave_rows = {target: {"namespace": target[0], "name": target[1], "result": "failed",
+                                  "seconds": None, "message": f"restart failed: {error}"}
+                         for target, error in results if error is not None}
+            restarted = [target for target, error in results if error is None]
+            if restarted:
+                tracker = RolloutTracker(restarted, self.timeout, self.stall_after)
+                for row in tracker.run():
+                    wave_rows[row["namespace"], row["name"]] = row
+                print(f"wave {number}: {tracker.report(list(wave_rows.values()))}", file=sys.stderr)
+            rows.extend(dict(wave_rows[target], wave=number) for target in wave)
+            if not self.keep_going and any(row["result"] != "available" for row in wave_rows.values()):
+                rows.extend({"wave": later_number, "namespace": target[0], "name": target[1], "result": "skipped",
+                             "seconds": None, "message": f"wave {number} did not become healthy"}
+                            for later_number, later in enumerate(waves[number:], number + 1) for target in later)
+                break
+        self.elapsed = time.monotonic() - start
+        return rows
+
+    def report(self, rows):
+        """Return the summary of a finished run."""
+        counts = collections.Counter(row["result"] for row in rows)
+        waves = len({row["wave"] for row in rows if row["result"] != "skipped"})
+        minutes = max(self.elapsed, 1e-6) / 60
+        return (f"restarted {counts['available']}/{len(rows)} deployments in {waves} waves in {self.elapsed:.1f}s "
+                f"({counts['available'] / minutes:.1f}/min)"
+                + "".join(f", {n} {result}" for result, n in sorted(counts.items()) if result != "available"))
+
+
+def default_namespace():
+    """Return the namespace of the current context, or "default"."""
+    try:
+        config = load_kubeconfig()
+    except KubeConfigError:
+        return "default"
+    for context in config.get("contexts") or []:
+        if context["name"] == current_context():
+            return (context.get("context") or {}).get("namespace") or "default"
+    return "default"
+
+
+def node_row(node):
+    labels = node["metadata"].get("labels") or {}
+    conditions = {c["type"]: c["status"] for c in (node.get("status") or {}).get("conditions") or []}
+    status = "Ready" if conditions.get("Ready") == "True" else "NotReady"
+    if (node.get("spec") or {}).get("unschedulable"):
+        status += ",SchedulingDisabled"
+    roles = sorted(key.split("/", 1)[1] for key in labels if key.startswith("node-role.kubernetes.io/"))
+    return {"name": node["metadata"]["name"], "status": status, "roles": ",".join(roles) or "<none>",
+            "age": format_age(node["metadata"].get("creationTimestamp")),
+            "version": (node.get("status") or {}).get("nodeInfo", {}).get("kubeletVersion", "")}
+
+
+def pod_row(pod):
+    return {"namespace": pod.namespace, "name": pod.name, "ready": f"{pod.ready}/{pod.total}",
+            "status": pod.status, "restarts": pod.restarts, "age": format_age(pod.created),
+            "node": pod.node, "created": pod.created}
+
+
+def pod_container_names(namespace, pod):
+    """Return the container names of one pod."""
+    pod = kube_request("GET", resource_path("pods", namespace, pod))
+    return [container["name"] for container in pod["spec"].get("containers", [])]
+
+
+def pod_label_row(pod):
+    return dict(pod_row(pod), labels=",".join(pod.labels) or "<none>")
+
+
+def pod_container_row(pod):
+    return {"namespace": pod.namespace, "name": pod.name,
+            "init_containers": ",".join(name for name, _ in pod.init_containers) or "<none>",
+            "containers": ",".join(name for name, _ in pod.containers)}
+
+
+def deployment_row(deployment):
+    spec = deployment.get("spec") or {}
+    status = deployment.get("status") or {}
+    return {"namespace": deployment["metadata"].get("namespace"), "name": deployment["metadata"]["name"],
+            "ready": f"{status.get('readyReplicas', 0)}/{spec.get('replicas', 1)}",
+            "up_to_date": status.get("updatedReplicas", 0), "available": status.get("availableReplicas", 0),
+            "age": format_age(deployment["metadata"].get("creationTimestamp"))}
+
+
+def list_deployment_rows(namespace):
+    deployments = kube_request("GET", resource_path("deployments", namespace)).get("items", [])
+    return [deployment_row(deployment) for deployment in deployments]
+
+
+def pod_image_rows(namespace):
+    return [{"namespace": pod.namespace, "pod": pod.name, "container": name, "image": image}
+            for pod in query_pods(namespace) for name, image in pod.containers]
+
+
+def parse_image(image):
+    """Split an image reference into (repository, tag, digest); the tag defaults to latest."""
+    name, _, digest = image.partition("@")
+    colon = name.rfind(":")
+    if colon > name.rfind("/"):
+        return name[:colon], name[colon + 1:], digest
+    return name, "" if digest else "latest", digest
+
+
+def running_digest(image_id):
+    """Return the sha256 digest in a containerStatuses imageID, or ""."""
+    if "@" in image_id:
+        return image_id.rpartition("@")[2]
+    return image_id if image_id.startswith("sha256:") else ""
+
+
+def workload_owner(metadata):
+    """Return "Kind/name" of the workload behind a pod, resolving ReplicaSets to their Deployment."""
+    owners = metadata.get("ownerReferences") or []
+    if not owners:
+        return f"Pod/{metadata['name']}"
+    kind, name = owners[0]["kind"], owners[0]["name"]
+    template_hash = (metadata.get("labels") or {}).get("pod-template-hash")
+    if kind == "ReplicaSet" and template_hash and name.endswith("-" + template_hash):
+        return f"Deployment/{name[:-len(template_hash) - 1]}"
+    return f"{kind}/{name}"
+
+
+def image_matches(repository, pattern):
+    """Match a repository against a glob, or a bare name such as nginx against any registry path."""
+    if any(c in pattern for c in "*?["):
+        return fnmatch.fnmatchcase(repository, pattern)
+    return repository == pattern or repository.endswith("/" + pattern)
+
+
+class ImageInventory:
+    """Image usage aggregated in one pass over the pods of a cluster.
+
+    Pods are read a page at a time and reduced to counters keyed by
+    (repository, tag, digest, namespace, workload), so memory grows with
+    the number of distinct images and workloads rather than with the number
+    of pods. The digest is the one the kubelet reports as running, falling
+    back to a digest pinned in the pod spec. All strings are interned.
+    """
+
+    # Grouping of each view and the columns it adds in front of the counts.
+    VIEWS = {
+        "image": (["image"], lambda r, t, d, ns, w: (f"{r}:{t}" if t else r,)),
+        "digest": (["repository", "digest"], lambda r, t, d, ns, w: (r, d[:19])),
+        "namespace": (["namespace"], lambda r, t, d, ns, w: (ns,)),
+        "workload": (["namespace", "workload"], lambda r, t, d, ns, w: (ns, w)),
+        "version": (["repository", "tag", "digest", "namespace", "workload"],
+                    lambda r, t, d, ns, w: (r, t, d[:19], ns, w)),
+    }
+    COUNTS = {
+        "image": ["digests", "pods", "containers", "namespaces", "workloads"],
+        "digest": ["tags", "pods", "containers", "namespaces", "workloads"],
+        "namespace": ["images", "pods", "containers", "workloads"],
+        "workload": ["images", "pods", "containers"],
+        "version": ["pods", "containers"],
+    }
+
+    def __init__(self):
+        self.containers = collections.Counter()
+        self.pods = collections.Counter()
+        self.workload_pods = collections.Counter()
+        self.pod_count = 0
+
+    def add(self, pod):
+        intern = sys.intern
+        metadata = pod["metadata"]
+        namespace = intern(metadata.get("namespace") or "")
+        workload = intern(workload_owner(metadata))
+        containers = (pod.get("spec") or {}).get("containers") or []
+        statuses = (pod.get("status") or {}).get("containerStatuses") or []
+        image_ids = {status["name"]: status.get("imageID") or "" for status in statuses}
+        # Containers without a status yet share the digest of a sibling running the same image.
+        running = {container.get("image"): running_digest(image_ids.get(container["name"], ""))
+                   for container in containers if image_ids.get(container["name"])}
+        keys = set()
+        for container in containers:
+            repository, tag, digest = parse_image(container.get("image") or "")
+            digest = running.get(container.get("image")) or digest
+            key = (intern(repository), intern(tag), intern(digest), namespace, workload)
+            self.containers[key] += 1
+            keys.add(key)
+        for key in keys:
+            self.pods[key] += 1
+        self.workload_pods[namespace, workload] += 1
+        self.pod_count += 1
+
+    def update(self, other):
+        self.containers.update(other.containers)
+        self.pods.update(other.pods)
+        self.workload_pods.update(other.workload_pods)
+        self.pod_count += other.pod_count
+
+    @classmethod
+    def collect(cls, namespaces=None):
+        """Build the inventory of ``namespaces`` (every namespace when None) from paged LISTs."""
+        def scan(namespace):
+            inventory = cls()
+            for page in list_pages("pods", namespace):
+                for pod in page:
+                    inventory.add(pod)
+            return inventory
+        parts = fan_out(scan, namespaces or [None])
+        inventory = parts[0]
+        for part in parts[1:]:
+            inventory.update(part)
+        return inventory
+
+    def repositories(self):
+        return sorted({key[0] for key in self.containers})
+
+    def columns(self, view="image"):
+        return self.VIEWS[view][0] + self.COUNTS[view]
+
+    def rows(self, view="image", image=None):
+        """Return the rows of ``view``, most used first; ``image`` restricts them to matching repositories."""
+        names, group_of = self.VIEWS[view]
+        groups = {}
+        for key, containers in self.containers.items():
+            repository, tag, digest, namespace, workload = key
+            if image and not image_matches(repository, image):
+                continue
+            group = groups.setdefault(group_of(*key), {"pods": 0, "containers": 0, "digests": set(), "tags": set(),
+                                                       "images": set(), "workloads": set()})
+            group["pods"] += self.pods[key]
+            group["containers"] += containers
+            group["digests"].add(digest)
+            group["tags"].add(tag)
+            group["images"].add((repository, tag))
+            group["workloads"].add((namespace, workload))
+        rows = []
+        for group_key, group in groups.items():
+            row = dict(zip(names, group_key))
+            if view in ("namespace", "workload"):
+                # A pod running several images must only count once here.
+                group["pods"] = sum(self.workload_pods[workload] for workload in group["workloads"])
+            row.update(pods=group["pods"], containers=group["containers"], digests=len(group["digests"] - {""}),
+                       tags=len(group["tags"]), images=len(group["images"]), workloads=len(group["workloads"]),
+                       namespaces=len({namespace for namespace, _ in group["workloads"]}))
+            rows.append({column: row[column] for column in self.columns(view)})
+        if view == "version":
+            return sorted(rows, key=lambda row: (row["repository"], row["tag"], row["digest"], -row["pods"],
+                                                 row["namespace"], row["workload"]))
+        return sorted(rows, key=lambda row: (-row["pods"], tuple(row[name] for name in names)))
+
+
+def event_row(event):
+    involved = event.get("involvedObject") or {}
+    last_seen = event.get("lastTimestamp") or event.get("eventTime") or event["metadata"].get("creationTimestamp")
+    return {"namespace": event["metadata"].get("namespace"), "last_seen": last_seen,
+            "type": event.get("type", ""), "reason": event.get("reason", ""),
+            "object": f"{involved.get('kind', '').lower()}/{involved.get('name', '')}",
+            "count": event.get("count", 1), "message": (event.get("message") or "").strip()}
+
+
+def list_events(namespace=None, field_selector=""):
+    """Return event rows of ``namespace`` (or all namespaces), oldest first."""
+    events = kube_request("GET", resource_path("events", namespace),
+                          params={"fieldSelector": field_selector}).get("items", [])
+    return sorted((event_row(event) for event in events), key=lambda row: row["last_seen"] or "")
+
+
+def event_field_selector(event_type=None, reason=None, kind=None, name=None):
+    """Build a server-side field selector for events."""
+    fields = [("type", event_type), ("reason", reason), ("involvedObject.kind", kind), ("involvedObject.name", name)]
+    return ",".join(f"{field}={value}" for field, value in fields if value)
+
+
+class EventWindow:
+    """Informer store for the event tail: reports only new or re-counted events.
+
+    Remembers the count last shown for each event uid, so a repeated event
+    (same uid, higher count) is reported once per change rather than the
+    whole list being printed again. At most ``window`` uids are remembered.
+    """
+
+    def __init__(self, on_event, window=EVENT_WINDOW, initial=20, namespaces=None):
+        self.on_event = on_event
+        self.window = window
+        self.initial = initial
+        self.namespaces = set(namespaces) if namespaces else None
+        self._seen = collections.OrderedDict()
+        self._synced = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _count(event):
+        return event.get("count") or (event.get("series") or {}).get("count") or 1
+
+    def replace(self, items):
+        items = sorted(items, key=lambda event: event_row(event)["last_seen"] or "")
+        if not self._synced:
+            # On the first sync only the most recent events are shown; the rest are just remembered.
+            self._synced = True
+            for event in items[:max(len(items) - self.initial, 0)]:
+                self._remember(event["metadata"].get("uid"), self._count(event))
+        for event in items:
+            self.upsert(event)
+
+    def _remember(self, uid, count):
+        self._seen[uid] = count
+        self._seen.move_to_end(uid)
+        while len(self._seen) > self.window:
+            self._seen.popitem(last=False)
+
+    def upsert(self, event):
+        if self.namespaces is not None and event["metadata"].get("namespace") not in self.namespaces:
+            return
+        uid, count = event["metadata"].get("uid"), self._count(event)
+        with self._lock:
+            previous = self._seen.get(uid)
+            if previous is not None and previous >= count:
+                return
+            self._remember(uid, count)
+        self.on_event(event_row(event))
+
+    def delete(self, event):
+        pass
+
+
+def format_event_line(row, output="table"):
+    """Format one event row for the tail."""
+    if output in ("json", "ndjson"):
+        return json.dumps(row)
+    count = f" (x{row['count']})" if row.get("count", 1) > 1 else ""
+    fields = [row["namespace"] or "", row["last_seen"] or "", row["type"], row["reason"], row["object"],
+              row["message"] + count]
+    if output == "tsv":
+        return "\t".join(fields)
+    return f"{fields[0]:<20} {fields[1]:<21} {fields[2]:<8} {fields[3]:<24} {fields[4]:<40} {fields[5]}"
+
+
+def tail_events(namespaces=None, field_selector="", output="table", initial=20, window=EVENT_WINDOW):
+    """Print new events as they happen until interrupted.
+
+    One namespace is watched directly; several are watched cluster-wide and
+    filtered locally. Filters in ``field_selector`` are applied by the API server.
+    """
+    lock = threading.Lock()
+
+    def show(row):
+        with lock:
+            print(format_event_line(row, output), flush=True)
+
+    namespace = namespaces[0] if namespaces and len(namespaces) == 1 else None
+    store = EventWindow(show, window, initial, namespaces if namespace is None else None)
+    informer = Informer("events", store, namespace=namespace,
+                        params={"fieldSelector": field_selector} if field_selector else None).start()
+    try:
+        while informer.error is None:
+            time.sleep(1)
+        print(f"Error executing command: {informer.error}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        informer.stop()
+
+
+def deployment_progress_row(deployment):
+    """deployment_row plus the rollout state, for the dashboard."""
+    done, message = rollout_state(deployment)
+    replicas = (deployment.get("spec") or {}).get("replicas", 1)
+    return dict(deployment_row(deployment), replicas=replicas, done=done, message=message)
+
+
+def progress_bar(done, total, width=20):
+    filled = width if not total else min(width, width * done // total)
+    return "[" + "#" * filled + "." * (width - filled) + "]"
+
+
+POD_PHASES = ["Running", "Pending", "Succeeded", "Failed", "Unknown"]
+
+
+class Dashboard:
+    """Auto-refreshing, top-like view of pod phases, node readiness and rollouts.
+
+    Pods, nodes and deployments are each kept current by an Informer, so a
+    refresh reads memory rather than the API. The body is rebuilt only when
+    one of the stores changed, and only screen lines that differ from the
+    last frame are repainted.
+    """
+
+    def __init__(self, namespaces=None, interval=1.0, context=None):
+        self.namespaces = set(namespaces) if namespaces else None
+        self.interval = interval
+        self.context = context or current_context()
+        # A single namespace is watched directly; anything wider is watched cluster-wide and filtered here.
+        namespace = namespaces[0] if namespaces and len(namespaces) == 1 else None
+        self.pods = PodStore()
+        self.nodes = ObjectStore(node_row)
+        self.deployments = ObjectStore(deployment_progress_row)
+        self._informers = [Informer("pods", self.pods, namespace, self.context),
+                           Informer("nodes", self.nodes, context=self.context),
+                           Informer("deployments", self.deployments, namespace, self.context)]
+        self._state = None
+        self._body = []
+        self._painted = {}
+        self.offset = 0
+
+    def _shown(self, namespace):
+        return self.namespaces is None or namespace in self.namespaces
+
+    def _build_body(self, counts):
+        nodes = self.nodes.rows()
+        lines = []
+        ready = [row for row in nodes if row["status"] == "Ready"]
+        lines.append(f"NODES {progress_bar(len(ready), len(nodes))} {len(ready)}/{len(nodes)} ready")
+        for row in nodes:
+            if row["status"] != "Ready":
+                lines.append(f"  {row['name']:<40} {row['status']:<28} {row['version']}")
+        lines.append("")
+
+        per_namespace = {}
+        for (namespace, phase), pods in counts.items():
+            if self._shown(namespace):
+                per_namespace.setdefault(namespace, collections.Counter())[phase] += pods
+        totals = sum(per_namespace.values(), collections.Counter())
+        lines.append(f"PODS {sum(totals.values())} in {len(per_namespace)} namespaces")
+        lines.append(f"  {'NAMESPACE':<32}" + "".join(f"{phase.upper():>11}" for phase in POD_PHASES)
+                     + f"{'TOTAL':>9}")
+        for namespace in sorted(per_namespace):
+            phases = per_namespace[namespace]
+            lines.append(f"  {namespace:<32}" + "".join(f"{phases[phase]:>11}" for phase in POD_PHASES)
+                         + f"{sum(phases.values()):>9}")
+        lines.append("")
+
+        deployments = [row for row in self.deployments.rows() if self._shown(row["namespace"])]
+        rolling = [row for row in deployments if not row["done"]]
+        lines.append(f"DEPLOYMENTS {len(deployments) - len(rolling)}/{len(deployments)} rolled out")
+        # Rollouts in progress first, then everything else by namespace and name.
+        for row in rolling + [row for row in deployments if row["done"]]:
+            bar = progress_bar(row["up_to_date"], row["replicas"])
+            state = "" if row["done"] else row["message"]
+            lines.append(f"  {row['namespace'] + '/' + row['name']:<48} {bar} {row['ready']:>9}  {state}".rstrip())
+        return lines
+
+    def lines(self):
+        """Return the current frame; the body is rebuilt only when a store changed."""
+        counts = self.pods.phase_counts()
+        state = (self.nodes.version, self.deployments.version, counts)
+        if state != self._state:
+            self._state = state
+            self._body = self._build_body(counts)
+        synced = all(informer.synced.is_set() for informer in self._informers)
+        failed = [informer for informer in self._informers if informer.error is not None]
+        status = f"  ({failed[0].kind}: {failed[0].error})" if failed else "" if synced else "  (syncing...)"
+        header = f"kubermon {self.context}  {time.strftime('%H:%M:%S')}{status}   q quit  j/k scroll"
+        return [header, ""] + self._body
+
+    def _paint(self, screen, lines):
+        import curses
+        height, width = screen.getmaxyx()
+        self.offset = max(0, min(self.offset, len(lines) - height))
+        view = lines[:1] + lines[1 + self.offset:self.offset + height]
+        view += [""] * (height - len(view))
+        for y, line in enumerate(view):
+            line = line[:width - 1]
+            if self._painted.get(y) != line:
+                screen.addstr(y, 0, line)
+                screen.clrtoeol()
+                self._painted[y] = line
+        screen.noutrefresh()
+        curses.doupdate()
+
+    def _loop(self, screen):
+        import curses
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        screen.timeout(int(self.interval * 1000))
+        while True:
+            self._paint(screen, self.lines())
+            key = screen.getch()
+            height = screen.getmaxyx()[0]
+            if key in (ord("q"), ord("Q"), 27):
+                return
+            if key in (curses.KEY_DOWN, ord("j")):
+                self.offset += 1
+            elif key in (curses.KEY_UP, ord("k")):
+                self.offset = max(0, self.offset - 1)
+            elif key == curses.KEY_NPAGE:
+                self.offset += height - 2
+            elif key == curses.KEY_PPAGE:
+                self.offset = max(0, self.offset - height + 2)
+            elif key == curses.KEY_RESIZE:
+                self._painted = {}
+                screen.clear()
+
+    def run(self):
+        """Show the dashboard until q or Ctrl-C; print one frame when not on a terminal."""
+        for informer in self._informers:
+            informer.start()
+        try:
+            if not sys.stdout.isatty():
+                for informer in self._informers:
+                    informer.wait_synced(REQUEST_TIMEOUT)
+                print("\n".join(self.lines()))
+                return
+            import curses
+            try:
+                curses.wrapper(self._loop)
+            except KeyboardInterrupt:
+                pass
+        finally:
+            for informer in self._informers:
+                informer.stop()
+
+
+def write_rows(rows, columns, output="table", stream=None):
+    """Write rows (dicts) as a table, tab-separated values, JSON or NDJSON."""
+    stream = stream or sys.stdout
+    if output == "json":
+        json.dump(rows, stream, indent=2)
+        stream.write("\n")
+    elif output == "ndjson":
+        for row in rows:
+            stream.write(json.dumps(row) + "\n")
+    elif output == "tsv":
+        stream.write("\t".join(columns) + "\n")
+        for row in rows:
+            stream.write("\t".join(_cell(row, column) for column in columns) + "\n")
+    else:
+        print_table([column.upper() for column in columns],
+                    [[_cell(row, column) for column in columns] for row in rows], stream)
+
+
+def stream_rows(pages, columns, output="table", stream=None):
+    """Write rows page by page as they arrive; returns the number of rows written.
+
+    Only one page is held at a time. A table takes its column widths from
+    the first page and widens them when a later page needs more room.
+    """
+    stream = stream or sys.stdout
+    count = 0
+    widths = [len(column) for column in columns]
+    if output == "json":
+        stream.write("[")
+    elif output == "tsv":
+        stream.write("\t".join(columns) + "\n")
+    for page in pages:
+        if output == "json":
+            for row in page:
+                text = json.dumps(row, indent=2).replace("\n", "\n  ")
+                stream.write(("," if count else "") + "\n  " + text)
+                count += 1
+        elif output == "ndjson":
+            stream.write("".join(json.dumps(row) + "\n" for row in page))
+        elif output == "tsv":
+            stream.write("".join("\t".join(_cell(row, column) for column in columns) + "\n" for row in page))
+        else:
+            cells = [[_cell(row, column) for column in columns] for row in page]
+            widths = [max([width] + [len(row[i]) for row in cells]) for i, width in enumerate(widths)]
+            if not count and cells:
+                cells.insert(0, [column.upper() for column in columns])
+            stream.write("".join("   ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() + "\n"
+                                 for row in cells))
+        if output != "json":
+            count += len(page)
+        stream.flush()
+    if output == "json":
+        stream.write("\n]\n" if count else "]\n")
+    elif output == "table" and not count:
+        stream.write("No resources found\n")
+    return count
+
+
+def _cell(row, column):
+    """Text of one table cell; missing values and None are left blank."""
+    value = row.get(column)
+    return "" if value is None else str(value)
+
+
+def node_table():
+    nodes = kube_request("GET", resource_path("nodes")).get("items", [])
+    return [node_row(node) for node in nodes], ["name", "status", "roles", "age", "version"]
+
+
+def namespace_table():
+    namespaces = kube_request("GET", resource_path("namespaces")).get("items", [])
+    rows = [{"name": ns["metadata"]["name"], "status": (ns.get("status") or {}).get("phase", ""),
+             "age": format_age(ns["metadata"].get("creationTimestamp"))} for ns in namespaces]
+    return rows, ["name", "status", "age"]
+
+
+def context_table():
+    config = load_kubeconfig()
+    rows = [{"current": "*" if c["name"] == current_context() else "", "name": c["name"],
+             "cluster": (c.get("context") or {}).get("cluster", ""),
+             "user": (c.get("context") or {}).get("user", ""),
+             "namespace": (c.get("context") or {}).get("namespace", "")}
+            for c in config.get("contexts") or []]
+    return rows, ["current", "name", "cluster", "user", "namespace"]
+
+
+def _cli_get_nodes(args):
+    return node_table()
+
+
+def _cli_get_contexts(args):
+    return context_table()
+
+
+def _cli_select_context(args):
+    run_kubectl_command(f"kubectl config use-context {args.name}")
+    return [{"context": args.name}], ["context"]
+
+
+def _cli_list_namespaces(args):
+    return namespace_table()
+
+
+def _cli_not_running_pods(args):
+    rows = fan_out_rows(lambda ns: [pod_row(pod) for pod in query_pods(ns, exclude_phase="Running")],
+                        args.namespaces)
+    return rows, namespace_columns(args.namespaces, ["name", "ready", "status", "restarts", "age"])
+
+
+def _cli_delete_pods(args):
+    pods = find_pods_to_delete(None if args.all_namespaces else args.namespace, args.status)
+    if args.dry_run:
+        print(f"Would delete {pod_count_summary(pods)}.", file=sys.stderr)
+        rows = [{"namespace": pod.namespace, "name": pod.name, "status": pod.status} for pod in pods]
+        return rows, ["namespace", "name", "status"]
+    runner = delete_pods_bulk(pods, args.workers, args.rate, args.retries, progress=sys.stderr.isatty())
+    print(runner.summary(), file=sys.stderr)
+    failed = {pod.key: error for pod, error in runner.failed}
+    rows = [{"namespace": pod.namespace, "name": pod.name, "status": pod.status,
+             "result": "failed" if pod.key in failed else "deleted", "error": failed.get(pod.key, "")}
+            for pod in pods]
+    write_rows(rows, ["namespace", "name", "status", "result", "error"], output=args.output)
+    return 1 if failed else 0
+
+
+def _cli_list_deployments(args):
+    rows = fan_out_rows(list_deployment_rows, args.namespaces)
+    return rows, namespace_columns(args.namespaces, ["name", "ready", "up_to_date", "available", "age"])
+
+
+def _track_rollouts(targets, args):
+    tracker = RolloutTracker(targets, args.timeout, args.stall_timeout)
+    rows = tracker.run()
+    print(tracker.report(rows), file=sys.stderr)
+    write_rows(rows, ["namespace", "name", "result", "seconds", "message"], output=args.output)
+    return 0 if all(row["result"] == "available" for row in rows) else 1
+
+
+def _cli_check_deployment_status(args):
+    targets = deployment_targets(args.namespace, args.deployments, args.selector)
+    if not targets:
+        print("No deployments selected.", file=sys.stderr)
+        return 2
+    return _track_rollouts(targets, args)
+
+
+def _cli_cordon_nodes(args):
+    nodes = list(args.nodes)
+    if args.selector:
+        nodes += [node for node in nodes_matching(args.selector) if node not in nodes]
+    if not nodes:
+        print("No nodes selected.", file=sys.stderr)
+        return 2
+    operations = NodeOperations(args.action, args.workers, args.eviction_workers, args.timeout, args.rate,
+                                force=args.force, delete_emptydir_data=args.delete_emptydir_data)
+    rows = operations.run(nodes)
+    print(operations.report(rows), file=sys.stderr)
+    write_rows(rows, ["node", "action", "result", "evicted", "seconds", "error"], output=args.output)
+    return 1 if any(row["result"] == "failed" for row in rows) else 0
+
+
+def _cli_restart_deployments(args):
+    targets = deployments_matching(args.namespaces, args.selector, args.match)
+    if not targets:
+        print("No deployments matched.", file=sys.stderr)
+        return 2
+    if args.dry_run:
+        print(f"Would restart {len(targets)} deployments in waves of {args.wave_size}.", file=sys.stderr)
+        return [{"namespace": ns, "name": name, "wave": i // args.wave_size + 1}
+                for i, (ns, name) in enumerate(targets)], ["namespace", "name", "wave"]
+    restart = WaveRestart(args.wave_size, args.workers, args.rate, args.timeout, args.stall_timeout, args.keep_going)
+    rows = restart.run(targets)
+    print(restart.report(rows), file=sys.stderr)
+    write_rows(rows, ["wave", "namespace", "name", "result", "seconds", "message"], output=args.output)
+    return 0 if all(row["result"] == "available" for row in rows) else 1
+
+
+def _cli_list_pods(args):
+    rows = [pod_row(pod) for pod in query_pods(args.namespace, node=args.node)]
+    return rows, ["name", "ready", "status", "restarts", "age"]
+
+
+def _cli_list_pods_on_nodes(args):
+    pages = ([pod_row(pod) for pod in page] for page in iter_pods())
+    return pages, ["namespace", "name", "status", "node"]
+
+
+def _cli_image_version(args):
+    rows = fan_out_rows(pod_image_rows, args.namespaces)
+    return rows, namespace_columns(args.namespaces, ["pod", "container", "image"])
+
+
+def _cli_image_inventory(args):
+    inventory = ImageInventory.collect(args.namespaces)
+    return inventory.rows(args.by, args.image), inventory.columns(args.by)
+
+
+def _cli_restart_deployment(args):
+    rollout_restart(args.namespace, args.deployment)
+    if args.wait:
+        return _track_rollouts([(args.namespace, args.deployment)], args)
+    return [{"namespace": args.namespace, "name": args.deployment, "restarted": True}], ["name", "restarted"]
+
+
+def _log_options(args):
+    return {"follow": args.follow, "since": args.since, "tail": args.tail,
+            "timestamps": args.timestamps, "buffer_lines": args.buffer_lines}
+
+
+def _cli_check_crash_log(args):
+    print_pod_logs(args.namespace, args.pod, previous=True, **_log_options(args))
+
+
+def _cli_crash_triage(args):
+    triage = CrashTriage(args.min_restarts, args.tail, args.workers)
+    rows = triage.run(args.namespaces)
+    if args.details:
+        return sorted(rows, key=lambda row: (row["reason"], row["signature"], row["namespace"], row["pod"])), \
+            namespace_columns(args.namespaces, CrashTriage.DETAIL_COLUMNS[1:])
+    return triage.classes(rows), CrashTriage.CLASS_COLUMNS
+
+
+def _event_selector(args):
+    return event_field_selector(args.type, args.reason, args.kind, args.object_name)
+
+
+def _cli_events(args):
+    if args.watch:
+        tail_events(args.namespaces, _event_selector(args), args.output, args.initial, args.window)
+        return 0
+    rows = fan_out_rows(lambda ns: list_events(ns, _event_selector(args)), args.namespaces,
+                        key=lambda row: row["last_seen"] or "")
+    return rows, namespace_columns(args.namespaces, ["last_seen", "type", "reason", "object", "message"])
+
+
+def _cli_all_events(args):
+    if args.watch:
+        tail_events(None, _event_selector(args), args.output, args.initial, args.window)
+        return 0
+    return list_events(None, _event_selector(args)), ["namespace", "last_seen", "type", "reason", "object", "message"]
+
+
+def _cli_list_pod_with_labels(args):
+    pages = ([pod_label_row(pod) for pod in page] for page in iter_pods(args.namespace))
+    return pages, ["name", "status", "labels"]
+
+
+def _cli_list_containers(args):
+    pages = ([pod_container_row(pod) for pod in page] for page in iter_pods(args.namespace))
+    return pages, ["name", "init_containers", "containers"]
+
+
+def _cli_container_logs(args):
+    print_pod_logs(args.namespace, args.pod, args.container, **_log_options(args))
+
+
+def _cli_deploy_logs(args):
+    if not print_selector_logs(args.namespace, "deployments", args.deployment, container=args.container,
+                               max_pods=args.max_pods, **_log_options(args)):
+        print(f"No logs found for deployment {args.deployment}.", file=sys.stderr)
+        return 1
+
+
+def _cli_dashboard(args):
+    Dashboard(args.namespaces, args.interval).run()
+    return 0
+
+
+def _cli_services_logs(args):
+    if not print_selector_logs(args.namespace, "services", args.service, container=args.container,
+                               max_pods=args.max_pods, **_log_options(args)):
+        print(f"No logs found for service {args.service}.", file=sys.stderr)
+        return 1
+
+
+# Commands that list events and can tail them with --watch.
+EVENT_COMMANDS = {"events", "all-events"}
+
+# Commands that stream a pod log and take --follow/--since/--tail.
+LOG_COMMANDS = {"check-crash-log", "container-logs", "deploy-logs", "services-logs"}
+
+# Commands whose -n accepts several comma-separated namespaces, globs and re:REGEX patterns.
+MULTI_NAMESPACE_COMMANDS = {"not-running-pods", "list-deployments", "image-version", "image-inventory", "events",
+                            "dashboard", "restart-deployments", "crash-triage"}
+
+# Read-only commands that can run against several contexts at once with --contexts.
+MULTI_CONTEXT_COMMANDS = {"get-nodes", "list-namespaces", "not-running-pods", "list-deployments", "list-pods",
+                          "list-pods-on-nodes", "image-version", "image-inventory", "crash-triage", "events",
+                          "all-events", "list-pod-with-labels", "list-containers"}
+
+
+def positive_int(text):
+    """argparse type for counts that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        import argparse
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+# Positional arguments of each subcommand; every command also accepts -n/-o/--context.
+CLI_ARGUMENTS = {
+    "select-context": [("name", {})],
+    "delete-pods": [("-A", {"dest": "all_namespaces", "action": "store_true", "help": "every namespace"}),
+                    ("--status", {"help": "only pods with this status, e.g. Evicted"}),
+                    ("--dry-run", {"action": "store_true", "help": "list and count the pods, delete nothing"}),
+                    ("--workers", {"type": int, "default": MAX_INFLIGHT}),
+                    ("--rate", {"type": float, "default": BULK_QPS, "help": "deletions per second"}),
+                    ("--retries", {"type": int, "default": 5, "help": "retries on 429/5xx"})],
+    "check-deployment-status": [("deployments", {"nargs": "*", "help": "names, or namespace/name"}),
+                                ("-l", {"dest": "selector", "help": "also track deployments matching this selector"}),
+                                ("--timeout", {"type": float, "default": 600, "help": "seconds for all rollouts"}),
+                                ("--stall-timeout", {"type": float, "default": 120,
+                                                     "help": "seconds without progress before a rollout is stalled"})],
+    "cordon-nodes": [("nodes", {"nargs": "*"}),
+                     ("-l", {"dest": "selector", "help": "also target nodes matching this label selector"}),
+                     ("--action", {"choices": ["cordon", "uncordon", "drain"], "default": "cordon"}),
+                     ("--workers", {"type": int, "default": MAX_INFLIGHT, "help": "nodes processed at once"}),
+                     ("--eviction-workers", {"type": int, "default": 8, "help": "evictions in flight per node"}),
+                     ("--timeout", {"type": float, "default": 600, "help": "seconds allowed per node drain"}),
+                     ("--rate", {"type": float, "default": BULK_QPS, "help": "API requests per second"}),
+                     ("--force", {"action": "store_true",
+                                  "help": "drain: also evict pods not managed by a controller"}),
+                     ("--delete-emptydir-data", {"action": "store_true",
+                                                 "help": "drain: also evict pods with emptyDir volumes"})],
+    "list-pods": [("--node", {"required": True})],
+    "restart-deployment": [("deployment", {}),
+                           ("--wait", {"action": "store_true", "help": "track the rollout until it is available"}),
+                           ("--timeout", {"type": float, "default": 600}),
+                           ("--stall-timeout", {"type": float, "default": 120})],
+    "restart-deployments": [("-l", {"dest": "selector", "help": "only deployments matching this label selector"}),
+                            ("--match", {"help": "only deployments whose name matches this regex"}),
+                            ("--wave-size", {"type": positive_int, "default": 10,
+                                             "help": "deployments restarted per wave"}),
+                            ("--workers", {"type": int, "default": MAX_INFLIGHT,
+                                           "help": "restart requests in flight at once"}),
+                            ("--rate", {"type": float, "default": BULK_QPS, "help": "restart requests per second"}),
+                            ("--timeout", {"type": float, "default": 600, "help": "seconds allowed per wave"}),
+                            ("--stall-timeout", {"type": float, "default": 120}),
+                            ("--keep-going", {"action": "store_true",
+                                              "help": "start the next wave even if one did not become healthy"}),
+                            ("--dry-run", {"action": "store_true", "help": "list the waves, restart nothing"})],
+    "check-crash-log": [("pod", {})],
+    "crash-triage": [("--min-restarts", {"type": int, "default": 5,
+                                         "help": "also triage containers restarted this many times"}),
+                     ("--tail", {"type": int, "default": 50, "help": "log lines fetched per failing container"}),
+                     ("--workers", {"type": int, "default": MAX_INFLIGHT, "help": "log fetches in flight"}),
+                     ("--details", {"action": "store_true", "help": "one row per container instead of per class"})],
+    "container-logs": [("pod", {}), ("-c", {"dest": "container"})],
+    "deploy-logs": [("deployment", {}), ("-c", {"dest": "container"}),
+                    ("--max-pods", {"type": int, "default": 100})],
+    "services-logs": [("service", {}), ("-c", {"dest": "container"}),
+                      ("--max-pods", {"type": int, "default": 100})],
+    "dashboard": [("--interval", {"type": float, "default": 1.0, "help": "seconds between refreshes"})],
+    "image-inventory": [("--by", {"choices": list(ImageInventory.VIEWS), "default": "image",
+                                  "help": "group by image, digest, namespace, workload, or version "
+                                          "(every tag and digest of an image with where it runs)"}),
+                        ("--image", {"help": "only repositories matching this name or glob, e.g. nginx or '*/redis'"})],
+}
+
+
+def build_parser():
+    """Return the argparse parser with one subcommand per entry of show_commands()."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="kubermon", description="Kubernetes monitoring helper. "
+                                     "Run without arguments for the interactive menu.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-n", "--namespace", help="namespace (default: the context's namespace); commands with -A "
+                        "also accept comma-separated names, globs and re:REGEX patterns")
+    common.add_argument("-o", "--output", choices=["table", "json", "ndjson", "tsv"], default="table",
+                        help="output format (log commands always print raw log text)")
+    common.add_argument("--context", help="kubeconfig context to use for this call")
+    subparsers = parser.add_subparsers(dest="command")
+    for command in show_commands():
+        subparser = subparsers.add_parser(command, parents=[common])
+        for name, options in CLI_ARGUMENTS.get(command, []):
+            subparser.add_argument(name, **options)
+        if command in EVENT_COMMANDS:
+            subparser.add_argument("-w", "--watch", action="store_true",
+                                   help="keep printing new events (incremental, until Ctrl-C)")
+            subparser.add_argument("--type", help="server-side filter, e.g. Warning")
+            subparser.add_argument("--reason", help="server-side filter, e.g. BackOff")
+            subparser.add_argument("--kind", help="server-side filter on the involved object kind, e.g. Pod")
+            subparser.add_argument("--object-name", help="server-side filter on the involved object name")
+            subparser.add_argument("--initial", type=int, default=20, help="recent events shown when a watch starts")
+            subparser.add_argument("--window", type=int, default=EVENT_WINDOW,
+                                   help="events remembered for de-duplication")
+        if command in LOG_COMMANDS:
+            subparser.add_argument("-f", "--follow", action="store_true", help="stream new log lines as they arrive")
+            subparser.add_argument("--since", help="only lines newer than a duration (30s, 5m, 2h) or RFC 3339 time")
+            subparser.add_argument("--tail", type=int, help="only the last N lines")
+            subparser.add_argument("--timestamps", action="store_true", help="prefix lines with their timestamp")
+            subparser.add_argument("--buffer-lines", type=int, default=LOG_BUFFER_LINES,
+                                   help="lines buffered between the API stream and the terminal")
+        if command in MULTI_CONTEXT_COMMANDS:
+            subparser.add_argument("--contexts", help="comma-separated contexts or globs to query concurrently; "
+                                   "rows gain a cluster column")
+            subparser.add_argument("--all-contexts", action="store_true", help="query every kubeconfig context")
+            subparser.add_argument("--context-timeout", type=float, default=REQUEST_TIMEOUT,
+                                   help="seconds to wait for each context (default: %(default)s)")
+        if command in MULTI_NAMESPACE_COMMANDS:
+            subparser.add_argument("-A", "--all-namespaces", action="store_true",
+                                   help="query every namespace with cluster-wide requests")
+    return parser
+
+
+def run_cli(argv):
+    """Run one command non-interactively: no banner, prompts or continue question."""
+    global _current_context, KUBE_WATCH
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    multi_context = getattr(args, "contexts", None) or getattr(args, "all_contexts", False)
+    if multi_context and getattr(args, "watch", False):
+        parser.error("--watch cannot be combined with --contexts or --all-contexts")
+    if args.context:
+        _current_context = args.context
+    # A single call gains nothing from a cluster-wide watch; issue filtered LISTs instead.
+    KUBE_WATCH = False
+    metrics.start_action(args.command)
+    handler = globals()["_cli_" + args.command.replace("-", "_")]
+    if multi_context:
+        return _run_multi_context(handler, args)
+    result = handler(_resolve_namespaces(args))
+    if isinstance(result, tuple):
+        rows, columns = result
+        if isinstance(rows, list):
+            write_rows(rows, columns, output=args.output)
+        else:
+            # A generator of pages: print each page as soon as it arrives.
+            stream_rows(rows, columns, output=args.output)
+        return 0
+    return result or 0
+
+
+def _resolve_namespaces(args):
+    """Fill in the namespace arguments of ``args`` for the current (or scoped) context.
+
+    ``-A`` leaves ``args.namespaces`` None, which every multi-namespace command
+    serves with cluster-wide requests instead of one per namespace.
+    """
+    args = copy.copy(args)
+    if args.command in MULTI_NAMESPACE_COMMANDS:
+        if args.all_namespaces:
+            args.namespaces = None
+        else:
+            args.namespaces = match_namespaces(args.namespace or default_namespace())
+    if args.namespace is None:
+        args.namespace = default_namespace()
+    return args
+
+
+def _materialize(result):
+    """Collect paged rows into one list, inside the context the pages were fetched for."""
+    rows, columns = result
+    return (rows if isinstance(rows, list) else [row for page in rows for row in page]), columns
+
+
+def _run_multi_context(handler, args):
+    """Run a read-only command against several contexts concurrently and merge the rows."""
+    contexts = list_contexts() if args.all_contexts else match_contexts(args.contexts)
+    results = run_per_context(lambda: _materialize(handler(_resolve_namespaces(args))), contexts,
+                              args.context_timeout)
+    rows, columns, failed = [], [], 0
+    for context, (result, error) in results.items():
+        if error is not None:
+            print(f"{context}: {error}", file=sys.stderr)
+            failed += 1
+            continue
+        context_rows, columns = result
+        rows.extend(dict(row, cluster=context) for row in context_rows)
+    write_rows(rows, ["cluster"] + columns, output=args.output)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    global _snapshot
+    argv = sys.argv[1:] if argv is None else argv
+    if PROFILE_PATH:
+        start_profiler(PROFILE_PATH)
+    if METRICS_PATH:
+        metrics.enabled = True
+        atexit.register(metrics.export, METRICS_PATH)
+    if argv:
+        try:
+            return run_cli(argv)
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`); drop the rest of the output quietly.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+    if SNAPSHOT_PATH:
+        _snapshot = Snapshot(SNAPSHOT_PATH)
+        atexit.register(save_snapshot)
+    resource_cache.start_refresh()
+    while True:
+        # Clear screen and show command list
+        clear_screen()
+        # Print the Welcome KUBERMON message
+        print(banner())
+        print("Welcome to Kubemon! (v1.0.0)")
+        commands = show_commands()
+
+        # Select a command by typing part of its name or with the arrow keys
+        resource_cache.set_idle(True)
+        command = fuzzy_select("Please select a command:", commands)
+        resource_cache.set_idle(False)
+        if command is None:
+            print("No selection made. Exiting.")
+            break
+
+        metrics.start_action(command)
+        if command == "get-nodes":
+            write_rows(*node_table())
+        elif command == "get-contexts":
+            get_contexts()
+        elif command == "select-context":
+            select_context()
+        elif command == "list-namespaces":
+            write_rows(*namespace_table())
+        elif command == "not-running-pods":
+            list_not_running_pods()
+        elif command == "delete-pods":
+            delete_pods()
+        elif command == "list-deployments":
+            list_deployments()
+        elif command == "check-deployment-status":
+            check_deployment_status()
+        elif command == "cordon-nodes":
+            cordon_node()
+        elif command == "list-pods":
+            list_pods_on_node()
+        elif command == "list-pods-on-nodes":
+            list_pods_on_all_nodes()
+        elif command == "image-version":
+            list_pod_images()
+        elif command == "image-inventory":
+            image_inventory()
+        elif command == "restart-deployment":
+            restart_deployment()
+        elif command == "restart-deployments":
+            restart_deployments()
+        elif command == "check-crash-log":
+            check_crash_log()
+        elif command == "crash-triage":
+            crash_triage()
+        elif command == "events":
+            get_events()
+        elif command == "all-events":
+            get_all_events()
+        elif command == "list-pod-with-labels":
+            list_pods_with_labels()
+        elif command == "list-containers":
+            list_containers()
+        elif command == "container-logs":
+            container_logs()
+        elif command == "deploy-logs":
+            deploy_logs()
+        elif command == "services-logs":
+            services_logs()
+        elif command == "dashboard":
+            dashboard()
+        else:
+            print(f"Unknown command: {command}")
+        metrics.end_action()
+        # wants to continue or exit
+        resource_cache.set_idle(True)
+        continue_prompt = input("\nDo you want to run another command? (y/n): ").strip().lower()
+        resource_cache.set_idle(False)
+        if continue_prompt != 'y':
+            print("Exiting Kubemon.")
+            break
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
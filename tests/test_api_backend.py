@@ -0,0 +1,95 @@
+"""ApiBackend: kubeconfig handling, the kubectl fallback, and requests against the stub API server."""
+import os
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+NO_PROXY_ENV = {key: value for key, value in os.environ.items() if not key.lower().endswith("_proxy")}
+
+
+def kubeconfig(server="https://10.0.0.1:6443", **cluster):
+    return {"current-context": "prod",
+            "contexts": [{"name": "prod", "context": {"cluster": "prod", "user": "admin"}}],
+            "clusters": [{"name": "prod",
+                          "cluster": dict(cluster, server=server, **{"insecure-skip-tls-verify": True})}],
+            "users": [{"name": "admin", "user": {"token": "secret"}}]}
+
+
+class FromKubeconfigTest(unittest.TestCase):
+
+    def setUp(self):
+        for patcher in (mock.patch.dict(os.environ, NO_PROXY_ENV, clear=True),
+                        mock.patch.dict(kubermon._backends, clear=True),
+                        mock.patch.object(kubermon, "KUBE_API_SERVER", None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def backend(self, config, mode="auto"):
+        with mock.patch.object(kubermon, "load_kubeconfig", return_value=config), \
+                mock.patch.object(kubermon, "KUBE_BACKEND", mode):
+            return kubermon._make_backend("prod")
+
+    def test_token_user(self):
+        backend = self.backend(kubeconfig())
+        self.assertIsInstance(backend, kubermon.ApiBackend)
+        self.assertEqual((backend.server, backend._host, backend._port), ("https://10.0.0.1:6443", "10.0.0.1", 6443))
+        self.assertEqual(backend._headers(None)["Authorization"], "Bearer secret")
+
+    def test_unknown_context(self):
+        with mock.patch.object(kubermon, "load_kubeconfig", return_value=kubeconfig()):
+            with self.assertRaises(kubermon.KubeConfigError):
+                kubermon.ApiBackend.from_kubeconfig("staging")
+
+    def test_proxy_url_falls_back_to_kubectl(self):
+        config = kubeconfig(**{"proxy-url": "http://proxy:3128"})
+        self.assertIsInstance(self.backend(config), kubermon.KubectlBackend)
+        with self.assertRaisesRegex(kubermon.KubeConfigError, "proxy http://proxy:3128"):
+            with mock.patch.object(kubermon, "load_kubeconfig", return_value=config):
+                kubermon.ApiBackend.from_kubeconfig("prod")
+
+    def test_environment_proxy_falls_back_to_kubectl(self):
+        os.environ["HTTPS_PROXY"] = "http://proxy:3128"
+        self.assertIsInstance(self.backend(kubeconfig()), kubermon.KubectlBackend)
+        # HTTPS_PROXY does not apply to a plain http:// server.
+        self.assertIsInstance(self.backend(kubeconfig("http://10.0.0.1:8080")), kubermon.ApiBackend)
+
+    def test_no_proxy_exempts_the_server(self):
+        os.environ.update(HTTPS_PROXY="http://proxy:3128", NO_PROXY="localhost,10.0.0.1")
+        self.assertIsInstance(self.backend(kubeconfig()), kubermon.ApiBackend)
+
+    def test_api_mode_refuses_a_proxy(self):
+        os.environ["https_proxy"] = "http://proxy:3128"
+        with self.assertRaises(SystemExit), mock.patch("builtins.print"):
+            self.backend(kubeconfig(), mode="api")
+
+
+class ApiBackendRequestTest(ClusterTestCase):
+
+    def test_list_and_get(self):
+        backend = kubermon.ApiBackend(self.server.url)
+        namespaces = backend.request("GET", kubermon.resource_path("namespaces"))
+        self.assertEqual([ns["metadata"]["name"] for ns in namespaces["items"]], ["ns-0", "ns-1"])
+        pod = self.pod(0)["metadata"]
+        self.assertEqual(backend.request("GET", f"/api/v1/namespaces/{pod['namespace']}/pods/{pod['name']}"),
+                         self.pod(0))
+
+    def test_error_status_raises(self):
+        backend = kubermon.ApiBackend(self.server.url)
+        with self.assertRaises(kubermon.KubeApiError) as raised:
+            backend.request("GET", "/api/v1/namespaces/ns-0/pods/missing")
+        self.assertEqual(raised.exception.status, 404)
+        self.server.fail("GET", "/api/v1/nodes", 403)
+        with self.assertRaises(kubermon.KubeApiError) as raised:
+            backend.request("GET", "/api/v1/nodes")
+        self.assertEqual(raised.exception.status, 403)
+
+    def test_connections_are_reused(self):
+        backend = kubermon.ApiBackend(self.server.url)
+        for _ in range(5):
+            backend.request("GET", "/api/v1/nodes")
+        self.assertEqual(len(backend._idle), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Bulk delete and rate limiting against the fake cluster's stub API server.
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+import json
+import time
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+
+class DeletePodsTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Every 4th pod has failed; with the one Pending pod that makes 11 pods to delete.
+        for i in range(0, 40, 4):
+            self.pod(i)["status"]["phase"] = "Failed"
+        pods = [pod["metadata"] for pod in self.cluster.objects["pods"] if pod["status"]["phase"] != "Running"]
+        self.names = sorted(pod["name"] for pod in pods)
+        self.namespaces = {pod["name"]: pod["namespace"] for pod in pods}
+
+    def path(self, name):
+        return f"/api/v1/namespaces/{self.namespaces[name]}/pods/{name}"
+
+    def test_dry_run_deletes_nothing(self):
+        code, out, err = self.run_cli("delete-pods", "-A", "--dry-run", "-o", "json")
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(row["name"] for row in json.loads(out)), self.names)
+        self.assertIn(f"Would delete {len(self.names)} pods", err)
+        self.assertEqual(self.calls("DELETE"), [])
+
+    def test_partial_failure_deletes_the_rest(self):
+        forbidden, flaky, gone = self.names[:3]
+        self.server.fail("DELETE", self.path(forbidden), 403)
+        self.server.fail("DELETE", self.path(flaky), 503, times=2)
+        self.server.fail("DELETE", self.path(gone), 404)
+        code, out, err = self.run_cli("delete-pods", "-A", "-o", "json")
+        self.assertEqual(code, 1)
+        results = {row["name"]: row for row in json.loads(out)}
+        self.assertEqual(results[forbidden]["result"], "failed")
+        self.assertIn("403", results[forbidden]["error"])
+        # 503 is retried until it succeeds; 404 means the pod is already gone.
+        self.assertEqual(sorted(name for name, row in results.items() if row["result"] == "deleted"),
+                         sorted(set(self.names) - {forbidden}))
+        self.assertEqual(len(self.calls("DELETE", flaky)), 3)
+        self.assertEqual(len(self.calls("DELETE", forbidden)), 1)
+        self.assertIn(f"{len(self.names) - 1} succeeded, 1 failed", err)
+
+
+class RateLimitTest(unittest.TestCase):
+
+    def test_token_bucket_spaces_calls_after_the_burst(self):
+        bucket = kubermon.TokenBucket(rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+
+    def test_bulk_runner_workers_share_the_limit(self):
+        # 20 tokens of burst, then 10 per second: 30 calls take about a second however many workers run.
+        runner = kubermon.BulkRunner(lambda item: None, "noop", workers=16, rate=10, progress=False)
+        results = runner.run(range(30))
+        self.assertEqual(runner.succeeded, 30)
+        self.assertTrue(all(error is None for _, error in results))
+        self.assertGreaterEqual(runner.elapsed, 0.9)
+
+    def test_retries_go_through_the_limiter(self):
+        limiter = mock.Mock()
+        attempts = iter([kubermon.KubeApiError(429, "slow down"), None])
+
+        def call():
+            error = next(attempts)
+            if error:
+                raise error
+            return "ok"
+        self.assertEqual(kubermon.call_with_retry(call, limiter=limiter, base_delay=0.01), "ok")
+        self.assertEqual(limiter.acquire.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Crash triage: failing containers, log signatures and failure classes."""
+import copy
+import json
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+
+def container(name="app", restarts=0, state=None, last=None):
+    return {"name": name, "restartCount": restarts, "state": state or {"running": {}}, "lastState": last or {}}
+
+
+def pod(*statuses, name="web-1", init=()):
+    return {"metadata": {"name": name, "namespace": "ns", "ownerReferences": []},
+            "status": {"phase": "Running", "containerStatuses": list(statuses), "initContainerStatuses": list(init)}}
+
+
+class LogSignatureTest(unittest.TestCase):
+
+    def test_same_failure_in_other_pods_has_the_same_signature(self):
+        first = ["2024-05-01T10:00:00.123Z starting worker 7",
+                 "2024-05-01T10:00:01.5Z ERROR connection to 10.0.3.17:5432 refused (request 9f1c2a7e-1b2c-4d5e-8f90-"
+                 "0123456789ab)"]
+        second = ["2024-05-02T11:30:09Z starting worker 12",
+                  "2024-05-02T11:30:10Z ERROR connection to 10.0.9.4:5432 refused (request 0b7e6c1d-aaaa-4bbb-8ccc-"
+                  "ffffeeeedddd)"]
+        self.assertEqual(kubermon.log_signature(first)[0], kubermon.log_signature(second)[0])
+        self.assertNotEqual(kubermon.log_signature(first)[0], kubermon.log_signature(["panic: out of range"])[0])
+
+    def test_error_lines_are_preferred(self):
+        lines = ["FATAL: config missing", "shutting down", "bye"]
+        self.assertEqual(kubermon.log_signature(lines)[1], "FATAL: config missing")
+        self.assertEqual(kubermon.log_signature(["a", "b", "c", "d"], size=2),
+                         kubermon.log_signature(["x", "c", "d"], size=2))
+
+    def test_empty_log(self):
+        self.assertEqual(kubermon.log_signature(["", "  "]), ("", ""))
+
+
+class CrashRowsTest(unittest.TestCase):
+
+    def test_crash_loop_reads_the_previous_log(self):
+        looping = container(restarts=3, state={"waiting": {"reason": "CrashLoopBackOff", "message": "back-off"}},
+                            last={"terminated": {"reason": "Error", "exitCode": 2}})
+        [row] = kubermon.crash_rows(pod(looping, container("sidecar")))
+        self.assertEqual((row["container"], row["state"], row["reason"], row["log"], row["restarts"]),
+                         ("app", "CrashLoopBackOff", "Error (exit 2)", "previous", 3))
+        self.assertEqual(row["workload"], "Pod/web-1")
+
+    def test_dead_container_reads_the_current_log(self):
+        dead = container(state={"terminated": {"reason": "OOMKilled", "exitCode": 137}})
+        [row] = kubermon.crash_rows(pod(init=[dead]))
+        self.assertEqual((row["state"], row["reason"], row["log"]), ("OOMKilled", "OOMKilled", "current"))
+
+    def test_container_that_never_ran_has_no_log(self):
+        pulling = container(state={"waiting": {"reason": "ImagePullBackOff", "message": "pull access denied"}})
+        [row] = kubermon.crash_rows(pod(pulling))
+        self.assertEqual((row["reason"], row["log"], row["message"]), ("ImagePullBackOff", "", "pull access denied"))
+
+    def test_restart_threshold(self):
+        restarted = container(restarts=5, last={"terminated": {"reason": "Completed", "exitCode": 0}})
+        self.assertEqual(kubermon.crash_rows(pod(restarted), min_restarts=6), [])
+        self.assertEqual(kubermon.crash_rows(pod(restarted))[0]["reason"], "Completed")
+        self.assertEqual(kubermon.crash_rows(pod(container(), container("b", restarts=1))), [])
+
+
+class CrashTriageTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cluster.log_lines = 100
+        # Pod 7 crash-loops (exit 1); make pods 17 and 27 do the same and pod 12 get OOM-killed.
+        for i in (17, 27):
+            self.pod(i)["status"] = copy.deepcopy(self.pod(7)["status"])
+        self.pod(12)["status"]["containerStatuses"][0]["lastState"] = {"terminated": {"reason": "OOMKilled"}}
+
+    def test_failures_are_grouped_by_reason_and_log_signature(self):
+        with kubermon.context_scope("test"):
+            classes = kubermon.CrashTriage.classes(kubermon.CrashTriage(tail=10).run())
+        self.assertEqual([(c["reason"], c["pods"], c["restarts"], c["workloads"]) for c in classes],
+                         [("Error (exit 1)", 3, 36, 3), ("OOMKilled", 1, 0, 1)])
+        name = self.pod(7)["metadata"]["name"]
+        self.assertEqual(classes[0]["message"], f"ERROR {name} connection refused to db-1:5432")
+        # One pod LIST, and only the failing containers' logs.
+        self.assertEqual(len([path for path in self.calls("GET") if path.endswith("/pods")]), 1)
+        self.assertEqual(len(self.calls("GET", "/log")), 4)
+
+    def test_cli_details(self):
+        code, out, _ = self.run_cli("crash-triage", "-A", "--details", "-o", "json")
+        self.assertEqual(code, 0)
+        rows = json.loads(out)
+        self.assertEqual([row["pod"] for row in rows if row["reason"] == "OOMKilled"],
+                         [self.pod(12)["metadata"]["name"]])
+        self.assertEqual(len(rows), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Dashboard: one frame from the pod, node and deployment informers, rebuilt only on change."""
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+
+class ObjectStoreTest(unittest.TestCase):
+
+    def test_version_changes_only_with_a_row(self):
+        store = kubermon.ObjectStore(lambda obj: {"name": obj["metadata"]["name"], "ready": obj["ready"]})
+        store.replace([{"metadata": {"name": "b"}, "ready": 1}, {"metadata": {"name": "a"}, "ready": 1}])
+        version = store.version
+        store.upsert({"metadata": {"name": "a", "resourceVersion": "9"}, "ready": 1})
+        self.assertEqual(store.version, version)
+        store.upsert({"metadata": {"name": "a"}, "ready": 0})
+        store.delete({"metadata": {"name": "b"}})
+        store.delete({"metadata": {"name": "missing"}})
+        self.assertEqual(store.version, version + 2)
+        self.assertEqual(store.rows(), [{"name": "a", "ready": 0}])
+
+
+class DashboardTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cluster.objects["nodes"][1]["status"]["conditions"][0]["status"] = "False"
+        self.cluster.objects["deployments"][1]["status"]["updatedReplicas"] = 2
+
+    def frame(self, *argv):
+        code, out, _ = self.run_cli("dashboard", *argv)
+        self.assertEqual(code, 0)
+        return out.splitlines()
+
+    def test_frame(self):
+        lines = self.frame("-n", "ns-1")
+        self.assertTrue(lines[0].startswith("kubermon test "))
+        self.assertEqual(lines[2], "NODES [##########..........] 1/2 ready")
+        self.assertEqual(lines[3].split(), ["node-1", "NotReady", "v1.29.0"])
+        self.assertEqual(lines[5], "PODS 20 in 1 namespaces")
+        self.assertEqual(lines[7].split(), ["ns-1", "20", "0", "0", "0", "0", "20"])
+        self.assertEqual(lines[9], "DEPLOYMENTS 3/4 rolled out")
+        # The rollout in progress comes first.
+        self.assertTrue(lines[10].startswith("  ns-1/app-1 "))
+        self.assertIn("[########............]", lines[10])
+        self.assertIn("2 out of 5 new replicas have been updated", lines[10])
+        self.assertEqual([line.split()[0] for line in lines[11:]], ["ns-1/app-3", "ns-1/app-5", "ns-1/app-7"])
+        self.assertEqual([line for line in lines if line != line.rstrip()], [])
+
+    def test_all_namespaces(self):
+        lines = self.frame("-A")
+        self.assertIn("PODS 40 in 2 namespaces", lines)
+        self.assertIn("DEPLOYMENTS 7/8 rolled out", lines)
+
+    def test_body_is_rebuilt_only_when_a_store_changes(self):
+        dashboard = kubermon.Dashboard(context="test")
+        pods = self.cluster.objects["pods"]
+        dashboard.pods.replace(pods)
+        dashboard.nodes.replace(self.cluster.objects["nodes"])
+        first = dashboard.lines()[2:]
+        body = dashboard._body
+        dashboard.nodes.upsert(self.cluster.objects["nodes"][0])
+        dashboard.lines()
+        self.assertIs(dashboard._body, body)
+        dashboard.pods.delete(pods[0])
+        self.assertNotEqual(dashboard.lines()[2:], first)
+        self.assertIsNot(dashboard._body, body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Decoding API responses once and rendering the table views from the decoded objects."""
+import gc
+import json
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+
+class DecodeJsonTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(kubermon, "_json_loads", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def decoder(self, choice, missing=False):
+        imports = mock.patch.object(kubermon.importlib, "import_module", side_effect=ImportError if missing else None,
+                                    wraps=None if missing else kubermon.importlib.import_module)
+        with mock.patch.object(kubermon, "KUBE_JSON", choice), imports:
+            self.assertEqual(kubermon.decode_json(b'{"items": [1, "a"]}'), {"items": [1, "a"]})
+            self.assertEqual(kubermon.decode_json('{"k": null}'), {"k": None})
+        return kubermon._json_loads
+
+    def test_json_is_used_when_chosen_or_orjson_is_missing(self):
+        self.assertIs(self.decoder("json"), json.loads)
+        kubermon._json_loads = None
+        self.assertIs(self.decoder("auto", missing=True), json.loads)
+
+    def test_orjson_required_but_missing_exits(self):
+        with mock.patch("builtins.print"), self.assertRaises(SystemExit):
+            self.decoder("orjson", missing=True)
+
+    def test_large_bodies_are_decoded_with_the_collector_paused(self):
+        seen = []
+        kubermon._json_loads = lambda data: seen.append(gc.isenabled()) or {}
+        with mock.patch.object(kubermon, "GC_PAUSE_BYTES", 10):
+            kubermon.decode_json(b"{}")
+            kubermon.decode_json(b'{"items": []}')
+        self.assertEqual(seen, [gc.isenabled(), False])
+        self.assertTrue(gc.isenabled())
+
+
+class GcPausedTest(unittest.TestCase):
+
+    def test_nested_pauses_re_enable_once(self):
+        with kubermon.gc_paused():
+            with kubermon.gc_paused():
+                self.assertFalse(gc.isenabled())
+            self.assertFalse(gc.isenabled())
+        self.assertTrue(gc.isenabled())
+
+    def test_collector_left_disabled_stays_disabled(self):
+        gc.disable()
+        self.addCleanup(gc.enable)
+        with kubermon.gc_paused():
+            pass
+        self.assertFalse(gc.isenabled())
+
+
+class FormatTableTest(unittest.TestCase):
+
+    def test_columns_are_padded_to_the_widest_value(self):
+        self.assertEqual(kubermon.format_table(["NAME", "RESTARTS"], [["web-1", 3], ["a", 12]]),
+                         ["NAME    RESTARTS", "web-1   3", "a       12"])
+
+    def test_empty_trailing_cells_leave_no_spaces(self):
+        self.assertEqual(kubermon.format_table(["A", "B"], [["x", ""]]), ["A   B", "x"])
+
+
+class TableViewsTest(ClusterTestCase):
+
+    def test_get_nodes(self):
+        self.cluster.objects["nodes"][1]["spec"] = {"unschedulable": True}
+        code, out, _ = self.run_cli("get-nodes", "-o", "json")
+        self.assertEqual(code, 0)
+        rows = json.loads(out)
+        self.assertEqual([(row["name"], row["status"]) for row in rows],
+                         [("node-0", "Ready"), ("node-1", "Ready,SchedulingDisabled")])
+        self.assertEqual(len(self.calls("GET", "/nodes")), 1)
+
+    def test_list_namespaces(self):
+        code, out, _ = self.run_cli("list-namespaces")
+        self.assertEqual(code, 0)
+        lines = out.splitlines()
+        self.assertEqual(lines[0].split(), ["NAME", "STATUS", "AGE"])
+        self.assertEqual([line.split()[:2] for line in lines[1:]], [["ns-0", "Active"], ["ns-1", "Active"]])
+
+    def test_get_contexts_reads_the_kubeconfig(self):
+        config = {"current-context": "b", "contexts": [{"name": "a", "context": {"cluster": "one", "user": "u"}},
+                                                      {"name": "b", "context": {"cluster": "two", "namespace": "n"}}]}
+        with mock.patch.object(kubermon, "_kubeconfig", config), kubermon.context_scope("b"):
+            rows, columns = kubermon.context_table()
+        self.assertEqual(columns, ["current", "name", "cluster", "user", "namespace"])
+        self.assertEqual([[row[c] for c in columns] for row in rows],
+                         [["", "a", "one", "u", ""], ["*", "b", "two", "", "n"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Cordon and drain of nodes against the fake cluster's stub API server."""
+import json
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+
+class DrainTest(ClusterTestCase):
+    # node-0 runs the even-numbered pods (pod 3, the one Pending pod, runs nowhere).
+    ARGS = ("cordon-nodes", "node-0", "--action", "drain", "--timeout", "1", "-o", "json")
+
+    def evicted(self):
+        return self.calls("POST", "/eviction")
+
+    def test_bare_pod_refuses_the_drain(self):
+        self.pod(0)["metadata"]["ownerReferences"] = []
+        code, out, _ = self.run_cli(*self.ARGS)
+        self.assertEqual(code, 1)
+        [row] = json.loads(out)
+        self.assertEqual(row["result"], "failed")
+        self.assertIn(f"{self.pod(0)['metadata']['name']} (no controller)", row["error"])
+        self.assertEqual(self.calls("PATCH", "/nodes/node-0"), ["/api/v1/nodes/node-0"])
+        self.assertEqual(self.evicted(), [])
+
+    def test_emptydir_pod_refuses_the_drain(self):
+        self.pod(2)["spec"]["volumes"] = [{"name": "scratch", "emptyDir": {}}]
+        code, out, _ = self.run_cli(*self.ARGS)
+        self.assertIn("(emptyDir data)", json.loads(out)[0]["error"])
+        self.assertEqual(self.evicted(), [])
+
+    def test_overrides_allow_eviction(self):
+        self.pod(0)["metadata"]["ownerReferences"] = []
+        self.pod(2)["spec"]["volumes"] = [{"name": "scratch", "emptyDir": {}}]
+        self.run_cli(*self.ARGS, "--force", "--delete-emptydir-data")
+        # The stub never removes pods, so the drain then times out waiting; every pod was evicted though.
+        self.assertEqual(len(self.evicted()), 20)
+
+    def test_refusal_rules(self):
+        bare = {"metadata": {"name": "bare"}, "status": {"phase": "Running"}}
+        scratch = {"metadata": {"name": "scratch", "ownerReferences": [{"kind": "ReplicaSet", "controller": True}]},
+                   "spec": {"volumes": [{"name": "tmp", "emptyDir": {}}]}, "status": {"phase": "Running"}}
+        self.assertEqual(kubermon.drain_refusal(bare), "no controller")
+        self.assertIsNone(kubermon.drain_refusal(bare, force=True))
+        self.assertEqual(kubermon.drain_refusal(scratch), "emptyDir data")
+        self.assertIsNone(kubermon.drain_refusal(scratch, delete_emptydir_data=True))
+        # Finished pods are deleted by kubectl drain without either flag.
+        self.assertIsNone(kubermon.drain_refusal(dict(bare, status={"phase": "Succeeded"})))
+
+
+if __name__ == "__main__":
+    unittest.main()
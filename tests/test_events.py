@@ -0,0 +1,88 @@
+"""Events: server-side filters and the EventWindow behind events --watch."""
+import json
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+
+def event(uid, count=1, namespace="ns-0", second=0, reason="BackOff"):
+    return {"metadata": {"uid": uid, "namespace": namespace, "name": uid},
+            "type": "Warning", "reason": reason, "message": f"{uid} happened ", "count": count,
+            "involvedObject": {"kind": "Pod", "name": f"pod-{uid}"},
+            "lastTimestamp": f"2024-01-01T00:00:{second:02d}Z"}
+
+
+class EventFieldSelectorTest(unittest.TestCase):
+
+    def test_selector(self):
+        self.assertEqual(kubermon.event_field_selector(), "")
+        self.assertEqual(kubermon.event_field_selector("Warning", kind="Pod", name="web-1"),
+                         "type=Warning,involvedObject.kind=Pod,involvedObject.name=web-1")
+
+    def test_event_row(self):
+        self.assertEqual(kubermon.event_row(event("a", count=3)),
+                         {"namespace": "ns-0", "last_seen": "2024-01-01T00:00:00Z", "type": "Warning",
+                          "reason": "BackOff", "object": "pod/pod-a", "count": 3, "message": "a happened"})
+
+
+class EventWindowTest(unittest.TestCase):
+
+    def window(self, **options):
+        shown = []
+        return kubermon.EventWindow(lambda row: shown.append(row["object"][8:] + f"x{row['count']}"),
+                                    **options), shown
+
+    def test_first_sync_shows_the_latest_events_only(self):
+        window, shown = self.window(initial=2)
+        window.replace([event(uid, second=n) for n, uid in enumerate("cabd")])
+        self.assertEqual(shown, ["bx1", "dx1"])
+
+    def test_only_new_and_recounted_events_are_shown(self):
+        window, shown = self.window(initial=5)
+        window.replace([event("a"), event("b")])
+        window.upsert(event("a"))
+        window.upsert(event("a", count=2))
+        window.upsert(event("c"))
+        # A relist after a 410 replays everything; only what changed is shown.
+        window.replace([event("a", count=2), event("b", count=4), event("c")])
+        self.assertEqual(shown, ["ax1", "bx1", "ax2", "cx1", "bx4"])
+
+    def test_window_bounds_the_remembered_events(self):
+        window, shown = self.window(initial=0, window=2)
+        window.replace([])
+        for uid in "abc":
+            window.upsert(event(uid))
+        self.assertEqual(list(window._seen), ["b", "c"])
+        window.upsert(event("a"))
+        self.assertEqual(shown, ["ax1", "bx1", "cx1", "ax1"])
+
+    def test_other_namespaces_are_skipped(self):
+        window, shown = self.window(namespaces=["ns-1"])
+        window.replace([event("a"), event("b", namespace="ns-1")])
+        self.assertEqual(shown, ["bx1"])
+
+
+class EventsCliTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        events = [self.cluster._event(i, 40) for i in range(12)]
+        self.cluster.objects["events"] = events
+        for obj in events:
+            self.cluster.by_namespace.setdefault(("events", obj["metadata"]["namespace"]), []).append(obj)
+
+    def test_filters_are_applied_by_the_server(self):
+        code, out, _ = self.run_cli("all-events", "--type", "Warning", "--reason", "BackOff", "-o", "json")
+        self.assertEqual(code, 0)
+        self.assertEqual([row["reason"] for row in json.loads(out)], ["BackOff"] * 3)
+        self.assertEqual(len(self.calls("GET", "/events")), 1)
+
+    def test_namespaces_are_merged_oldest_first(self):
+        code, out, _ = self.run_cli("events", "-n", "ns-0,ns-1", "-o", "json")
+        rows = json.loads(out)
+        self.assertEqual(len(rows), 12)
+        self.assertEqual([row["last_seen"] for row in rows], sorted(row["last_seen"] for row in rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
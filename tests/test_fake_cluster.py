@@ -0,0 +1,142 @@
+"""The benchmarks' fake cluster and stub API server that the command tests and benchmarks run against."""
+import json
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+from support import Cluster, StubApiServer, kubermon
+
+import bench_commands
+from fake_cluster import _matches
+
+
+def pod(labels=None, **status):
+    return {"metadata": {"name": "p", "labels": labels or {}}, "status": status}
+
+
+class SelectorTest(unittest.TestCase):
+
+    def test_field_selectors(self):
+        running = pod(phase="Running")
+        self.assertTrue(_matches(running, "status.phase=Running", ""))
+        self.assertTrue(_matches(running, "status.phase==Running,metadata.name=p", ""))
+        self.assertFalse(_matches(running, "status.phase!=Running", ""))
+        self.assertTrue(_matches(running, "spec.nodeName=", ""))
+        self.assertFalse(_matches(running, "spec.nodeName!=", ""))
+
+    def test_label_selectors(self):
+        labelled = pod({"app": "web", "tier": "front"})
+        self.assertTrue(_matches(labelled, "", "app=web,tier"))
+        self.assertTrue(_matches(labelled, "", "app==web,tier!=back"))
+        self.assertFalse(_matches(labelled, "", "app!=web"))
+        self.assertFalse(_matches(labelled, "", "pool"))
+        self.assertFalse(_matches(pod(), "", "app=web"))
+
+
+class ClusterTest(unittest.TestCase):
+
+    def test_shape(self):
+        cluster = Cluster(namespaces=3, nodes=4, pods=100, events=10, log_lines=0)
+        self.assertEqual([len(cluster.objects[kind]) for kind in ("namespaces", "nodes", "deployments", "pods")],
+                         [3, 4, 20, 100])
+        reasons = [p["status"]["containerStatuses"][0]["state"].get("waiting", {}).get("reason")
+                   for p in cluster.objects["pods"]]
+        self.assertEqual([i for i, reason in enumerate(reasons) if reason == "CrashLoopBackOff"], [7, 57])
+        self.assertEqual([i for i, reason in enumerate(reasons) if reason == "ContainerCreating"], [3])
+        self.assertEqual(sum(len(cluster.items("pods", ns)) for ns in cluster.namespaces), 100)
+
+    def test_log_tail_and_timestamps(self):
+        cluster = Cluster(namespaces=1, nodes=1, pods=1, events=0, log_lines=200)
+        lines = cluster.log("p", {"tailLines": "2", "timestamps": "true"}).splitlines()
+        self.assertEqual(lines, ["2024-01-01T00:00:00.000000198Z p handled request 198 in 4 ms",
+                                 "2024-01-01T00:00:00.000000199Z ERROR p connection refused to db-3:5432"])
+        self.assertEqual(Cluster(namespaces=1, nodes=1, pods=1, events=0, log_lines=0).log("p", {}), "")
+
+
+class StubApiServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cluster = Cluster(namespaces=2, nodes=2, pods=40, events=0, log_lines=3)
+        self.server = StubApiServer(self.cluster).start()
+        self.addCleanup(self.server.stop)
+
+    def request(self, path, method="GET"):
+        request = urllib.request.Request(self.server.url + path, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, response.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode()
+
+    def get(self, path):
+        status, body = self.request(path)
+        self.assertEqual(status, 200, body)
+        return json.loads(body)
+
+    def test_list_pages_until_continue_is_empty(self):
+        names, token, pages = [], "", 0
+        while True:
+            page = self.get(f"/api/v1/namespaces/ns-0/pods?limit=7&continue={token}")
+            names += [item["metadata"]["name"] for item in page["items"]]
+            pages += 1
+            token = page["metadata"].get("continue")
+            if not token:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(names, [item["metadata"]["name"] for item in self.cluster.items("pods", "ns-0")])
+
+    def test_selectors_and_routes(self):
+        pods = self.get("/api/v1/pods?labelSelector=app%3Dapp-1&fieldSelector=status.phase%3DRunning")["items"]
+        self.assertEqual(len(pods), 5)
+        deployments = self.get("/apis/apps/v1/namespaces/ns-1/deployments")["items"]
+        self.assertEqual([d["metadata"]["name"] for d in deployments], ["app-1", "app-3", "app-5", "app-7"])
+        self.assertEqual(self.get("/api/v1/namespaces/ns-1")["metadata"]["name"], "ns-1")
+        name = pods[0]["metadata"]["name"]
+        status, body = self.request(f"/api/v1/namespaces/ns-1/pods/{name}/log?tailLines=1")
+        self.assertEqual((status, body), (200, f"{name} handled request 2 in 2 ms\n"))
+        self.assertEqual(self.request("/api/v1/namespaces/ns-0/pods/missing")[0], 404)
+
+    def test_mutations_leave_the_cluster_unchanged(self):
+        name = self.cluster.objects["pods"][0]["metadata"]["name"]
+        self.assertEqual(self.request(f"/api/v1/namespaces/ns-0/pods/{name}", "DELETE")[0], 200)
+        self.assertEqual(len(self.get("/api/v1/namespaces/ns-0/pods")["items"]), 20)
+        self.assertEqual(self.server.calls[0], ("DELETE", f"/api/v1/namespaces/ns-0/pods/{name}"))
+
+    def test_injected_faults(self):
+        self.server.fail("GET", "/api/v1/nodes", 503, times=2)
+        self.server.fail("GET", "/api/v1/namespaces", 403)
+        self.assertEqual([self.request("/api/v1/nodes")[0] for _ in range(3)], [503, 503, 200])
+        self.assertEqual([self.request("/api/v1/namespaces/ns-0/pods")[0] for _ in range(2)], [403, 403])
+        self.assertEqual(self.request("/api/v1/namespaces/ns-0/pods", "DELETE")[0], 404)
+
+    def test_watch_is_held_until_the_server_stops(self):
+        done = threading.Event()
+
+        def watch():
+            self.request("/api/v1/pods?watch=true&timeoutSeconds=30")
+            done.set()
+        threading.Thread(target=watch, daemon=True).start()
+        time.sleep(0.2)
+        self.assertFalse(done.is_set())
+        self.server.stopping.set()
+        self.assertTrue(done.wait(5))
+
+    def test_counts_and_reset(self):
+        self.get("/api/v1/nodes")
+        self.assertEqual(self.server.requests, 1)
+        self.assertGreater(self.server.bytes_sent, 0)
+        self.server.reset()
+        self.assertEqual((self.server.requests, self.server.bytes_sent, self.server.calls), (0, 0, []))
+
+
+class BenchmarkScenariosTest(unittest.TestCase):
+
+    def test_every_command_has_a_scenario(self):
+        cluster = Cluster(namespaces=2, nodes=2, pods=100, events=0, log_lines=0)
+        self.assertEqual(set(bench_commands.scenarios(cluster)), set(kubermon.show_commands()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""FuzzyIndex: case-insensitive subsequence matching in choice order, lazily produced."""
+import unittest
+
+from support import kubermon
+
+CHOICES = ["payments-api-3f9c", "payments-worker-77aa", "checkout-web-1b2c", "Auth-Proxy-9", "cache.redis-0",
+           "api-gateway-5d"]
+
+
+def is_subsequence(query, text):
+    chars = iter(text.lower())
+    return all(c in chars for c in query.lower())
+
+
+class FuzzyIndexTest(unittest.TestCase):
+
+    def search(self, index, query):
+        matches = index.search(query)
+        matches.fill(len(index.choices) + 1)
+        self.assertTrue(matches.done)
+        return [index.choices[i] for i in matches.items]
+
+    def test_characters_match_in_order(self):
+        index = kubermon.FuzzyIndex(CHOICES)
+        self.assertEqual(self.search(index, "pay3f"), ["payments-api-3f9c"])
+        self.assertEqual(self.search(index, "api"), ["payments-api-3f9c", "api-gateway-5d"])
+        self.assertEqual(self.search(index, "fp3"), [])
+
+    def test_matches_keep_choice_order_and_appear_once(self):
+        # "a" occurs several times in most choices; each choice is still listed once, in its place.
+        index = kubermon.FuzzyIndex(CHOICES)
+        self.assertEqual(self.search(index, "a"), [c for c in CHOICES if "a" in c.lower()])
+
+    def test_case_insensitive(self):
+        index = kubermon.FuzzyIndex(CHOICES)
+        self.assertEqual(self.search(index, "AUTHp"), ["Auth-Proxy-9"])
+        self.assertEqual(self.search(index, "authP"), ["Auth-Proxy-9"])
+
+    def test_regex_characters_are_literal(self):
+        index = kubermon.FuzzyIndex(CHOICES)
+        self.assertEqual(self.search(index, "e.r"), ["cache.redis-0"])
+        self.assertEqual(self.search(index, "[*"), [])
+
+    def test_match_does_not_span_choices(self):
+        # "5dpay" would match across the boundary of "...-5d" and a following "payments-...".
+        index = kubermon.FuzzyIndex(["api-gateway-5d", "payments-api"])
+        self.assertEqual(self.search(index, "5dpay"), [])
+
+    def test_empty_query_lists_everything(self):
+        index = kubermon.FuzzyIndex(CHOICES)
+        self.assertEqual(self.search(index, ""), CHOICES)
+
+    def test_fill_is_lazy(self):
+        index = kubermon.FuzzyIndex([f"pod-{i}" for i in range(1000)])
+        matches = index.search("pod")
+        matches.fill(40)
+        self.assertEqual(matches.items, list(range(40)))
+        self.assertFalse(matches.done)
+        while not matches.done:
+            matches.step()
+        self.assertEqual(len(matches.items), 1000)
+
+    def test_typing_narrows_to_the_same_results_as_a_fresh_search(self):
+        choices = [f"{a}-{b}-{i:03x}" for i, (a, b) in enumerate(
+            (a, b) for a in ("api", "web", "db", "queue") for b in ("payments", "auth", "cache", "search")
+            for _ in range(20))]
+        index = kubermon.FuzzyIndex(choices)
+        for query in ("qu", "qua", "quau", "quaut", "quauth1", "we", "d", "dbc"):
+            self.assertEqual(self.search(index, query), [c for c in choices if is_subsequence(query, c)], query)
+
+
+if __name__ == "__main__":
+    unittest.main()
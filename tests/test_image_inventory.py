@@ -0,0 +1,111 @@
+"""ImageInventory: image references, workloads and the grouped views."""
+import json
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+SHA_A, SHA_B = "sha256:" + "a" * 64, "sha256:" + "b" * 64
+
+
+def pod(name, images, image_ids=None, namespace="web", owner=("ReplicaSet", "front-5d9f"), template_hash="5d9f"):
+    containers = [{"name": f"c{i}", "image": image} for i, image in enumerate(images)]
+    statuses = [{"name": f"c{i}", "imageID": image_id} for i, image_id in enumerate(image_ids or []) if image_id]
+    metadata = {"name": name, "namespace": namespace, "labels": {"pod-template-hash": template_hash},
+                "ownerReferences": [{"kind": owner[0], "name": owner[1]}] if owner else []}
+    return {"metadata": metadata, "spec": {"containers": containers}, "status": {"containerStatuses": statuses}}
+
+
+class ImageReferenceTest(unittest.TestCase):
+
+    def test_parse_image(self):
+        cases = {"nginx": ("nginx", "latest", ""),
+                 "registry:5000/team/app:1.2": ("registry:5000/team/app", "1.2", ""),
+                 "registry:5000/team/app": ("registry:5000/team/app", "latest", ""),
+                 f"app@{SHA_A}": ("app", "", SHA_A),
+                 f"app:1.0@{SHA_A}": ("app", "1.0", SHA_A)}
+        for image, expected in cases.items():
+            self.assertEqual(kubermon.parse_image(image), expected, image)
+
+    def test_running_digest(self):
+        self.assertEqual(kubermon.running_digest(f"docker-pullable://nginx@{SHA_A}"), SHA_A)
+        self.assertEqual(kubermon.running_digest(SHA_B), SHA_B)
+        self.assertEqual(kubermon.running_digest("docker://1234"), "")
+
+    def test_workload_owner(self):
+        self.assertEqual(kubermon.workload_owner(pod("p", [])["metadata"]), "Deployment/front")
+        self.assertEqual(kubermon.workload_owner(pod("p", [], template_hash="other")["metadata"]),
+                         "ReplicaSet/front-5d9f")
+        self.assertEqual(kubermon.workload_owner(pod("db-0", [], owner=("StatefulSet", "db"))["metadata"]),
+                         "StatefulSet/db")
+        self.assertEqual(kubermon.workload_owner(pod("debug", [], owner=None)["metadata"]), "Pod/debug")
+
+    def test_image_matches(self):
+        self.assertTrue(kubermon.image_matches("docker.io/library/nginx", "nginx"))
+        self.assertFalse(kubermon.image_matches("docker.io/library/nginx-proxy", "nginx"))
+        self.assertTrue(kubermon.image_matches("quay.io/team/redis", "*/redis"))
+        self.assertFalse(kubermon.image_matches("redis", "*/redis"))
+
+
+class ImageInventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.inventory = kubermon.ImageInventory()
+        for p in [pod("front-1", ["app:1", "sidecar:2"], [f"app@{SHA_A}", f"sidecar@{SHA_B}"]),
+                  # The same tag running another digest after a re-push.
+                  pod("front-2", ["app:1", "sidecar:2"], [f"app@{SHA_B}", f"sidecar@{SHA_B}"]),
+                  # Two containers of one image; the second has no status yet and shares the first's digest.
+                  pod("worker-0", ["app:2", "app:2"], [f"app@{SHA_A}"], namespace="jobs",
+                      owner=("StatefulSet", "worker"))]:
+            self.inventory.add(p)
+
+    def rows(self, view, **options):
+        return self.inventory.rows(view, **options)
+
+    def test_image_view(self):
+        self.assertEqual(self.rows("image"), [
+            {"image": "app:1", "digests": 2, "pods": 2, "containers": 2, "namespaces": 1, "workloads": 1},
+            {"image": "sidecar:2", "digests": 1, "pods": 2, "containers": 2, "namespaces": 1, "workloads": 1},
+            {"image": "app:2", "digests": 1, "pods": 1, "containers": 2, "namespaces": 1, "workloads": 1}])
+
+    def test_digest_view(self):
+        self.assertEqual([(row["repository"], row["digest"], row["tags"], row["pods"]) for row in self.rows("digest")],
+                         [("app", SHA_A[:19], 2, 2), ("sidecar", SHA_B[:19], 1, 2), ("app", SHA_B[:19], 1, 1)])
+
+    def test_pods_count_once_per_namespace_and_workload(self):
+        self.assertEqual(self.rows("namespace"),
+                         [{"namespace": "web", "images": 2, "pods": 2, "containers": 4, "workloads": 1},
+                          {"namespace": "jobs", "images": 1, "pods": 1, "containers": 2, "workloads": 1}])
+        self.assertEqual([(row["workload"], row["pods"]) for row in self.rows("workload")],
+                         [("Deployment/front", 2), ("StatefulSet/worker", 1)])
+
+    def test_version_view_and_image_filter(self):
+        rows = self.rows("version", image="app")
+        self.assertEqual([(row["tag"], row["digest"], row["namespace"], row["pods"]) for row in rows],
+                         [("1", SHA_A[:19], "web", 1), ("1", SHA_B[:19], "web", 1), ("2", SHA_A[:19], "jobs", 1)])
+
+    def test_update_merges_inventories(self):
+        merged = kubermon.ImageInventory()
+        merged.update(self.inventory)
+        merged.update(self.inventory)
+        self.assertEqual(merged.pod_count, 6)
+        self.assertEqual(merged.rows("image")[0]["pods"], 4)
+
+
+class ImageInventoryClusterTest(ClusterTestCase):
+
+    def test_collect_per_namespace_equals_cluster_wide(self):
+        with kubermon.context_scope("test"):
+            wide = kubermon.ImageInventory.collect()
+            per_namespace = kubermon.ImageInventory.collect(["ns-0", "ns-1"])
+        self.assertEqual(wide.pod_count, 40)
+        self.assertEqual(wide.rows("version"), per_namespace.rows("version"))
+
+    def test_cli(self):
+        code, out, _ = self.run_cli("image-inventory", "-A", "--image", "proxy", "-o", "json")
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out), [{"image": "registry.example.com/proxy:2.0", "digests": 1, "pods": 40,
+                                            "containers": 40, "namespaces": 2, "workloads": 8}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+"""Informer: paged LIST, WATCH resume, bookmarks, 410 relists and fatal errors; pod_store() start-up."""
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+
+def pod(name, version):
+    return {"metadata": {"name": name, "namespace": "ns", "resourceVersion": version},
+            "spec": {"nodeName": "node-0"}, "status": {"phase": "Running"}}
+
+
+def event(kind, obj):
+    return json.dumps({"type": kind, "object": obj})
+
+
+class ScriptedWatch:
+    """A watch stream yielding ``lines``; the last one scripted then stays open until closed."""
+
+    def __init__(self, lines, hold):
+        self.lines = lines
+        self.hold = hold
+        self.closed = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        for line in self.lines:
+            yield line + "\n"
+        if self.hold:
+            self.closed.wait()
+
+    def close(self):
+        self.closed.set()
+
+
+class ScriptedBackend:
+    """Answers LISTs from ``lists`` and watches from ``watches`` in turn, recording each request's params."""
+
+    def __init__(self, lists, watches):
+        self.lists = list(lists)
+        self.watches = list(watches)
+        self.requests = []
+
+    def request(self, method, path, params=None, stream=False, timeout=None):
+        self.requests.append(dict(params or {}))
+        if stream:
+            lines = self.watches.pop(0) if self.watches else []
+            return ScriptedWatch(lines, hold=not self.watches)
+        items, version = self.lists.pop(0)
+        return {"metadata": {"resourceVersion": version}, "items": items}
+
+
+class InformerTest(unittest.TestCase):
+
+    def run_informer(self, backend, requests):
+        """Run a pod informer against ``backend`` until it has made ``requests`` requests; returns it stopped."""
+        informer = kubermon.Informer("pods", kubermon.PodStore(), context="scripted")
+        with mock.patch.dict(kubermon._backends, {"scripted": backend}):
+            informer.start()
+            deadline = time.monotonic() + 5
+            while len(backend.requests) < requests and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            informer.stop()
+            informer._thread.join(5)
+        self.assertEqual(len(backend.requests), requests)
+        return informer
+
+    def names(self, informer):
+        return sorted(record.name for record in informer.store.records())
+
+    def test_watch_events_update_the_store(self):
+        backend = ScriptedBackend([([pod("a", "5"), pod("b", "5")], "5")],
+                                  [[event("ADDED", pod("c", "6")), event("DELETED", pod("a", "7")),
+                                    event("MODIFIED", dict(pod("b", "8"), status={"phase": "Failed"}))]])
+        informer = self.run_informer(backend, 2)
+        self.assertEqual(self.names(informer), ["b", "c"])
+        self.assertEqual(informer.store.phase_counts(), {("ns", "Running"): 1, ("ns", "Failed"): 1})
+        self.assertEqual(informer.resource_version, "8")
+        self.assertEqual(backend.requests[1]["resourceVersion"], "5")
+
+    def test_bookmark_advances_the_resume_point(self):
+        bookmark = {"kind": "Pod", "metadata": {"resourceVersion": "40"}}
+        backend = ScriptedBackend([([pod("a", "5")], "5")], [[event("BOOKMARK", bookmark)], []])
+        informer = self.run_informer(backend, 3)
+        self.assertEqual(self.names(informer), ["a"])
+        self.assertEqual(backend.requests[1]["allowWatchBookmarks"], "true")
+        self.assertEqual(backend.requests[2]["resourceVersion"], "40")
+
+    def test_gone_relists(self):
+        gone = {"kind": "Status", "code": 410, "message": "too old resource version"}
+        backend = ScriptedBackend([([pod("a", "5"), pod("b", "5")], "5"), ([pod("a", "9"), pod("c", "9")], "9")],
+                                  [[event("ERROR", gone)], []])
+        informer = self.run_informer(backend, 4)
+        self.assertNotIn("watch", backend.requests[2])
+        self.assertEqual(self.names(informer), ["a", "c"])
+        self.assertEqual(backend.requests[3]["resourceVersion"], "9")
+
+    def test_truncated_event_backs_off_before_resuming(self):
+        backend = ScriptedBackend([([pod("a", "5")], "5")], [['{"type": "ADDED", "obj'], []])
+        start = time.monotonic()
+        informer = self.run_informer(backend, 3)
+        self.assertGreaterEqual(time.monotonic() - start, 1)
+        self.assertEqual(backend.requests[2]["resourceVersion"], "5")
+        self.assertIsNone(informer.error)
+
+
+class InformerClusterTest(ClusterTestCase):
+
+    def pod_gets(self, settle):
+        """Return the pod GETs the server has seen once ``settle`` of them arrived (or after 5 s)."""
+        deadline = time.monotonic() + 5
+        while len(self.calls("GET", "/pods")) < settle and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        return self.calls("GET", "/pods")
+
+    def start(self, informer):
+        """Start ``informer``; it is stopped before the stub server and the patched backend go away."""
+        informer.start()
+        self.addCleanup(informer._thread.join, 5)
+        self.addCleanup(self.server.stopping.set)  # ends the watch the stub is holding open
+        self.addCleanup(informer.stop)
+        return informer
+
+    def test_list_is_paged(self):
+        with mock.patch.object(kubermon, "PAGE_SIZE", 15):
+            informer = self.start(kubermon.Informer("pods", kubermon.PodStore(), context="test"))
+            self.assertTrue(informer.wait_synced(5))
+        self.assertEqual(len(informer.store), 40)
+        self.assertEqual(len(self.pod_gets(4)), 4)  # 3 pages, then the watch
+
+    def test_forbidden_list_stops_for_good(self):
+        self.server.fail("GET", "/api/v1/pods", 403)
+        informer = self.start(kubermon.Informer("pods", kubermon.PodStore(), context="test"))
+        self.assertFalse(informer.wait_synced(5))
+        self.assertEqual(informer.error.status, 403)
+        informer._thread.join(5)
+        self.assertEqual(len(self.calls("GET", "/pods")), 1)
+
+    def test_pod_store_starts_one_informer_per_context(self):
+        with mock.patch.object(kubermon, "KUBE_WATCH", True), mock.patch.object(kubermon, "_snapshot", None), \
+                mock.patch.dict(kubermon._pod_informers, clear=True):
+            stores = []
+            threads = [threading.Thread(target=lambda: stores.append(kubermon.pod_store("test"))) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+            self.assertEqual(len(set(map(id, stores))), 1)
+            self.assertEqual(len(stores[0]), 40)
+            self.assertEqual(list(kubermon._pod_informers), ["test"])
+            self.assertEqual(len(self.pod_gets(2)), 2)  # one LIST, one watch
+            informer = kubermon._pod_informers["test"]
+            kubermon.stop_informers()
+            self.server.stopping.set()
+            informer._thread.join(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""LogAggregator: merging the logs of several pods in timestamp order."""
+import io
+import threading
+import time
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+
+class ScriptedLog:
+    """A pod log that yields each (seconds after start, line) on time; a followed one then stays open until closed."""
+
+    def __init__(self, start, script, follow):
+        self.start = start
+        self.script = script
+        self.follow = follow
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        for at, line in self.script:
+            if self.closed.wait(max(self.start + at - time.monotonic(), 0)):
+                return
+            yield line + "\n"
+        if self.follow:
+            self.closed.wait()
+
+    def close(self):
+        self.closed.set()
+
+
+def stamp(second, text):
+    return f"2024-01-01T00:00:{second:06.3f}Z {text}"
+
+
+class LogAggregatorTest(unittest.TestCase):
+
+    def aggregate(self, scripts, expected_lines, **options):
+        """Run an aggregator over one scripted log per pod until ``expected_lines`` are out; returns them."""
+        start = time.monotonic()
+        streams = {pod: ScriptedLog(start, script, options.get("follow", False)) for pod, script in scripts.items()}
+        pods = [{"metadata": {"name": pod}, "spec": {"containers": [{"name": "app"}]}} for pod in sorted(scripts)]
+        aggregator = kubermon.LogAggregator("ns", "app=x", rescan=60, **options)
+        out = io.StringIO()
+        with mock.patch.object(kubermon.LogAggregator, "_pods", return_value=pods), \
+                mock.patch.object(kubermon, "open_log_stream", lambda namespace, pod, *args, **kwargs: streams[pod]):
+            runner = threading.Thread(target=aggregator.run, args=(out,), daemon=True)
+            runner.start()
+            deadline = time.monotonic() + 10
+            while out.getvalue().count("\n") < expected_lines and time.monotonic() < deadline:
+                time.sleep(0.05)
+            aggregator.close()
+            runner.join(5)
+        return [line.split(" ", 1)[1] for line in out.getvalue().splitlines()]
+
+    def test_lines_are_merged_by_timestamp(self):
+        lines = self.aggregate({"a": [(0, stamp(1, "a1")), (0, stamp(4, "a4"))],
+                                "b": [(0, stamp(2, "b2")), (0, stamp(3, "b3"))]}, 4)
+        self.assertEqual(lines, ["a1", "b2", "b3", "a4"])
+
+    def test_each_slow_source_is_waited_for(self):
+        # q logs once and then stays quiet for good, so the merge stops waiting for it after merge_delay.
+        # c then logs at 1.5 s and goes silent; b's 00:05 line at 1.7 s must still wait for c's 00:04
+        # line at 2.1 s, because c's own merge_delay runs from 1.5 s, not from when q went quiet.
+        scripts = {"q": [(0, stamp(1, "q1"))],
+                   "b": [(0, stamp(2, "b2")), (1.7, stamp(5, "b5"))],
+                   "c": [(0, stamp(3, "c3")), (1.5, stamp(3.5, "c3.5")), (2.1, stamp(4, "c4"))]}
+        lines = self.aggregate(scripts, 6, follow=True, merge_delay=1.0)
+        self.assertEqual(lines, ["q1", "b2", "c3", "c3.5", "c4", "b5"])
+
+    def test_timestamp_key_pads_trimmed_fractions(self):
+        keys = [kubermon._log_timestamp_key(f"2024-01-01T00:00:01{fraction}Z text")[0]
+                for fraction in ("", ".25", ".5", ".500000001")]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(kubermon._log_timestamp_key("2024-01-01T00:00:01.5Z a b")[1:],
+                         ("2024-01-01T00:00:01.5Z", "a b"))
+
+
+class DeployLogsTest(ClusterTestCase):
+
+    def test_every_pod_of_the_deployment_is_merged(self):
+        self.cluster.log_lines = 5
+        code, out, _ = self.run_cli("deploy-logs", "app-0", "-n", "ns-0", "--tail", "2")
+        self.assertEqual(code, 0)
+        lines = out.splitlines()
+        self.assertEqual(len(lines), 10)
+        # Lines with equal timestamps come out pod by pod, older ones first.
+        pods = [f"app-0-000000-{i:05x}" for i in range(5)]
+        self.assertEqual(lines, [f"[pod/{pod}/app] {pod} handled request {n} in {n} ms"
+                                 for n in (3, 4) for pod in pods])
+
+
+if __name__ == "__main__":
+    unittest.main()
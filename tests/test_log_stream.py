@@ -0,0 +1,105 @@
+"""Streamed pod logs: the bounded LogRing and copy_log_stream."""
+import contextlib
+import io
+import threading
+import time
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+
+class ClosableLines:
+    """An iterable of lines that records whether it was closed, like a streamed response."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def close(self):
+        self.closed = True
+
+
+class LogRingTest(unittest.TestCase):
+
+    def test_full_ring_makes_the_reader_wait(self):
+        ring = kubermon.LogRing(capacity=2)
+        ring.put("a")
+        ring.put("b")
+        writer = threading.Thread(target=ring.put, args=("c",))
+        writer.start()
+        time.sleep(0.05)
+        self.assertTrue(writer.is_alive())
+        self.assertEqual(ring.get(), "a")
+        writer.join(1)
+        self.assertEqual([ring.get(), ring.get()], ["b", "c"])
+        self.assertEqual(ring.dropped, 0)
+
+    def test_drop_discards_the_oldest_lines(self):
+        ring = kubermon.LogRing(capacity=3, drop=True)
+        for line in "abcde":
+            ring.put(line)
+        ring.close()
+        self.assertEqual(list(ring), ["c", "d", "e"])
+        self.assertEqual(ring.dropped, 2)
+
+    def test_close_drains_then_ends(self):
+        ring = kubermon.LogRing(capacity=5)
+        ring.put("a")
+        ring.close()
+        self.assertFalse(ring.put("b"))
+        self.assertEqual((ring.get(), ring.get()), ("a", None))
+
+    def test_close_releases_a_waiting_reader(self):
+        ring = kubermon.LogRing(capacity=1)
+        ring.put("a")
+        results = []
+        writer = threading.Thread(target=lambda: results.append(ring.put("b")))
+        writer.start()
+        ring.close()
+        writer.join(1)
+        self.assertEqual(results, [False])
+
+    def test_get_times_out(self):
+        self.assertIsNone(kubermon.LogRing().get(timeout=0.01))
+
+
+class CopyLogStreamTest(unittest.TestCase):
+
+    def test_every_line_is_copied_through_a_small_ring(self):
+        stream = ClosableLines([f"line {n}\n" for n in range(5000)] + ["no newline"])
+        out = io.StringIO()
+        self.assertEqual(kubermon.copy_log_stream(stream, out, capacity=8), 5001)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[:2] + lines[-1:], ["line 0", "line 1", "no newline"])
+        self.assertTrue(out.getvalue().endswith("no newline\n"))
+        self.assertTrue(stream.closed)
+
+    def test_stream_error_ends_the_copy(self):
+        def lines():
+            yield "before\n"
+            raise OSError("connection reset")
+        out = io.StringIO()
+        stream = ClosableLines(lines())
+        self.assertEqual(kubermon.copy_log_stream(stream, out), 1)
+        self.assertEqual(out.getvalue(), "before\n")
+
+
+class PodLogTest(ClusterTestCase):
+
+    def test_pod_log_from_the_api(self):
+        self.cluster.log_lines = 300
+        name = self.pod(0)["metadata"]["name"]
+        out = io.StringIO()
+        with kubermon.context_scope("test"), contextlib.redirect_stdout(out):
+            count = kubermon.print_pod_logs("ns-0", name, "app", tail=120, buffer_lines=16)
+        self.assertEqual(count, 120)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], f"{name} handled request 180 in 83 ms")
+        self.assertEqual(lines[19], f"ERROR {name} connection refused to db-3:5432")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Per-call metrics: latency histograms, action attribution, and JSON and Prometheus export."""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+
+def enabled_metrics():
+    metrics = kubermon.Metrics()
+    metrics.enabled = True
+    return metrics
+
+
+class RequestOperationTest(unittest.TestCase):
+
+    def test_labels(self):
+        cases = [("GET", "/api/v1/namespaces/ns/pods", None, "GET pods"),
+                 ("GET", "/api/v1/namespaces/ns/pods/web-1/log", None, "GET pods/log"),
+                 ("GET", "/apis/apps/v1/deployments", {"watch": "true"}, "WATCH deployments"),
+                 ("PATCH", "/apis/apps/v1/namespaces/ns/deployments/web", None, "PATCH deployments"),
+                 ("POST", "/api/v1/namespaces/ns/pods/web-1/eviction", None, "POST pods/eviction"),
+                 ("GET", "/api/v1/nodes?limit=500", None, "GET nodes")]
+        for method, path, params, label in cases:
+            self.assertEqual(kubermon.request_operation(method, path, params), label)
+
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = enabled_metrics()
+        # Earlier subcommand tests leave their --context resolved.
+        patcher = mock.patch.object(kubermon, "_current_context", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_nothing_is_recorded_when_disabled(self):
+        metrics = kubermon.Metrics()
+        metrics.observe_request("api", "GET pods", 0.1, 10)
+        metrics.cache_lookup("pod_store", "hit")
+        metrics.start_action("get-nodes")
+        metrics.end_action()
+        self.assertEqual((metrics.requests, metrics.actions, metrics.cache), ({}, {}, {}))
+
+    def test_requests_are_recorded_per_context_and_action(self):
+        self.metrics.start_action("list-pods")
+        with kubermon.context_scope("prod"):
+            self.metrics.observe_request("api", "GET pods", 0.003, 100)
+            self.metrics.observe_request("api", "GET pods", 0.2, error=True)
+            self.metrics.add_bytes("api", "GET pods", 50)
+        self.metrics.end_action()
+        [request] = self.metrics.as_dict()["requests"]
+        self.assertEqual({key: request[key] for key in ("context", "backend", "operation", "count", "errors", "bytes")},
+                         {"context": "prod", "backend": "api", "operation": "GET pods", "count": 2, "errors": 1,
+                          "bytes": 150})
+        self.assertEqual(request["max"], 0.2)
+        # 3 ms falls in the first bucket, 200 ms in the one up to 250 ms.
+        self.assertEqual([i for i, count in enumerate(request["buckets"]) if count], [0, 5])
+        [action] = self.metrics.as_dict()["actions"]
+        self.assertEqual((action["action"], action["count"], action["requests"]), ("list-pods", 1, {"GET pods": 2}))
+
+    def test_cache_hit_rates(self):
+        for result in ("hit", "hit", "hit", "miss"):
+            self.metrics.cache_lookup("pod_store", result)
+        self.metrics.cache_lookup("resources", "snapshot")
+        self.assertEqual(self.metrics.as_dict()["cache"],
+                         {"pod_store": {"hit": 3, "miss": 1, "hit_rate": 0.75},
+                          "resources": {"snapshot": 1, "hit_rate": 0.0}})
+
+    def test_prometheus_text(self):
+        self.metrics.start_action("get-nodes")
+        self.metrics.observe_request("kubectl", 'kubectl get "nodes', 0.03, 7)
+        self.metrics.cache_lookup("prefetch", "miss")
+        self.metrics.end_action()
+        text = self.metrics.prometheus()
+        labels = 'context="",backend="kubectl",operation="kubectl get \\"nodes"'
+        self.assertIn(f'kubermon_request_duration_seconds_bucket{{{labels},le="0.025"}} 0', text)
+        self.assertIn(f'kubermon_request_duration_seconds_bucket{{{labels},le="0.05"}} 1', text)
+        self.assertIn(f'kubermon_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', text)
+        self.assertIn(f"kubermon_request_duration_seconds_count{{{labels}}} 1", text)
+        self.assertIn(f"kubermon_response_bytes_total{{{labels}}} 7", text)
+        self.assertIn('kubermon_action_duration_seconds_count{action="get-nodes"} 1', text)
+        self.assertIn('kubermon_action_requests_total{action="get-nodes",operation="kubectl get \\"nodes"} 1', text)
+        self.assertIn('kubermon_cache_lookups_total{cache="prefetch",result="miss"} 1', text)
+        self.assertNotIn("hit_rate", text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_export_by_extension(self):
+        self.metrics.observe_request("api", "GET nodes", 0.01, 5)
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "out", "metrics.json")
+            prom_path = os.path.join(directory, "metrics.prom")
+            self.metrics.export(json_path)
+            self.metrics.export(prom_path)
+            with open(json_path) as f:
+                self.assertEqual(json.load(f)["requests"][0]["operation"], "GET nodes")
+            with open(prom_path) as f:
+                self.assertTrue(f.read().startswith("# HELP kubermon_request_duration_seconds "))
+            self.assertEqual(sorted(os.listdir(directory)), ["metrics.prom", "out"])
+
+
+class InstrumentedBackendTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.metrics = enabled_metrics()
+        patcher = mock.patch.object(kubermon, "metrics", self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_subcommand_requests_are_recorded(self):
+        self.server.fail("GET", "/api/v1/nodes", 403)
+        code, _, _ = self.run_cli("list-namespaces")
+        self.assertEqual(code, 0)
+        with self.assertRaises(kubermon.KubeApiError):
+            kubermon.get_backend("test").request("GET", kubermon.resource_path("nodes"))
+        self.metrics.end_action()
+        requests = {entry["operation"]: entry for entry in self.metrics.as_dict()["requests"]}
+        self.assertEqual((requests["GET namespaces"]["context"], requests["GET namespaces"]["backend"]),
+                         ("test", "api"))
+        self.assertGreater(requests["GET namespaces"]["bytes"], 0)
+        self.assertEqual((requests["GET nodes"]["count"], requests["GET nodes"]["errors"]), (1, 1))
+        [action] = self.metrics.as_dict()["actions"]
+        self.assertEqual(action["action"], "list-namespaces")
+
+    def test_stream_bytes_are_added_when_it_closes(self):
+        self.cluster.log_lines = 4
+        name = self.pod(0)["metadata"]["name"]
+        with kubermon.context_scope("test"):
+            with kubermon.open_log_stream("ns-0", name, "app") as stream:
+                lines = list(stream)
+        [entry] = self.metrics.as_dict()["requests"]
+        self.assertEqual((entry["operation"], entry["bytes"]), ("GET pods/log", sum(len(line) for line in lines)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Commands run against several contexts at once with --contexts/--all-contexts."""
+import contextlib
+import io
+import json
+import threading
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+CONTEXTS = ["prod-a", "prod-b", "dev"]
+
+
+class RunPerContextTest(unittest.TestCase):
+
+    def test_each_call_runs_in_its_own_context(self):
+        results = kubermon.run_per_context(kubermon.current_context, CONTEXTS, timeout=5)
+        self.assertEqual(results, {context: (context, None) for context in CONTEXTS})
+
+    def test_errors_are_reported_per_context(self):
+        def fn():
+            context = kubermon.current_context()
+            if context == "prod-a":
+                raise kubermon.KubeApiError(403, "forbidden")
+            if context == "prod-b":
+                return 0 + None
+            return "rows"
+        results = kubermon.run_per_context(fn, CONTEXTS, timeout=5)
+        self.assertEqual(results["prod-a"], (None, "403 forbidden"))
+        self.assertIsNone(results["prod-b"][0])
+        self.assertTrue(results["prod-b"][1].startswith("TypeError: "))
+        self.assertEqual(results["dev"], ("rows", None))
+
+    def test_slow_context_times_out(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def fn():
+            if kubermon.current_context() == "dev":
+                release.wait()
+            return "rows"
+        results = kubermon.run_per_context(fn, CONTEXTS, timeout=0.2)
+        self.assertEqual(results["prod-a"], ("rows", None))
+        self.assertEqual(results["dev"], (None, "timed out after 0.2s"))
+
+
+class MultiContextCliTest(ClusterTestCase):
+    # Every context reaches the same stub server through KUBERMON_API_SERVER.
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(kubermon, "list_contexts", return_value=CONTEXTS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_match_contexts(self):
+        self.assertEqual(kubermon.match_contexts("prod-*"), ["prod-a", "prod-b"])
+        self.assertEqual(kubermon.match_contexts("dev, prod-b,dev"), ["dev", "prod-b"])
+        # Plain names are taken as they are, so a missing context is reported when queried.
+        self.assertEqual(kubermon.match_contexts("staging"), ["staging"])
+
+    def test_rows_gain_a_cluster_column(self):
+        code, out, _ = self.run_cli("get-nodes", "--contexts", "prod-*", "-o", "json")
+        self.assertEqual(code, 0)
+        rows = json.loads(out)
+        self.assertEqual(sorted((row["cluster"], row["name"]) for row in rows),
+                         [("prod-a", "node-0"), ("prod-a", "node-1"), ("prod-b", "node-0"), ("prod-b", "node-1")])
+
+    def test_failed_context_is_reported_and_the_rest_printed(self):
+        def nodes(args):
+            if kubermon.current_context() == "dev":
+                raise kubermon.KubeApiError(401, "Unauthorized")
+            return [{"name": "node-0"}], ["name"]
+        with mock.patch.object(kubermon, "_cli_get_nodes", nodes):
+            code, out, err = self.run_cli("get-nodes", "--all-contexts", "-o", "json")
+        self.assertEqual(code, 1)
+        self.assertEqual([row["cluster"] for row in json.loads(out)], ["prod-a", "prod-b"])
+        self.assertIn("dev: ", err)
+        self.assertIn("Unauthorized", err)
+
+    def test_watch_is_rejected(self):
+        for flag in (["--contexts", "prod-*"], ["--all-contexts"]):
+            with self.assertRaises(SystemExit) as raised, contextlib.redirect_stderr(io.StringIO()) as err:
+                kubermon.main(["events", "--watch", *flag])
+            self.assertEqual(raised.exception.code, 2)
+            self.assertIn("--watch cannot be combined", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
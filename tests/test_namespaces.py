@@ -0,0 +1,96 @@
+"""Several namespaces per query: namespace patterns, bounded fan-out and cluster-wide -A requests."""
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+
+class FanOutTest(unittest.TestCase):
+
+    def test_results_keep_item_order(self):
+        def slow_square(n):
+            time.sleep(0.01 * (5 - n))
+            return n * n
+        self.assertEqual(kubermon.fan_out(slow_square, range(5)), [0, 1, 4, 9, 16])
+
+    def test_calls_in_flight_are_bounded(self):
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def call(_):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+        kubermon.fan_out(call, range(20), max_workers=3)
+        self.assertEqual(peak[0], 3)
+
+    def test_workers_inherit_the_context_scope(self):
+        with kubermon.context_scope("prod"):
+            self.assertEqual(kubermon.fan_out(lambda _: kubermon.current_context(), range(3)), ["prod"] * 3)
+
+    def test_all_namespaces_is_one_call(self):
+        calls = []
+        rows = kubermon.fan_out_rows(lambda ns: calls.append(ns) or [{"namespace": "b", "name": "x"},
+                                                                     {"namespace": "a", "name": "y"}], None)
+        self.assertEqual(calls, [None])
+        self.assertEqual([row["namespace"] for row in rows], ["a", "b"])
+
+    def test_namespace_column(self):
+        self.assertEqual(kubermon.namespace_columns(["a"], ["name"]), ["name"])
+        self.assertEqual(kubermon.namespace_columns(["a", "b"], ["name"]), ["namespace", "name"])
+        self.assertEqual(kubermon.namespace_columns(None, ["name"]), ["namespace", "name"])
+
+
+class NamespacePatternTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        extra = ("team-a", "team-b", "kube-system")
+        self.cluster.objects["namespaces"] += [{"metadata": {"name": name}} for name in extra]
+        scope = kubermon.context_scope("test")
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+        patcher = mock.patch.object(kubermon, "resource_cache", kubermon.ResourceCache(ttl=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_patterns(self):
+        self.assertEqual(kubermon.match_namespaces("team-*"), ["team-a", "team-b"])
+        self.assertEqual(kubermon.match_namespaces(r"re:^(ns|kube)-"), ["kube-system", "ns-0", "ns-1"])
+        self.assertEqual(kubermon.match_namespaces("ns-1, team-?,ns-1,"), ["ns-1", "team-a", "team-b"])
+
+    def test_plain_names_need_no_namespace_list(self):
+        self.assertEqual(kubermon.match_namespaces("gone,ns-0"), ["gone", "ns-0"])
+        self.assertEqual(self.calls("GET"), [])
+
+
+class MultiNamespaceCliTest(ClusterTestCase):
+
+    def deployments(self, *argv):
+        code, out, _ = self.run_cli("list-deployments", "-o", "json", *argv)
+        self.assertEqual(code, 0)
+        return sorted((row.get("namespace"), row["name"]) for row in json.loads(out))
+
+    def test_namespace_list_is_merged(self):
+        expected = [(f"ns-{d % 2}", f"app-{d}") for d in range(8)]
+        self.assertEqual(self.deployments("-n", "ns-0,ns-1"), sorted(expected))
+        self.assertEqual(len(self.calls("GET", "/deployments")), 2)
+
+    def test_all_namespaces_is_one_cluster_wide_request(self):
+        self.assertEqual(len(self.deployments("-A")), 8)
+        self.assertEqual(self.calls("GET", "/deployments"), ["/apis/apps/v1/deployments"])
+
+    def test_namespace_column_only_for_several_namespaces(self):
+        for argv, header in ((("-n", "ns-1"), "NAME"), (("-n", "ns-*"), "NAMESPACE"), (("-A",), "NAMESPACE")):
+            code, out, _ = self.run_cli("list-deployments", *argv)
+            self.assertEqual(out.split()[0], header, argv)
+
+
+if __name__ == "__main__":
+    unittest.main()
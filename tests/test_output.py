@@ -0,0 +1,73 @@
+"""Subcommand output: table, TSV, JSON and NDJSON, all at once or page by page."""
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from support import ROOT, ClusterTestCase, kubermon
+
+ROWS = [{"name": "web-1", "restarts": 0, "node": None}, {"name": "payments-api-3f9c", "restarts": 12, "node": "n1"}]
+COLUMNS = ["name", "restarts", "node"]
+
+
+def written(function, rows, output):
+    stream = io.StringIO()
+    function(rows, COLUMNS, output=output, stream=stream)
+    return stream.getvalue()
+
+
+class WriteRowsTest(unittest.TestCase):
+
+    def test_table(self):
+        self.assertEqual(written(kubermon.write_rows, ROWS, "table").splitlines(),
+                         ["NAME                RESTARTS   NODE",
+                          "web-1               0",
+                          "payments-api-3f9c   12         n1"])
+        self.assertEqual(written(kubermon.write_rows, [], "table"), "No resources found\n")
+
+    def test_tsv(self):
+        self.assertEqual(written(kubermon.write_rows, ROWS, "tsv"),
+                         "name\trestarts\tnode\nweb-1\t0\t\npayments-api-3f9c\t12\tn1\n")
+
+    def test_json_and_ndjson(self):
+        self.assertEqual(json.loads(written(kubermon.write_rows, ROWS, "json")), ROWS)
+        self.assertEqual([json.loads(line) for line in written(kubermon.write_rows, ROWS, "ndjson").splitlines()],
+                         ROWS)
+
+
+class StreamRowsTest(unittest.TestCase):
+    PAGES = [ROWS[:1], [], ROWS[1:]]
+
+    def test_formats_match_write_rows(self):
+        for output in ("json", "ndjson", "tsv"):
+            self.assertEqual(written(kubermon.stream_rows, iter(self.PAGES), output),
+                             written(kubermon.write_rows, ROWS, output), output)
+        self.assertEqual(json.loads(written(kubermon.stream_rows, iter([]), "json")), [])
+
+    def test_table_widens_for_later_pages(self):
+        self.assertEqual(written(kubermon.stream_rows, iter(self.PAGES), "table").splitlines(),
+                         ["NAME    RESTARTS   NODE",
+                          "web-1   0",
+                          "payments-api-3f9c   12         n1"])
+        self.assertEqual(written(kubermon.stream_rows, iter([[]]), "table"), "No resources found\n")
+
+    def test_returns_rows_written(self):
+        self.assertEqual(kubermon.stream_rows(iter(self.PAGES), COLUMNS, stream=io.StringIO()), 2)
+
+
+class ClosedPipeTest(ClusterTestCase):
+
+    def test_closed_reader_ends_quietly(self):
+        read_end, write_end = os.pipe()
+        os.close(read_end)
+        env = dict(os.environ, KUBERMON_API_SERVER=self.server.url, KUBECONFIG=os.devnull)
+        with os.fdopen(write_end, "wb") as stdout:
+            result = subprocess.run([sys.executable, os.path.join(ROOT, "kubermon.py"), "list-namespaces"],
+                                    env=env, stdout=stdout, stderr=subprocess.PIPE, text=True, timeout=30)
+        self.assertEqual((result.returncode, result.stderr), (0, ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
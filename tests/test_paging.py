@@ -0,0 +1,62 @@
+"""Paged LISTs (limit/continue) and listings streamed page by page."""
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from support import ROOT, ClusterTestCase, kubermon
+
+
+class ListPagesTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        scope = kubermon.context_scope("test")
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+    def test_pages_follow_the_continue_token(self):
+        pages = kubermon.list_pages("pods", "ns-0", limit=8)
+        self.assertEqual(len(next(pages)), 8)
+        # The next page is only requested when it is needed.
+        self.assertEqual(len(self.calls("GET", "/pods")), 1)
+        self.assertEqual([len(page) for page in pages], [8, 4])
+        self.assertEqual(len(self.calls("GET", "/pods")), 3)
+
+    def test_selectors_apply_to_every_page(self):
+        self.pod(2)["status"]["phase"] = "Failed"
+        names = [pod["metadata"]["name"] for page in kubermon.list_pages(
+            "pods", limit=3, fieldSelector="status.phase!=Running") for pod in page]
+        self.assertEqual(names, [self.pod(2)["metadata"]["name"], self.pod(3)["metadata"]["name"]])
+
+    def test_iter_pods_pages_the_store(self):
+        store = kubermon.PodStore()
+        store.replace(self.cluster.objects["pods"])
+        with mock.patch.object(kubermon, "pod_store", return_value=store):
+            pages = list(kubermon.iter_pods("ns-1", limit=6))
+        self.assertEqual([len(page) for page in pages], [6, 6, 6, 2])
+        self.assertEqual(self.calls("GET"), [])
+
+
+class StreamedListingTest(ClusterTestCase):
+
+    def run_paged(self, *argv):
+        env = dict(os.environ, KUBERMON_API_SERVER=self.server.url, KUBECONFIG=os.devnull, KUBERMON_PAGE_SIZE="7")
+        return subprocess.run([sys.executable, os.path.join(ROOT, "kubermon.py"), *argv], env=env,
+                              capture_output=True, text=True, timeout=30, check=True).stdout
+
+    def test_table_is_printed_page_by_page(self):
+        lines = self.run_paged("list-containers", "-n", "ns-1").splitlines()
+        self.assertEqual(lines[0].split(), ["NAME", "INIT_CONTAINERS", "CONTAINERS"])
+        self.assertEqual(len(lines), 21)
+        self.assertEqual(len(self.calls("GET", "/pods")), 3)
+
+    def test_tsv_has_one_header(self):
+        lines = self.run_paged("list-pod-with-labels", "-n", "ns-0", "-o", "tsv").splitlines()
+        self.assertEqual([line for line in lines if line.startswith("name\t")], ["name\tstatus\tlabels"])
+        self.assertEqual(len(lines), 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""PodStore: records, secondary indexes and phase counts kept up to date by watch events."""
+import copy
+import itertools
+import unittest
+from unittest import mock
+
+from support import Cluster, ClusterTestCase, kubermon
+
+
+def keys(records):
+    return [record.key for record in records]
+
+
+class PodRecordTest(unittest.TestCase):
+
+    def test_from_pod(self):
+        cluster = Cluster(namespaces=2, nodes=2, pods=10, events=0, log_lines=0)
+        record = kubermon.PodRecord.from_pod(cluster.objects["pods"][7])
+        self.assertEqual((record.namespace, record.name, record.node), ("ns-1", "app-1-000001-00007", "node-1"))
+        self.assertEqual((record.phase, record.status), ("Running", "CrashLoopBackOff"))
+        self.assertEqual((record.ready, record.total, record.restarts), (1, 2, 12))
+        self.assertEqual(record.label_dict(), {"app": "app-1", "pod-template-hash": "000001"})
+        self.assertEqual(record.owner, ("ReplicaSet", "app-1-000001"))
+        self.assertEqual(record.init_containers, (("init", "registry.example.com/init:1.0"),))
+
+    def test_dump_and_restore(self):
+        cluster = Cluster(namespaces=2, nodes=2, pods=10, events=0, log_lines=0)
+        record = kubermon.PodRecord.from_pod(cluster.objects["pods"][3])
+        restored = kubermon.PodRecord.restore(record.dump())
+        self.assertEqual(restored.dump(), record.dump())
+        self.assertEqual(restored.key, record.key)
+
+
+class PodStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pods = copy.deepcopy(Cluster(namespaces=3, nodes=4, pods=200, events=0, log_lines=0).objects["pods"])
+        for i in range(0, 200, 9):
+            self.pods[i]["status"]["phase"] = "Failed"
+        self.store = kubermon.PodStore()
+        self.store.replace(iter(self.pods))
+
+    def expected(self, namespace=None, phase=None, exclude_phase=None, node=None, labels=None):
+        records = [kubermon.PodRecord.from_pod(pod) for pod in self.pods]
+        return sorted(record.key for record in records
+                      if (not namespace or record.namespace == namespace) and (not phase or record.phase == phase)
+                      and (not exclude_phase or record.phase != exclude_phase) and (not node or record.node == node)
+                      and all(record.label_dict().get(k) == v for k, v in (labels or {}).items()))
+
+    def assertQueriesMatchAScan(self):
+        filters = itertools.product([None, "ns-0", "ns-2"], [None, "Running", "Failed"], [None, "Running"],
+                                    [None, "node-1", ""], [None, {"app": "app-4"}, {"pod-template-hash": "000003"}])
+        for namespace, phase, exclude_phase, node, labels in filters:
+            query = dict(namespace=namespace, phase=phase, exclude_phase=exclude_phase, node=node, labels=labels)
+            self.assertEqual(keys(self.store.query(**query)), self.expected(**query), query)
+
+    def phase_counts(self):
+        counts = {}
+        for pod in self.pods:
+            key = pod["metadata"]["namespace"], pod["status"]["phase"]
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def test_queries_match_a_full_scan(self):
+        self.assertEqual(len(self.store), 200)
+        self.assertQueriesMatchAScan()
+        self.assertEqual(self.store.phase_counts(), self.phase_counts())
+
+    def test_watch_events_keep_the_indexes_current(self):
+        moved = self.pods[10]
+        moved["spec"]["nodeName"] = "node-3"
+        moved["status"]["phase"] = "Succeeded"
+        moved["metadata"]["labels"]["app"] = "app-4"
+        self.store.upsert(moved)
+        for pod in self.pods[150:]:
+            self.store.delete(pod)
+        del self.pods[150:]
+        self.assertQueriesMatchAScan()
+        self.assertEqual(self.store.phase_counts(), self.phase_counts())
+
+    def test_emptied_index_values_are_dropped(self):
+        for pod in self.pods:
+            self.store.delete(pod)
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(self.store.phase_counts(), {})
+        self.assertEqual(self.store._indexes, {"node": {}, "namespace": {}, "phase": {}, "label": {}})
+
+
+class QueryPodsTest(ClusterTestCase):
+
+    def test_store_and_server_side_selectors_agree(self):
+        self.pod(3)["status"]["phase"] = "Failed"
+        store = kubermon.PodStore()
+        store.replace(iter(self.cluster.objects["pods"]))
+        with kubermon.context_scope("test"), mock.patch.object(kubermon, "KUBE_WATCH", False):
+            for namespace, filters in [(None, {"exclude_phase": "Running"}), ("ns-1", {"node": "node-1"}),
+                                       ("ns-0", {"phase": "Running", "labels": {"app": "app-2"}})]:
+                self.assertEqual(sorted(keys(kubermon.query_pods(namespace, **filters))),
+                                 keys(store.query(namespace=namespace, **filters)), filters)
+
+
+if __name__ == "__main__":
+    unittest.main()
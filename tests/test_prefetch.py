@@ -0,0 +1,88 @@
+"""Prefetcher: background fetches for the choice under a picker's cursor."""
+import threading
+import time
+import unittest
+
+from support import kubermon
+
+
+class Fetch:
+    """Records each key fetched and the context scope it ran in; ``gate`` holds fetches until set."""
+
+    def __init__(self, fail=()):
+        self.fetched = []
+        self.fail = set(fail)
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, key):
+        self.gate.wait(5)
+        self.fetched.append((key, getattr(kubermon._scope, "context", None)))
+        if key in self.fail:
+            raise kubermon.KubeApiError(403, "forbidden")
+        return f"pods of {key}"
+
+
+class PrefetcherTest(unittest.TestCase):
+
+    def prefetcher(self, fetch, **options):
+        with kubermon.context_scope("prod"):
+            prefetcher = kubermon.Prefetcher(fetch, **options)
+        self.addCleanup(prefetcher.close)
+        return prefetcher
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def test_resting_cursor_is_fetched_in_the_background(self):
+        fetch = Fetch()
+        prefetcher = self.prefetcher(fetch, delay=0.01)
+        prefetcher("ns-a")
+        self.wait_for(lambda: fetch.fetched)
+        self.assertEqual(prefetcher.get("ns-a"), "pods of ns-a")
+        self.assertEqual(fetch.fetched, [("ns-a", "prod")])
+        self.assertEqual(prefetcher.hits, 1)
+
+    def test_scrolling_past_choices_fetches_only_the_last(self):
+        fetch = Fetch()
+        prefetcher = self.prefetcher(fetch, delay=0.1)
+        for key in ("ns-a", "ns-b", "ns-c"):
+            prefetcher(key)
+        self.wait_for(lambda: fetch.fetched)
+        time.sleep(0.2)
+        self.assertEqual(fetch.fetched, [("ns-c", "prod")])
+
+    def test_get_waits_for_a_fetch_in_flight(self):
+        fetch = Fetch()
+        fetch.gate.clear()
+        prefetcher = self.prefetcher(fetch, delay=0)
+        prefetcher("ns-a")
+        self.wait_for(lambda: "ns-a" in prefetcher._inflight)
+        threading.Timer(0.05, fetch.gate.set).start()
+        self.assertEqual(prefetcher.get("ns-a"), "pods of ns-a")
+        self.assertEqual(len(fetch.fetched), 1)
+
+    def test_background_errors_are_reported_by_get(self):
+        fetch = Fetch(fail={"ns-a"})
+        prefetcher = self.prefetcher(fetch, delay=0)
+        prefetcher("ns-a")
+        self.wait_for(lambda: fetch.fetched)
+        self.wait_for(lambda: not prefetcher._inflight)
+        with self.assertRaises(kubermon.KubeApiError):
+            prefetcher.get("ns-a")
+        self.assertEqual(len(fetch.fetched), 2)
+
+    def test_cache_keeps_the_most_recent_entries(self):
+        fetch = Fetch()
+        prefetcher = self.prefetcher(fetch, size=2)
+        for key in ("ns-a", "ns-b", "ns-a", "ns-c"):
+            prefetcher.get(key)
+        self.assertEqual(list(prefetcher._cache), ["ns-a", "ns-c"])
+        self.assertEqual([key for key, _ in fetch.fetched], ["ns-a", "ns-b", "ns-c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""ResourceCache: name lists per (context, kind, namespace) with a TTL and background refresh."""
+import time
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+
+class ResourceCacheTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        scope = kubermon.context_scope("test")
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+    def lists(self, kind="namespaces"):
+        return len([path for path in self.calls("GET") if path.endswith(f"/{kind}")])
+
+    def test_entries_are_served_from_memory_within_the_ttl(self):
+        cache = kubermon.ResourceCache(ttl=60)
+        self.assertEqual(cache.get("namespaces"), ["ns-0", "ns-1"])
+        self.assertEqual(cache.get("namespaces"), ["ns-0", "ns-1"])
+        self.assertEqual(cache.get("deployments", "ns-0"), ["app-0", "app-2", "app-4", "app-6"])
+        self.assertEqual((self.lists(), self.lists("deployments")), (1, 1))
+
+    def test_expired_entries_are_fetched_again(self):
+        cache = kubermon.ResourceCache(ttl=0.05)
+        cache.get("nodes")
+        time.sleep(0.1)
+        cache.get("nodes")
+        self.assertEqual(self.lists("nodes"), 2)
+
+    def test_entries_are_kept_per_context(self):
+        cache = kubermon.ResourceCache(ttl=60)
+        cache.get("nodes")
+        with kubermon.context_scope("other"):
+            cache.get("nodes")
+        self.assertEqual(self.lists("nodes"), 2)
+        cache.invalidate("other")
+        cache.get("nodes")
+        with kubermon.context_scope("other"):
+            cache.get("nodes")
+        self.assertEqual(self.lists("nodes"), 3)
+
+    def test_idle_menu_refreshes_in_the_background(self):
+        cache = kubermon.ResourceCache(ttl=0.3)
+        self.addCleanup(cache.stop_refresh)
+        cache.get("nodes")
+        cache.start_refresh(interval=0.1)
+        cache.set_idle(True)
+        time.sleep(0.6)
+        cache.set_idle(False)
+        refreshed = self.lists("nodes")
+        self.assertGreaterEqual(refreshed, 2)
+        self.assertEqual(cache.get("nodes"), ["node-0", "node-1"])
+        self.assertEqual(self.lists("nodes"), refreshed)
+
+    def test_busy_session_pauses_refreshes(self):
+        cache = kubermon.ResourceCache(ttl=0.3)
+        self.addCleanup(cache.stop_refresh)
+        self.addCleanup(cache.set_idle, True)  # lets the paused thread see the stop
+        cache.get("nodes")
+        cache.start_refresh(interval=0.1)
+        time.sleep(0.5)
+        self.assertEqual(self.lists("nodes"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
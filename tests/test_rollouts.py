@@ -0,0 +1,73 @@
+"""Rollout tracking: rollout_state and the RolloutTracker over one deployments watch."""
+import contextlib
+import io
+import json
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+
+def deployment(generation=2, **status):
+    """A deployment of 3 replicas, fully rolled out unless ``status`` says otherwise."""
+    status = dict({"observedGeneration": 2, "replicas": 3, "updatedReplicas": 3, "availableReplicas": 3}, **status)
+    return {"metadata": {"name": "web", "generation": generation}, "spec": {"replicas": 3}, "status": status}
+
+
+class RolloutStateTest(unittest.TestCase):
+
+    def test_states(self):
+        deadline = {"type": "Progressing", "status": "False", "reason": "ProgressDeadlineExceeded"}
+        cases = [
+            (deployment(), True, 'deployment "web" successfully rolled out'),
+            (deployment(generation=3), False, "Waiting for deployment spec update to be observed..."),
+            (deployment(conditions=[deadline]), True, 'deployment "web" exceeded its progress deadline'),
+            (deployment(updatedReplicas=1), False, "1 out of 3 new replicas have been updated"),
+            (deployment(replicas=5), False, "2 old replicas are pending termination"),
+            (deployment(availableReplicas=2), False, "2 of 3 updated replicas are available"),
+        ]
+        for obj, done, message in cases:
+            self.assertEqual(kubermon.rollout_state(obj)[0], done, message)
+            self.assertIn(message, kubermon.rollout_state(obj)[1])
+
+
+class RolloutTrackerTest(ClusterTestCase):
+
+    def track(self, targets, **options):
+        tracker = kubermon.RolloutTracker(targets, context="test", **options)
+        with contextlib.redirect_stderr(io.StringIO()):
+            rows = tracker.run()
+        return tracker, {row["name"]: row for row in rows}
+
+    def test_finished_and_missing_deployments(self):
+        tracker, rows = self.track([("ns-0", "app-0"), ("ns-0", "app-2"), ("ns-0", "app-0"), ("ns-0", "gone")],
+                                   timeout=5)
+        self.assertEqual({name: row["result"] for name, row in rows.items()},
+                         {"app-0": "available", "app-2": "available", "gone": "missing"})
+        self.assertEqual(len(tracker.targets), 3)
+        self.assertTrue(tracker.report(list(rows.values())).startswith("rollouts: 2/3 available in "))
+        # One namespace is watched in that namespace only.
+        self.assertEqual(set(self.calls("GET", "/deployments")), {"/apis/apps/v1/namespaces/ns-0/deployments"})
+
+    def test_rollout_without_progress_is_stalled(self):
+        self.cluster.objects["deployments"][3]["status"]["updatedReplicas"] = 1
+        _, rows = self.track([("ns-0", "app-0"), ("ns-1", "app-3")], timeout=1.5, stall_after=0.5)
+        self.assertEqual(rows["app-0"]["result"], "available")
+        self.assertEqual(rows["app-3"]["result"], "stalled")
+        self.assertIn("1 out of 5 new replicas", rows["app-3"]["message"])
+        self.assertEqual(self.calls("GET", "/deployments")[0], "/apis/apps/v1/deployments")
+
+    def test_forbidden_watch_is_an_error(self):
+        self.server.fail("GET", "/apis/apps/v1/namespaces/ns-0/deployments", 403)
+        _, rows = self.track([("ns-0", "app-0")], timeout=5)
+        self.assertEqual(rows["app-0"]["result"], "error")
+
+    def test_cli(self):
+        code, out, _ = self.run_cli("check-deployment-status", "app-1", "ns-0/app-2", "-n", "ns-1", "--timeout", "5",
+                                    "-o", "json")
+        self.assertEqual(code, 0)
+        self.assertEqual([(row["namespace"], row["name"], row["result"]) for row in json.loads(out)],
+                         [("ns-1", "app-1", "available"), ("ns-0", "app-2", "available")])
+
+
+if __name__ == "__main__":
+    unittest.main()
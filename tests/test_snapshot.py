@@ -0,0 +1,123 @@
+"""Snapshot: the on-disk cache of the interactive session, and warm starts from it."""
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from support import ClusterTestCase, kubermon
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache", "snapshot.sqlite")
+
+    def test_round_trip(self):
+        kubermon.Snapshot(self.path).save([("prod", "namespaces", None, None, ("a", "b")),
+                                           ("prod", "deployments", "a", "7", ("web",)),
+                                           ("dev", "namespaces", None, None, ())])
+        snapshot = kubermon.Snapshot(self.path)
+        data, version, saved = snapshot.load("prod", "namespaces")
+        self.assertEqual((data, version), (("a", "b"), None))
+        self.assertRegex(saved, r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\+00:00$")
+        self.assertEqual(snapshot.load("prod", "deployments", "a")[:2], (("web",), "7"))
+        self.assertEqual(snapshot.load("dev", "namespaces")[0], ())
+        self.assertIsNone(snapshot.load("prod", "deployments", "b"))
+        self.assertIsNone(snapshot.load("staging", "namespaces"))
+
+    def test_save_replaces_entries(self):
+        snapshot = kubermon.Snapshot(self.path)
+        snapshot.save([("prod", "nodes", None, "1", ("n1",))])
+        snapshot.save([("prod", "nodes", None, "2", ("n1", "n2"))])
+        self.assertEqual(snapshot.load("prod", "nodes")[:2], (("n1", "n2"), "2"))
+
+    def test_damaged_file_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"not a database" * 100)
+        snapshot = kubermon.Snapshot(self.path)
+        snapshot.save([("prod", "nodes", None, None, ("n1",))])
+        self.assertIsNone(snapshot.load("prod", "nodes"))
+
+    def test_damaged_entry_is_ignored(self):
+        snapshot = kubermon.Snapshot(self.path)
+        snapshot.save([("prod", "nodes", None, None, ("n1",))])
+        snapshot._connect().execute("UPDATE snapshot SET data = x'00'")
+        self.assertIsNone(snapshot.load("prod", "nodes"))
+
+
+class WarmStartTest(ClusterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.snapshot = kubermon.Snapshot(os.path.join(directory.name, "snapshot.sqlite"))
+        for patcher in (mock.patch.object(kubermon, "_snapshot", self.snapshot),
+                        mock.patch.object(kubermon, "_stale_note"),
+                        mock.patch.object(kubermon, "KUBE_WATCH", True),
+                        mock.patch.dict(kubermon._pod_informers, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        scope = kubermon.context_scope("test")
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def stop_pod_informer(self):
+        informer = kubermon._pod_informers["test"]
+        kubermon.stop_informers()
+        self.server.stopping.set()
+        informer._thread.join(5)
+
+    def test_names_are_served_from_the_snapshot_then_revalidated(self):
+        self.snapshot.save([("test", "namespaces", None, None, ("old-1", "old-2"))])
+        cache = kubermon.ResourceCache(ttl=60)
+        self.assertEqual(cache.get("namespaces"), ["old-1", "old-2"])
+        self.wait_for(lambda: cache.snapshot_entries())
+        self.assertEqual(cache.get("namespaces"), ["ns-0", "ns-1"])
+        self.assertEqual(len(self.calls("GET", "/namespaces")), 1)
+        kubermon._stale_note.assert_called_once()
+
+    def test_pod_store_resumes_from_the_snapshot(self):
+        records = [kubermon.PodRecord.from_pod(pod).dump() for pod in self.cluster.objects["pods"][:3]]
+        self.snapshot.save([("test", "pods", None, "1", tuple(records))])
+        store = kubermon.pod_store()
+        self.assertEqual(len(store), 3)
+        self.wait_for(lambda: self.calls("GET", "/pods"))
+        self.stop_pod_informer()
+        # Only the watch: no LIST was needed.
+        self.assertEqual(len(self.calls("GET", "/pods")), 1)
+
+    def test_compacted_snapshot_version_relists(self):
+        self.snapshot.save([("test", "pods", None, "1", ())])
+        self.server.fail("GET", "/api/v1/pods", 410, times=1)
+        store = kubermon.pod_store()
+        self.wait_for(lambda: len(store) == 40)
+        self.stop_pod_informer()
+
+    def test_session_is_saved_on_exit(self):
+        cache = kubermon.ResourceCache(ttl=60)
+        cache.get("nodes")
+        kubermon.pod_store()
+        self.wait_for(lambda: kubermon._pod_informers["test"].fresh.is_set())
+        with mock.patch.object(kubermon, "resource_cache", cache):
+            kubermon.save_snapshot()
+        self.stop_pod_informer()
+        self.assertEqual(self.snapshot.load("test", "nodes")[0], ("node-0", "node-1"))
+        data, version, _ = self.snapshot.load("test", "pods")
+        self.assertEqual(version, "1")
+        self.assertEqual(sorted(kubermon.PodRecord.restore(values).name for values in data),
+                         sorted(pod["metadata"]["name"] for pod in self.cluster.objects["pods"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Start-up: the UI and other slow modules are only imported when they are used."""
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from support import ROOT, ClusterTestCase, kubermon
+
+LAZY_MODULES = ("inquirer", "pyfiglet", "termcolor", "yaml", "argparse", "sqlite3", "curses", "cProfile")
+REPORT = f"print(json.dumps(sorted(m for m in {LAZY_MODULES!r} if m in sys.modules)), file=sys.stderr)"
+
+
+def loaded_modules(code, env=None):
+    """Run ``code`` after importing kubermon in a fresh interpreter; returns the lazy modules it loaded."""
+    result = subprocess.run([sys.executable, "-c", f"import json, sys, kubermon\n{code}\n{REPORT}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stderr.splitlines()[-1])
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def test_import_loads_no_lazy_module(self):
+        self.assertEqual(loaded_modules("pass"), [])
+
+    def test_lazy_module_imports_on_first_attribute(self):
+        module = kubermon._LazyModule("kubermon_no_such_module")
+        with self.assertRaises(ImportError):
+            module.prompt
+
+
+class ScriptedStartupTest(ClusterTestCase):
+
+    def test_subcommand_loads_no_ui_module(self):
+        env = dict(os.environ, KUBERMON_API_SERVER=self.server.url, KUBECONFIG=os.devnull)
+        loaded = loaded_modules('kubermon.main(["list-namespaces", "-o", "json"])', env)
+        self.assertEqual(set(loaded) & {"inquirer", "pyfiglet", "termcolor", "curses", "sqlite3"}, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
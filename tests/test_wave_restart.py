@@ -0,0 +1,44 @@
+"""Wave restarts of deployments against the fake cluster's stub API server."""
+import contextlib
+import io
+import json
+import unittest
+
+from support import ClusterTestCase, kubermon
+
+
+class WaveRestartTest(ClusterTestCase):
+    # ns-0 holds app-0, app-2, app-4 and app-6: two waves of two.
+    ARGS = ("restart-deployments", "-n", "ns-0", "--wave-size", "2", "-o", "json")
+
+    def test_dry_run_lists_waves(self):
+        code, out, _ = self.run_cli(*self.ARGS, "--dry-run")
+        self.assertEqual(code, 0)
+        self.assertEqual([(row["name"], row["wave"]) for row in json.loads(out)],
+                         [("app-0", 1), ("app-2", 1), ("app-4", 2), ("app-6", 2)])
+        self.assertEqual(self.calls("PATCH"), [])
+
+    def test_failed_wave_stops_the_run(self):
+        self.server.fail("PATCH", "/apis/apps/v1/namespaces/ns-0/deployments/app-0", 403)
+        code, out, _ = self.run_cli(*self.ARGS)
+        self.assertEqual(code, 1)
+        self.assertEqual({row["name"]: row["result"] for row in json.loads(out)},
+                         {"app-0": "failed", "app-2": "available", "app-4": "skipped", "app-6": "skipped"})
+        self.assertEqual(sorted(path.rsplit("/", 1)[1] for path in self.calls("PATCH")), ["app-0", "app-2"])
+
+    def test_keep_going_restarts_every_wave(self):
+        self.server.fail("PATCH", "/apis/apps/v1/namespaces/ns-0/deployments/app-0", 403)
+        code, out, _ = self.run_cli(*self.ARGS, "--keep-going")
+        self.assertEqual(code, 1)
+        self.assertEqual({row["name"]: row["result"] for row in json.loads(out)},
+                         {"app-0": "failed", "app-2": "available", "app-4": "available", "app-6": "available"})
+        self.assertEqual(len(self.calls("PATCH")), 4)
+
+    def test_wave_size_must_be_positive(self):
+        for size in ("0", "-1", "ten"):
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                kubermon.main(["restart-deployments", "--wave-size", size, "--dry-run"])
+
+
+if __name__ == "__main__":
+    unittest.main()